@@ -0,0 +1,115 @@
+"""
+animation_clock.py - One animation driver per scene.
+"""
+
+import collections
+
+from PyQt5 import QtCore
+
+
+__all__ = ["AnimationClock"]
+
+
+class AnimationClock(QtCore.QObject):
+    """
+    Tick the running animations of a scene together.
+        - One timer per scene instead of one per pipe or todo.
+        - Items are advanced with the visible scene area and return the rect they dirtied.
+        - The dirty rects are merged into one scene update per frame.
+
+    The animated items implement advance_animation(now, visible) -> QRectF or None.
+    An item may set animation_interval to the milliseconds it needs between ticks, the frame interval by default.
+    The timer runs at the shortest interval of the running items, so a running todo alone ticks once a second.
+
+    """
+
+    frame_interval = 40
+
+    def __init__(self, scene):
+        """
+        Create the clock of a scene.
+
+        Args:
+            scene: The scene whose items are animated.
+
+        """
+
+        super(AnimationClock, self).__init__()
+        self.scene = scene
+        # {item: interval}, the running items in the order they started
+        self.animations = dict()
+        # {interval: number of running items}
+        self.intervals = collections.Counter()
+        self.clock = QtCore.QElapsedTimer()
+        self.clock.start()
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.tick)
+
+    def now(self):
+        """
+        Milliseconds since the clock was created.
+
+        """
+
+        return self.clock.elapsed()
+
+    def add(self, item):
+        if item not in self.animations:
+            interval = getattr(item, "animation_interval", self.frame_interval)
+            self.animations[item] = interval
+            self.intervals[interval] += 1
+            self.update_timer()
+
+    def remove(self, item):
+        interval = self.animations.pop(item, None)
+        if interval is not None:
+            self.intervals[interval] -= 1
+            if not self.intervals[interval]:
+                del self.intervals[interval]
+            self.update_timer()
+
+    def update_timer(self):
+        """
+        Run the timer at the shortest interval of the running items, stop it when nothing runs.
+
+        """
+
+        if not self.intervals:
+            self.timer.stop()
+            return
+        interval = min(self.intervals)
+        if not self.timer.isActive() or self.timer.interval() != interval:
+            self.timer.start(interval)
+
+    def running(self, item):
+        return item in self.animations
+
+    def visible_rect(self):
+        """
+        The scene area shown by the views of the scene.
+
+        Returns:
+            rect: QRectF, empty when no view shows the scene.
+
+        """
+
+        rect = QtCore.QRectF()
+        for view in self.scene.views():
+            if view.isVisible():
+                rect = rect.united(view.mapToScene(view.viewport().rect()).boundingRect())
+        return rect
+
+    def tick(self):
+        now = self.now()
+        visible = self.visible_rect()
+        dirty = QtCore.QRectF()
+        for item in list(self.animations):
+            # removed from the scene while running
+            if item.scene() is not self.scene:
+                self.remove(item)
+                continue
+            rect = item.advance_animation(now, visible)
+            if rect is not None:
+                dirty = dirty.united(rect)
+        if not dirty.isEmpty():
+            self.scene.update(dirty)
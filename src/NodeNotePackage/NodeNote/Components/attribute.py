@@ -253,6 +253,14 @@ class SimpleTextField(QtWidgets.QGraphicsTextItem):
 
         self.past_scene = None
         self.past_parent = parent
+        # the text when the edit started, the note is only dirty when it changed
+        self.focus_text = None
+
+    def paint(self, painter: QtGui.QPainter, option, widget=None) -> None:
+        # zoomed out, the text is too small to read
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            return
+        super(SimpleTextField, self).paint(painter, option, widget)
 
     def mouseDoubleClickEvent(self, event) -> None:
         super(SimpleTextField, self).mouseDoubleClickEvent(event)
@@ -297,7 +305,8 @@ class SimpleTextField(QtWidgets.QGraphicsTextItem):
             self.setPos(root_view.mapToScene(node_pos.x(), node_pos.y()))
 
         super(SimpleTextField, self).focusInEvent(event)
-        self.setTextInteractionFlags(QtCore.Qt.TextEditorInteraction)        
+        self.setTextInteractionFlags(QtCore.Qt.TextEditorInteraction)
+        self.focus_text = self.toHtml()
 
     def focusOutEvent(self, event: QtGui.QFocusEvent) -> None:
         super(SimpleTextField, self).focusOutEvent(event)
@@ -313,7 +322,13 @@ class SimpleTextField(QtWidgets.QGraphicsTextItem):
             self.setParentItem(self.past_parent)
             self.setPos(QtCore.QPointF(0, 0))
             self.past_parent.edit_layout.addItem(graphics_widget)
-    
+
+        # pipe text and file description are saved by their parent
+        if self.focus_text is not None and self.focus_text != self.toHtml():
+            if isinstance(self.past_parent, serializable.Serializable):
+                self.past_parent.mark_dirty()
+        self.focus_text = None
+
     def sceneEvent(self, event: QtCore.QEvent) -> bool:
         if event.type() == QtCore.QEvent.GraphicsSceneContextMenu:
             return True
@@ -365,21 +380,37 @@ class InputTextField(QtWidgets.QGraphicsTextItem):
         self.font_flag = False
         self.font_color_flag = False
         self.resize_flag = True
+        # the scene style version the font was resolved for
+        self.style_version = -1
 
-    def paint(self, painter: QtGui.QPainter, option, widget=None) -> None:
-        super(InputTextField, self).paint(painter, option, widget)
-        if self.scene() and self.scene().attribute_style_font and not self.font_flag:
-            if self.document().defaultFont().styleName() != self.scene().attribute_style_font.styleName:
-                self.document().setDefaultFont(self.scene().attribute_style_font)
+    def resolve_style(self):
+        """
+        Resolve the font from the scene style once per style version.
+
+        """
+
+        scene = self.scene()
+        if scene.attribute_style_font and not self.font_flag:
+            if self.document().defaultFont() != scene.attribute_style_font:
+                self.document().setDefaultFont(scene.attribute_style_font)
             if self.resize_flag:
                 if constants.DEBUG_FONT:
                     print("resize node size case the change of it's font")
                 self.node.text_change_node_shape()
                 self.node.resize(20, 10)
                 self.resize_flag = False
-        if self.scene() and self.scene().attribute_style_font_color and not self.font_color_flag:
-            if self.scene() and self.scene().attribute_style_font_color.rgba != self.defaultTextColor().rgba():
-                self.setDefaultTextColor(self.scene().attribute_style_font_color)
+        if scene.attribute_style_font_color and not self.font_color_flag:
+            if scene.attribute_style_font_color.rgba() != self.defaultTextColor().rgba():
+                self.setDefaultTextColor(scene.attribute_style_font_color)
+        self.style_version = scene.style_version
+
+    def paint(self, painter: QtGui.QPainter, option, widget=None) -> None:
+        # zoomed out, the node draws its cached title instead
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            return
+        super(InputTextField, self).paint(painter, option, widget)
+        if self.scene() and self.style_version != self.scene().style_version:
+            self.resolve_style()
 
     @staticmethod
     def add_table(cursor):
@@ -800,23 +831,22 @@ class InputTextField(QtWidgets.QGraphicsTextItem):
         """
 
         if hyperlink.isdigit():
-            for item in self.scene().view.mainwindow.view_widget.attribute_widgets:
-                if item.id == int(hyperlink):
-                    self.scene().view.mainwindow.scene_list.clearSelection()
-
-                    at_scene = item.scene()
-                    self.scene().view.mainwindow.view_widget.last_scene = self.scene().view.mainwindow.view_widget.current_scene
-                    self.scene().view.mainwindow.view_widget.last_scene_flag = self.scene().view.mainwindow.view_widget.current_scene_flag
-
-                    self.scene().view.mainwindow.view_widget.current_scene = at_scene
-                    self.scene().view.mainwindow.view_widget.current_scene_flag = at_scene.sub_scene_flag
-                    self.scene().view.mainwindow.view_widget.current_scene_flag.setSelected(True)
-                    self.scene().view.mainwindow.view_widget.background_image = at_scene.background_image
-                    self.scene().view.mainwindow.view_widget.cutline = at_scene.cutline
-                    self.scene().view.mainwindow.view_widget.setScene(at_scene)
-                    self.scene().view.mainwindow.view_widget.centerOn(item.scenePos())
-                    item.setSelected(True)
-                    return
+            item = self.scene().view.get_node(int(hyperlink))
+            if item and item.scene().view.root_flag:
+                self.scene().view.mainwindow.scene_list.clearSelection()
+
+                at_scene = item.scene()
+                self.scene().view.mainwindow.view_widget.last_scene = self.scene().view.mainwindow.view_widget.current_scene
+                self.scene().view.mainwindow.view_widget.last_scene_flag = self.scene().view.mainwindow.view_widget.current_scene_flag
+
+                self.scene().view.mainwindow.view_widget.current_scene = at_scene
+                self.scene().view.mainwindow.view_widget.current_scene_flag = at_scene.sub_scene_flag
+                self.scene().view.mainwindow.view_widget.current_scene_flag.setSelected(True)
+                self.scene().view.mainwindow.view_widget.background_image = at_scene.background_image
+                self.scene().view.mainwindow.view_widget.cutline = at_scene.cutline
+                self.scene().view.mainwindow.view_widget.setScene(at_scene)
+                self.scene().view.mainwindow.view_widget.centerOn(item.scenePos())
+                item.setSelected(True)
         else:
             QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.PointingHandCursor)
             try:
@@ -1263,7 +1293,7 @@ class InputTextField(QtWidgets.QGraphicsTextItem):
         self.mouseMoveEvent = self.node.mouseMoveEvent
         if self.node.scene():
             if self.node.scene().view.undo_flag:
-                self.node.scene().history.store_history("Editing")
+                self.node.scene().history.store_history("Editing", [self.node])
 
 
 class SubConstituteWidget(QtWidgets.QGraphicsWidget):
@@ -1288,6 +1318,7 @@ class SubConstituteWidget(QtWidgets.QGraphicsWidget):
         self.label_item.setAcceptHoverEvents(True)
         self.label_item.document().contentsChanged.connect(self.parentItem().text_change_node_shape)
         self.label_item.document().contentsChanged.connect(self.parentItem().update_treelist)
+        self.label_item.document().contentsChanged.connect(self.parentItem().search_changed)
         self.label_item.hoverMoveEvent = self.hoverMoveEvent
         self.setSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Maximum)
         self.layout = QtWidgets.QGraphicsLinearLayout(QtCore.Qt.Horizontal)
@@ -1587,6 +1618,109 @@ class BaseWidget(QtWidgets.QGraphicsWidget):
                 self.move_down_widget(self)
             self.context_flag = False
 
+
+def update_guide_lines(widget, excluded):
+    """
+    Draw the alignment guides of a dragged attribute widget or logic widget.
+    The closest edges in the move direction come from the snap index of the scene,
+    the guides are reused and only moved when the edge changes.
+
+    Args:
+        widget: The dragged widget.
+        excluded: The widgets moving with it, which are not snapped to.
+
+    """
+
+    scene = widget.scene()
+    offect = 5
+
+    # judge move direction
+    if not widget.hlast or widget.hlast <= widget.scenePos().y():
+        move_h = constants.down
+    else:
+        move_h = constants.up
+    widget.hlast = widget.scenePos().y()
+    if not widget.vlast or widget.vlast > widget.scenePos().x():
+        move_v = constants.left
+    else:
+        move_v = constants.right
+    widget.vlast = widget.scenePos().x()
+
+    # closest edges
+    exclude = scene.update_snap_index(excluded)
+    (top, bottom), (left, right) = scene.snap_edges(widget)
+    if move_h == constants.up:
+        y = scene.snap_index.before("h", top + offect, exclude)
+    else:
+        y = scene.snap_index.after("h", bottom - offect, exclude)
+    if move_v == constants.left:
+        x = scene.snap_index.before("v", left + offect, exclude)
+    else:
+        x = scene.snap_index.after("v", right - offect, exclude)
+
+    rect = scene.sceneRect()
+    for name, line in (("hpath", None if y is None else QtCore.QLineF(rect.left(), y, rect.right(), y)),
+                       ("vpath", None if x is None else QtCore.QLineF(x, rect.top(), x, rect.bottom()))):
+        path = getattr(widget, name)
+        if line is None:
+            if path and path.scene() is scene:
+                scene.removeItem(path)
+            continue
+        if not path:
+            pen = QtGui.QPen(QtGui.QColor(77, 148, 255), 2, QtCore.Qt.CustomDashLine, QtCore.Qt.RoundCap)
+            pen.setDashPattern((1, 3, 1, 3))
+            path = QtWidgets.QGraphicsLineItem()
+            path.setPen(pen)
+            setattr(widget, name, path)
+        if path.line() != line:
+            path.setLine(line)
+        if path.scene() is not scene:
+            scene.addItem(path)
+
+
+def colliding_candidates(widget):
+    """
+    The items whose bounding rect intersects the widget, from the item index of the scene.
+
+    Args:
+        widget: The dragged widget.
+
+    Returns:
+        items: Attribute widgets, none type widgets and pipes in descending stacking order.
+
+    """
+
+    if not widget.scene():
+        return []
+    return [item for item in widget.scene().items(widget.sceneBoundingRect(), QtCore.Qt.IntersectsItemBoundingRect,
+                                                  QtCore.Qt.DescendingOrder)
+            if item is not widget and isinstance(item, (AttributeWidget, NoneWidget, pipe.Pipe))]
+
+
+def pipe_animation(widget, start):
+    """
+    Start or end the pipe animation of a widget and of the widgets it reaches, walking the graph index of the scene.
+
+    Args:
+        widget: The attribute widget or logic widget.
+        start: Start the animation, otherwise end it.
+
+    """
+
+    graph = widget.scene().update_graph_index() if widget.scene() else None
+    pending = [widget]
+    visited = {widget}
+    while pending:
+        node = pending.pop()
+        node.set_ports_animation(start)
+        if graph is None:
+            continue
+        for neighbour in node.animation_neighbours(graph, start):
+            if neighbour not in visited and neighbour.attribute_animation != start:
+                visited.add(neighbour)
+                pending.append(neighbour)
+
+
 class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
     background_color = constants.logic_background_color
     selected_background_color = constants.logic_selected_background_color
@@ -1621,6 +1755,9 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         self.logic_combobox_output.setView(logic_list_output)
         self.logic_combobox_output.addItems(("And", "Or", "Not"))
         self.logic_combobox_output.clearFocus()
+        # only a choice of the user, setting the index while loading keeps the scene clean
+        self.logic_combobox_input.activated.connect(lambda index: self.mark_dirty())
+        self.logic_combobox_output.activated.connect(lambda index: self.mark_dirty())
 
         self.group = GroupWidget("Logic")
         self.group.add_node_widget(self.logic_combobox_input)
@@ -1647,6 +1784,13 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         # Colliding
         self.moving = False
         self.colliding_co = False
+        # own pipes, cached for a drag
+        self.colliding_pipes = None
+        # colliding detection is coalesced to once per frame while dragging
+        self.colliding_timer = QtCore.QTimer(self)
+        self.colliding_timer.setSingleShot(True)
+        self.colliding_timer.setInterval(constants.COLLIDING_INTERVAL)
+        self.colliding_timer.timeout.connect(self.colliding_detection)
 
         # MOVING
         self.was_moved = False
@@ -1656,14 +1800,15 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         self.hpath = None
         self.hlast = None
         self.vlast = None
-        self.hpath_flag = False
-        self.vpath_flag = False
+        self.geometryChanged.connect(self.snap_changed)
 
         # Style
         self.background_color_flag = False
         self.selected_background_color_flag = False
         self.border_color_flag = False
         self.selected_border_color_flag = False
+        # the scene style version the colors were resolved for
+        self.style_version = -1
 
     def get_port_position(self, port_type, port_truth):
         """
@@ -1760,58 +1905,46 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
 
         """
 
-        self.output_port.start_pipes_animation()
-        self.attribute_animation = True
-
-        for node in self.next_attribute:
-            if not node.attribute_animation:
-                node.start_pipe_animation()
-
-        for logic in self.next_logic:
-            if not logic.attribute_animation:
-                logic.start_pipe_animation()
+        pipe_animation(self, True)
 
     def end_pipe_animation(self):
-        self.output_port.end_pipes_animation()
-        self.input_port.end_pipes_animation()
-        self.attribute_animation = False
+        pipe_animation(self, False)
 
-        for node in self.next_attribute:
-            if node.attribute_animation:
-                node.end_pipe_animation()
+    def set_ports_animation(self, start):
+        if start:
+            self.output_port.start_pipes_animation()
+        else:
+            self.output_port.end_pipes_animation()
+            self.input_port.end_pipes_animation()
+        self.attribute_animation = start
 
-        for node in self.last_attribute:
-            if node.attribute_animation:
-                node.end_pipe_animation()
+    def animation_neighbours(self, graph, start):
+        # the animation starts in the next widgets and ends in the next and last widgets
+        if start:
+            return graph.successors(self)
+        return graph.successors(self) + graph.predecessors(self)
 
-        for logic in self.next_logic:
-            if logic.attribute_animation:
-                logic.end_pipe_animation()
+    def colliding_detection(self):
+        if self.colliding_pipes is None:
+            self.colliding_pipes = set(self.input_port.pipes + self.output_port.pipes)
+        for colliding_item in colliding_candidates(self):
+            if isinstance(colliding_item, pipe.Pipe) and colliding_item not in self.colliding_pipes:
+                self.colliding_co = True
+                self.update()
+                return colliding_item
+        self.colliding_co = False
+        self.update()
 
-        for logic in self.last_logic:
-            if logic.attribute_animation:
-                logic.end_pipe_animation()
+    def finish_colliding_detection(self):
+        """
+        Detect the last position of the drag which is still waiting for its frame.
 
-    @staticmethod
-    def colliding_judge_pipe(logic_widget, item):
-        for pipe_widget in logic_widget.input_port.pipes:
-            if pipe_widget is item:
-                return True
-        for pipe_widget in logic_widget.output_port.pipes:
-            if pipe_widget is item:
-                return True
-        return False
+        """
+
+        if self.colliding_timer.isActive():
+            self.colliding_timer.stop()
+            self.colliding_detection()
 
-    def colliding_detection(self):
-        colliding_items = self.scene().collidingItems(self, QtCore.Qt.IntersectsItemBoundingRect)
-        for colliding_item in colliding_items:
-            if isinstance(colliding_item, pipe.Pipe):
-                if not self.colliding_judge_pipe(self, colliding_item):
-                    self.colliding_co = True
-                    self.update()
-                    return colliding_item
-            self.colliding_co = False
-            self.update()
 
     def colliding_release(self):
         if self.colliding_co:
@@ -1858,19 +1991,38 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         if self.scene().view.undo_flag:
             self.scene().history.store_history("Colliding Release")
 
+    def resolve_style(self):
+        """
+        Resolve the colors from the scene style once per style version.
+
+        """
+
+        scene = self.scene()
+        if scene.logic_style_background_color and not self.background_color_flag:
+            self.background_color = scene.logic_style_background_color
+        if scene.logic_style_selected_background_color and not self.selected_background_color_flag:
+            self.selected_background_color = scene.logic_style_selected_background_color
+        if scene.logic_style_border_color and not self.border_color_flag:
+            self.border_color = scene.logic_style_border_color
+        if scene.logic_style_selected_border_color and not self.selected_border_color_flag:
+            self.selected_border_color = scene.logic_style_selected_border_color
+        self.style_version = scene.style_version
+
     def paint(self, painter, option, widget=None) -> None:
         super(LogicWidget, self).paint(painter, option, widget)
         painter.save()
 
         #   color init
-        if self.scene().logic_style_background_color and not self.background_color_flag:
-            self.background_color = self.scene().logic_style_background_color
-        if self.scene().logic_style_selected_background_color and not self.selected_background_color_flag:
-            self.selected_background_color = self.scene().logic_style_selected_background_color
-        if self.scene().logic_style_border_color and not self.border_color_flag:
-            self.border_color = self.scene().logic_style_border_color
-        if self.scene().logic_style_selected_border_color and not self.selected_border_color_flag:
-            self.selected_border_color = self.scene().logic_style_selected_border_color
+        if self.style_version != self.scene().style_version:
+            self.resolve_style()
+
+        # zoomed out, a plain rect
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(self.background_color if not self.isSelected() else self.selected_background_color)
+            painter.drawRect(self.boundingRect())
+            painter.restore()
+            return
 
         if self.colliding_co:
             pen = QtGui.QPen(QtGui.QColor(230, 0, 0, 100), 2)
@@ -1886,7 +2038,8 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
 
         painter.setPen(pen)
         painter.setBrush(brush)
-        painter.drawRoundedRect(0, 0, self.boundingRect().width(), self.boundingRect().height(), 2, 2)
+        inset = pen.widthF() / 2
+        painter.drawRoundedRect(self.boundingRect().adjusted(inset, inset, -inset, -inset), 2, 2)
 
         painter.restore()
 
@@ -1910,254 +2063,7 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         self.was_moved = True
 
         if self.scene().view.mainwindow.view_widget.line_flag:
-
-            # draw line
-            #       init
-            offect = 5
-            line_hitem_up = None
-            line_hitem_down = None
-            line_vitem_left = None
-            line_vitem_right = None
-            move_h = None
-            move_v = None
-            hpath = None
-            vpath = None
-            line_hdistance_up = float("inf")
-            line_hdistance_down = float("inf")
-            line_vdistance_left = float("inf")
-            line_vdistance_right = float("inf")
-            pen = QtGui.QPen(QtGui.QColor(77, 148, 255), 2, QtCore.Qt.CustomDashLine, QtCore.Qt.RoundCap)
-            pen.setDashPattern((1, 3, 1, 3))
-
-            #       judge move direction
-            if not self.hlast:
-                self.hlast = self.scenePos().y()
-                move_h = constants.down
-            elif self.hlast > self.scenePos().y():
-                move_h = constants.up
-                self.hlast = self.scenePos().y()
-            elif self.hlast <= self.scenePos().y():
-                move_h = constants.down
-                self.hlast = self.scenePos().y()
-
-            if not self.vlast:
-                self.vlast = self.scenePos().x()
-                move_v = constants.left
-            elif self.vlast > self.scenePos().x():
-                move_v = constants.left
-                self.vlast = self.scenePos().x()
-            elif self.vlast <= self.scenePos().x():
-                move_v = constants.right
-                self.vlast = self.scenePos().x()
-
-            #       select close item
-            for item in self.scene().items():
-                if isinstance(item, (AttributeWidget, LogicWidget)):
-                    if item is not self:
-                        #   different move directions
-                        if move_h == constants.up:
-                            #   find line_hitem_down
-                            if item.scenePos().y() + item.boundingRect().height() - offect <= self.scenePos().y():
-                                h_distance_down = self.scenePos().y() - (item.scenePos().y() + item.boundingRect().height())
-                                if h_distance_down < line_hdistance_down:
-                                    line_hdistance_down = h_distance_down
-                                    line_hitem_down = item
-                            #   find line_hitem_up
-                            if item.scenePos().y() - offect <= self.scenePos().y():
-                                h_distance_up = self.scenePos().y() - item.scenePos().y()
-                                if h_distance_up < line_hdistance_up:
-                                    line_hdistance_up = h_distance_up
-                                    line_hitem_up = item
-
-                        elif move_h == constants.down:
-                            #   find line_hitem_up
-                            if item.scenePos().y() + offect >= self.scenePos().y() + self.boundingRect().height():
-                                h_distance_up = item.scenePos().y() + item.boundingRect().height() - self.scenePos().y()
-                                if h_distance_up < line_hdistance_up:
-                                    line_hdistance_up = h_distance_up
-                                    line_hitem_up = item
-                            #   find line_hitem_down
-                            if item.y() + item.boundingRect().height() + offect >= self.y() + self.boundingRect().height():
-                                h_distance_down = item.scenePos().y() + item.boundingRect().height() - \
-                                                  (self.scenePos().y() + self.boundingRect().height())
-                                if h_distance_down < line_hdistance_down:
-                                    line_hdistance_down = h_distance_down
-                                    line_hitem_down = item
-
-                        if move_v == constants.left:
-                            #   find line_vitem_right
-                            if item.scenePos().x() + item.boundingRect().width() - offect <= self.scenePos().x():
-                                v_distance_right = self.scenePos().x() - (item.scenePos().x() + item.boundingRect().width())
-                                if v_distance_right < line_vdistance_right:
-                                    line_vdistance_right = v_distance_right
-                                    line_vitem_right = item
-                            #   find line_vitem_left
-                            if item.x() - offect <= self.scenePos().x():
-                                v_distance_left = self.scenePos().x() - item.scenePos().x()
-                                if v_distance_left < line_vdistance_left:
-                                    line_vdistance_left = v_distance_left
-                                    line_vitem_left = item
-
-                        elif move_v == constants.right:
-                            #   find line_vitem_left
-                            if item.scenePos().x() + offect >= self.scenePos().x() + self.boundingRect().width():
-                                v_distance_left = item.scenePos().x() - (self.scenePos().x() + self.boundingRect().width())
-                                if v_distance_left < line_vdistance_left:
-                                    line_vdistance_left = v_distance_left
-                                    line_vitem_left = item
-                            #   find line_vitem_right
-                            if item.scenePos().x() + item.boundingRect().width() + offect >= \
-                                    self.scenePos().x() + self.boundingRect().width():
-                                v_distance_right = item.scenePos().x() + item.boundingRect().width() - \
-                                                   (self.scenePos().x() + self.boundingRect().width())
-                                if v_distance_right < line_vdistance_right:
-                                    line_vdistance_right = v_distance_right
-                                    line_vitem_right = item
-
-            #   calculate the closest hitem and vitem
-            #       hitem
-            if move_h == constants.up:
-                if line_hitem_down and line_hitem_up:
-
-                    if line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() >= \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-                    elif line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() < \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_up.scenePos().y(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_up.scenePos().y())
-
-                elif line_hitem_up and not line_hitem_down:
-
-                    hpath = QtWidgets.QGraphicsLineItem(
-                        self.scene().sceneRect().left(),
-                        line_hitem_up.scenePos().y(),
-                        self.scene().sceneRect().right(),
-                        line_hitem_up.scenePos().y())
-
-            elif move_h == constants.down:
-                if line_hitem_down and line_hitem_up:
-
-                    if line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() < \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-                    elif line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() >= \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_up.scenePos().y(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_up.scenePos().y())
-
-                elif line_hitem_down and not line_hitem_up:
-
-                    hpath = QtWidgets.QGraphicsLineItem(
-                        self.scene().sceneRect().left(),
-                        line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                        self.scene().sceneRect().right(),
-                        line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-            #       vitem
-            if move_v == constants.left:
-                if line_vitem_left and line_vitem_right:
-
-                    if line_vitem_left.scenePos().x() > \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().bottom())
-
-                    elif line_vitem_left.scenePos().x() <= \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().bottom())
-
-                elif line_vitem_left and not line_vitem_right:
-
-                    vpath = QtWidgets.QGraphicsLineItem(
-                        line_vitem_left.scenePos().x(),
-                        self.scene().sceneRect().top(),
-                        line_vitem_left.scenePos().x(),
-                        self.scene().sceneRect().bottom())
-
-            elif move_v == constants.right:
-                if line_vitem_left and line_vitem_right:
-
-                    if line_vitem_left.scenePos().x() <= \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().bottom())
-
-                    elif line_vitem_left.scenePos().x() > \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().bottom())
-
-                elif line_vitem_right and not line_vitem_left:
-
-                    vpath = QtWidgets.QGraphicsLineItem(
-                        line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                        self.scene().sceneRect().top(),
-                        line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                        self.scene().sceneRect().bottom())
-
-            if hpath:
-                if not self.hpath:
-                    self.hpath = hpath
-                    self.hpath.setPen(pen)
-                    self.scene().addItem(self.hpath)
-                elif self.hpath is not hpath and self.hpath:
-                    if self.hpath in self.scene().items():
-                        self.scene().removeItem(self.hpath)
-                    self.hpath = hpath
-                    self.hpath.setPen(pen)
-                    self.scene().addItem(self.hpath)
-                    self.hpath_flag = True
-            elif self.hpath_flag:
-                if self.hpath in self.scene().items():
-                    self.scene().removeItem(self.hpath)
-                    self.hpath = None
-
-            if vpath:
-                if not self.vpath:
-                    self.vpath = vpath
-                    self.vpath.setPen(pen)
-                    self.scene().addItem(self.vpath)
-                elif self.vpath is not vpath and self.vpath:
-                    if self.vpath in self.scene().items():
-                        self.scene().removeItem(self.vpath)
-                    self.vpath = vpath
-                    self.vpath.setPen(pen)
-                    self.scene().addItem(self.vpath)
-                    self.vpath_flag = True
-            elif self.vpath_flag:
-                if self.vpath in self.scene().items():
-                    self.scene().removeItem(self.vpath)
-                    self.vpath = None
+            update_guide_lines(self, [self] + self.scene().selectedItems())
 
         super(LogicWidget, self).mouseMoveEvent(event)
 
@@ -2165,21 +2071,31 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         if self.was_moved:
             self.was_moved = False
             if self.scene().view.undo_flag:
-                self.scene().history.store_history("Logic Widget Position Changed")
+                self.scene().history.store_history("Logic Widget Position Changed",
+                                                    self.scene().selectedItems() + [self])
+        self.finish_colliding_detection()
         if self.scene().view.mode == constants.MODE_NOOP:
             self.colliding_release()
+        # moves made by the release itself are not detected
+        self.colliding_timer.stop()
+        self.colliding_pipes = None
 
-        if self.vpath and self.vpath in self.scene().items():
+        if self.vpath and self.vpath.scene() is self.scene():
             self.scene().removeItem(self.vpath)
-        if self.hpath and self.hpath in self.scene().items():
+        if self.hpath and self.hpath.scene() is self.scene():
             self.scene().removeItem(self.hpath)
 
         super(LogicWidget, self).mouseReleaseEvent(event)
 
+    def snap_changed(self):
+        # index the new edges before the next alignment guide query
+        if self.scene():
+            self.scene().snap_moved.add(self)
+
     def moveEvent(self, event: 'QtWidgets.QGraphicsSceneMoveEvent') -> None:
         super(LogicWidget, self).moveEvent(event)
-        if self.moving:
-            self.colliding_detection()
+        if self.moving and not self.colliding_timer.isActive():
+            self.colliding_timer.start()
         self.update_pipe_position()
 
     def save_to_file(self):
@@ -2219,6 +2135,43 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
         logic_serialization.logic_flag.append(self.border_color_flag)
         logic_serialization.logic_flag.append(self.selected_border_color_flag)
 
+    def restore_state(self, data):
+        """
+        Restore geometry, contents and style from the serialization without touching ports
+        or connections, so it can be replayed on a live widget.
+
+        Args:
+            data: The protobuff object.
+
+        """
+
+        # geometry and contents
+        self.setPos(data.logic_position[0], data.logic_position[1])
+        self.logic_combobox_input.setCurrentIndex(data.logic_truth[0])
+        self.logic_combobox_output.setCurrentIndex(data.logic_truth[1])
+
+        # style
+        self.background_color = QtGui.QColor()
+        self.background_color.setRgba(data.logic_color[0])
+
+        self.selected_border_color = QtGui.QColor()
+        self.selected_border_color.setRgba(data.logic_color[1])
+
+        self.border_color = QtGui.QColor()
+        self.border_color.setRgba(data.logic_color[2])
+
+        self.selected_border_color = QtGui.QColor()
+        self.selected_border_color.setRgba(data.logic_color[3])
+
+        # flag
+        self.background_color_flag = data.logic_flag[0]
+        self.selected_background_color_flag = data.logic_flag[1]
+        self.border_color_flag = data.logic_flag[2]
+        self.selected_border_color_flag = data.logic_flag[3]
+        self.style_version = -1
+
+        self.update()
+
     def deserialize(self, data, hashmap: dict, view=None, flag=True):
         if flag:
             # added into scene and view
@@ -2227,31 +2180,12 @@ class LogicWidget(QtWidgets.QGraphicsWidget, serializable.Serializable):
             # id and hashmap
             self.id = data.logic_id
             hashmap[data.logic_id] = self
-            # geometry and contents
-            self.setPos(data.logic_position[0], data.logic_position[1])
-            self.logic_combobox_input.setCurrentIndex(data.logic_truth[0])
-            self.logic_combobox_output.setCurrentIndex(data.logic_truth[1])
             # ports
             self.input_port.deserialize(data.logic_port[0], hashmap, view, flag=True)
             self.output_port.deserialize(data.logic_port[1], hashmap, view, flag=True)
-            # style
-            self.background_color = QtGui.QColor()
-            self.background_color.setRgba(data.logic_color[0])
-
-            self.selected_border_color = QtGui.QColor()
-            self.selected_border_color.setRgba(data.logic_color[1])
-
-            self.border_color = QtGui.QColor()
-            self.border_color.setRgba(data.logic_color[2])
-
-            self.selected_border_color = QtGui.QColor()
-            self.selected_border_color.setRgba(data.logic_color[3])
-
-            # flag
-            self.background_color_flag = data.logic_flag[0]
-            self.selected_background_color_flag = data.logic_flag[1]
-            self.border_color_flag = data.logic_flag[2]
-            self.selected_border_color_flag = data.logic_flag[3]
+            view.current_scene.register_item(self)
+            # geometry, contents and style
+            self.restore_state(data)
 
             return True
         else:
@@ -2313,6 +2247,7 @@ class AttributeFile(BaseWidget, serializable.Serializable):
 
         self.label_item = SimpleTextField("Description", self)
         self.label_item.setFont(QtGui.QFont("等距更纱黑体 SC", 8))
+        self.label_item.document().contentsChanged.connect(self.palette_changed)
 
         self.change_image_text = ChangeImageOrVideo("Cover", self, "Cover")
         self.change_video_text = ChangeImageOrVideo("File", self, "File")
@@ -2352,6 +2287,14 @@ class AttributeFile(BaseWidget, serializable.Serializable):
 
         painter.restore()
 
+    def palette_text(self):
+        return self.label_item.toPlainText()
+
+    def palette_changed(self):
+        # the palette reads the description again before its next query
+        if self.scene():
+            self.scene().view.mark_palette(self)
+
     def turn_image(self):
         image_url, _ = QtWidgets.QFileDialog.getOpenFileName(None, "select image", "", "*.png *.jpg")
         if image_url:
@@ -2469,6 +2412,9 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
     width_flag = constants.attribute_width_flag
 
     export_sub_scene_flag = True
+    # [(scene id, attribute id, bytes)] while a note is saved, the serialized sub scenes of the root view
+    # are collected as segments instead of being decoded into the message
+    sub_scene_segments = None
 
     def __init__(self):
         super(BaseWidget, self).__init__()
@@ -2554,6 +2500,13 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         self.colliding_parent = False
         self.colliding_child = False
         self.colliding_inside = False
+        # (ancestors, sub widgets, own pipes), cached for a drag
+        self.colliding_relations = None
+        # colliding detection is coalesced to once per frame while dragging
+        self.colliding_timer = QtCore.QTimer(self)
+        self.colliding_timer.setSingleShot(True)
+        self.colliding_timer.setInterval(constants.COLLIDING_INTERVAL)
+        self.colliding_timer.timeout.connect(self.colliding_detection)
 
         # ANAMATION
         self.attribute_animation = False
@@ -2565,6 +2518,10 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
 
         # SCENE
         self.sub_scene = None
+        # serialized sub scene loaded from a file, materialized when it is entered
+        self.sub_scene_data = None
+        self.sub_scene_id = 0
+        self.sub_scene_flag = None
 
         # MOVING
         self.was_moved = False
@@ -2574,14 +2531,15 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         self.hpath = None
         self.hlast = None
         self.vlast = None
-        self.hpath_flag = False
-        self.vpath_flag = False
+        self.geometryChanged.connect(self.snap_changed)
 
         # Style
         self.color_flag = False
         self.selected_color_flag = False
         self.border_flag = False
         self.selected_border_flag = False
+        # the scene style version the colors were resolved for
+        self.style_version = -1
 
         # context
         self.context_flag = False
@@ -2593,30 +2551,73 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         self.markdown_text = ""
         self.markdown_saved_flag = False
 
-    def paint(self, painter, option, widget=None) -> None:
+        # level of detail, the first line of the text drawn when zoomed out
+        self.title_text = QtGui.QStaticText()
+        self.title_revision = -1
 
-        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing | QtGui.QPainter.SmoothPixmapTransform)
+    def title(self):
+        """
+        The first line of the text, laid out again only when the text changed.
 
-        # color and width init
-        if self.scene().attribute_style_background_color and not self.color_flag:
-            self.color = self.scene().attribute_style_background_color
+        Returns:
+            title: QStaticText.
+
+        """
+
+        document = self.attribute_widget.label_item.document()
+        if self.title_revision != document.revision():
+            self.title_text.setText(document.firstBlock().text().strip())
+            self.title_revision = document.revision()
+        return self.title_text
+
+    def resolve_style(self):
+        """
+        Resolve the colors from the scene style once per style version.
+
+        """
+
+        scene = self.scene()
+        if scene.attribute_style_background_color and not self.color_flag:
+            self.color = scene.attribute_style_background_color
         elif not self.color_flag:
             self.color = AttributeWidget.color
 
-        if self.scene().attribute_style_selected_background_color and not self.selected_color_flag:
-            self.selected_color = self.scene().attribute_style_selected_background_color
+        if scene.attribute_style_selected_background_color and not self.selected_color_flag:
+            self.selected_color = scene.attribute_style_selected_background_color
         elif not self.selected_color_flag:
             self.selected_color = AttributeWidget.selected_color
 
-        if self.scene().attribute_style_border_color and not self.border_flag:
-            self.border_color = self.scene().attribute_style_border_color
+        if scene.attribute_style_border_color and not self.border_flag:
+            self.border_color = scene.attribute_style_border_color
         elif not self.border_flag:
             self.border_color = AttributeWidget.border_color
-        
-        if self.scene().attribute_style_selected_border_color and not self.selected_border_flag:
-            self.selected_border_color = self.scene().attribute_style_selected_border_color
+
+        if scene.attribute_style_selected_border_color and not self.selected_border_flag:
+            self.selected_border_color = scene.attribute_style_selected_border_color
         elif not self.selected_border_flag:
             self.selected_border_color = AttributeWidget.selected_border_color
+        self.style_version = scene.style_version
+
+    def paint(self, painter, option, widget=None) -> None:
+
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing | QtGui.QPainter.SmoothPixmapTransform)
+
+        # color and width init
+        if self.style_version != self.scene().style_version:
+            self.resolve_style()
+
+        # zoomed out, a plain rect with the title
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            painter.setPen(QtCore.Qt.NoPen if not self.isSelected() else
+                           QtGui.QPen(self.selected_border_color, 0))
+            painter.setBrush(self.color if not self.isSelected() else self.selected_color)
+            painter.drawRect(self.boundingRect())
+            painter.setPen(self.attribute_widget.label_item.defaultTextColor())
+            painter.setFont(self.attribute_widget.label_item.font())
+            painter.setClipRect(self.boundingRect())
+            painter.drawStaticText(QtCore.QPointF(constants.NODE_LAYOUT_MARGINS, constants.NODE_LAYOUT_MARGINS),
+                                   self.title())
+            return
 
         # draw border
         bg_border = 1.0
@@ -2642,16 +2643,15 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         if self.isSelected() and constants.NODE_SEL_BORDER_COLOR:
             border_width = 1.2
             border_color = self.selected_border_color
-        border_rect = QtCore.QRectF(rect.left() - (border_width / 2),
-                                    rect.top() - (border_width / 2),
-                                    rect.width() + border_width,
-                                    rect.height() + border_width)
-        pen = QtGui.QPen(border_color, border_width)
+        pen = QtGui.QPen(border_color, border_width) if not self.colliding_co else \
+            QtGui.QPen(QtGui.QColor(230, 0, 0, 100), 2)
+        # the border is kept inside the bounding rect, partial viewport updates repaint all of it
+        inset = pen.widthF() / 2
+        border_rect = rect.adjusted(inset, inset, -inset, -inset)
         path = QtGui.QPainterPath()
         path.addRoundedRect(border_rect, radius, radius)
         painter.setBrush(QtCore.Qt.NoBrush)
-        painter.setPen(pen if not self.colliding_co else
-                       QtGui.QPen(QtGui.QColor(230, 0, 0, 100), 2))
+        painter.setPen(pen)
         painter.drawPath(path)
 
     def text_change_node_shape(self):
@@ -2846,6 +2846,7 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
 
         # Added into scene
         self.add_widget(subwidget, line)
+        self.scene().register_item(subwidget)
         self.attribute_sub_widgets.append(subwidget)
         self.text_change_node_shape()
         self.update_pipe_position()
@@ -2911,98 +2912,38 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         self.update_pipe_position()
 
 
-    def colliding_judge_sub(self, parent_widget, item):
+    def colliding_relation(self):
         """
-        Judge whether the item is its child.
-
-        Args:
-            parent_widget: The parent attribute widget.
-            item: The colliding item.
+        The widgets and pipes which move with this widget, cached for the drag.
 
-        """
-
-        while parent_widget.attribute_sub_widgets:
-            for sub_widget in parent_widget.attribute_sub_widgets:
-                if isinstance(sub_widget, AttributeWidget):
-                    if sub_widget is item:
-                        self.colliding_child = True
-                        self.update()
-                        return 1
-                    parent_widget = sub_widget
-                    if self.colliding_judge_sub(parent_widget, item):
-                        return 1
-            return None
-
-    def colliding_judge_none(self, parent_widget, item):
-        """
-        Judge whether the item is its child.
-
-        Args:
-            parent_widget: The parent attribute widget.
-            item: The colliding item.
-
-        """
-
-        while parent_widget.attribute_sub_widgets:
-            for sub_widget in parent_widget.attribute_sub_widgets:
-                if isinstance(sub_widget, NoneWidget):
-                    if sub_widget is item:
-                        self.colliding_child = True
-                        self.update()
-                        return 1
-                elif isinstance(sub_widget, AttributeWidget):
-                    parent_widget = sub_widget
-                    if self.colliding_judge_none(parent_widget, item):
-                        return 1
-            return None
-
-    def colliding_judge_parent(self, parent_widget, item):
-        """
-        Judge whether the item is its parent.
-
-        Args:
-            parent_widget: The parent attribute widget.
-            item: The colliding item.
-
-        """
-
-        while parent_widget.parentItem():
-            parent_widget = parent_widget.parentItem()
-            if parent_widget is item:
-                self.colliding_parent = True
-                self.update()
-                return 1
-
-    @staticmethod
-    def colliding_judge_pipe(attribute_widget, item):
-        """
-        Judge whether the item is its pipe.
-
-        Args:
-            attribute_widget: The parent attribute widget.
-            item: The colliding item.
-
-        """
-
-        for pipe_widget in attribute_widget.true_input_port.pipes:
-            if pipe_widget is item:
-                return True
-        for pipe_widget in attribute_widget.true_output_port.pipes:
-            if pipe_widget is item:
-                return True
-        for pipe_widget in attribute_widget.false_input_port.pipes:
-            if pipe_widget is item:
-                return True
-        for pipe_widget in attribute_widget.false_output_port.pipes:
-            if pipe_widget is item:
-                return True
-        for sub_widget in attribute_widget.attribute_sub_widgets:
-            from .sub_view import ProxyView
-            from .todo import Todo
-            if not isinstance(sub_widget, (AttributeFile, ProxyView, Todo, NoneWidget)) and \
-                    sub_widget.colliding_judge_pipe(sub_widget, item):
-                return True
-        return False
+        Returns:
+            (ancestors, sub widgets, pipes): sets of the parent widgets, the attribute widgets and none type widgets
+                nested in this one, and the pipes of this one and its nested attribute widgets.
+
+        """
+
+        if self.colliding_relations is None:
+            ancestors = set()
+            parent_widget = self.parentItem()
+            while parent_widget:
+                ancestors.add(parent_widget)
+                parent_widget = parent_widget.parentItem()
+
+            sub_widgets = set()
+            pipes = set()
+            attribute_widgets = [self]
+            while attribute_widgets:
+                attribute_widget = attribute_widgets.pop()
+                pipes.update(attribute_widget.true_input_port.pipes + attribute_widget.true_output_port.pipes +
+                             attribute_widget.false_input_port.pipes + attribute_widget.false_output_port.pipes)
+                for sub_widget in attribute_widget.attribute_sub_widgets:
+                    if isinstance(sub_widget, AttributeWidget):
+                        sub_widgets.add(sub_widget)
+                        attribute_widgets.append(sub_widget)
+                    elif isinstance(sub_widget, NoneWidget):
+                        sub_widgets.add(sub_widget)
+            self.colliding_relations = (ancestors, sub_widgets, pipes)
+        return self.colliding_relations
 
     def colliding_detection(self):
         """
@@ -3012,38 +2953,36 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
             The colliding item.
 
         """
-        colliding_items = self.scene().collidingItems(self, QtCore.Qt.IntersectsItemBoundingRect)
-        for item in colliding_items:
-            if isinstance(item, AttributeWidget):
-                self.colliding_type = constants.COLLIDING_ATTRIBUTE
-                flag_child = self.colliding_judge_sub(self, item)
-                flag_parent = self.colliding_judge_parent(self, item)
-                if not flag_parent and not flag_child:
-                    self.colliding_co = True
-                if flag_parent:
-                    self.colliding_inside = True
-                self.update()
 
-                flag_pipe = False
-                for left_item in colliding_items[colliding_items.index(item):]:
-                    if isinstance(left_item, pipe.Pipe):
-                        if not self.colliding_judge_pipe(self, left_item):
-                            flag_pipe = True
-                            continue
+        ancestors, sub_widgets, pipes = self.colliding_relation()
+        self.colliding_co = False
+        self.colliding_type = constants.COLLIDING_ATTRIBUTE
+        self.colliding_inside = False
 
-                if not flag_child:
-                    return item
+        for item in colliding_candidates(self):
+            if item in sub_widgets:
+                self.colliding_child = True
+
+            elif isinstance(item, AttributeWidget):
+                if item in ancestors:
+                    self.colliding_parent = True
+                    self.colliding_inside = True
+                else:
+                    self.colliding_co = True
+                self.update()
 
                 if constants.DEBUG_COLLIDING:
                     print("****************attr**************************")
                     print("DEBUG COLLIDING status: ", "\nchild: ", self.colliding_child,
                           "\nparent: ", self.colliding_parent, "\ncommon co: ", self.colliding_co,
                           "\ninside: ", self.colliding_inside, "\nreturn item: ", item,
-                          "\ntype: ", self.colliding_type, "\nflag pipe", flag_pipe)
+                          "\ntype: ", self.colliding_type)
                     print("**********************************************")
 
+                return item
+
             elif isinstance(item, pipe.Pipe):
-                if not self.colliding_judge_pipe(self, item):
+                if item not in pipes:
                     self.colliding_type = constants.COLLIDING_PIPE
                     self.colliding_co = True
                     self.update()
@@ -3059,19 +2998,21 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
                     return item
 
             elif isinstance(item, NoneWidget):
+                self.colliding_type = constants.COLLIDING_NONE
+                self.colliding_co = True
+                return item
 
-                if not self.colliding_judge_none(self, item):
-                    self.colliding_type = constants.COLLIDING_NONE
-                    self.colliding_co = True
-                    return item
+        self.update()
 
-            else:
+    def finish_colliding_detection(self):
+        """
+        Detect the last position of the drag which is still waiting for its frame.
 
-                self.colliding_co = False
-                self.colliding_type = constants.COLLIDING_ATTRIBUTE
-                self.colliding_inside = False
+        """
 
-        self.update()
+        if self.colliding_timer.isActive():
+            self.colliding_timer.stop()
+            self.colliding_detection()
 
     def colliding_release(self, event):
         """
@@ -3291,57 +3232,94 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
     def remove_sub_scene(self):
         self.sub_scene = None
 
-    def start_pipe_animation(self):
-        """"
-        Only start animation in output port and sub widgets.
+    def load_sub_scene(self):
+        """
+        Materialize the sub scene kept as serialized bytes since the file was loaded,
+        the segments of its own sub scenes are taken by its attribute widgets.
+
+        Returns:
+            Scene: The sub scene or None.
 
         """
 
-        self.true_output_port.start_pipes_animation()
-        self.false_output_port.start_pipes_animation()
-        self.attribute_animation = True
+        if self.sub_scene or not self.sub_scene_data:
+            return self.sub_scene
+
+        from ..GraphicsView.scene import Scene
+        from ..Model import serialize_pb2
+
+        sub_scene_serialization = serialize_pb2.ViewSerialization.SceneSerialization()
+        sub_scene_serialization.ParseFromString(self.sub_scene_data)
+        self.sub_scene_data = None
 
-        for node in self.next_attribute:
-            if not node.attribute_animation:
-                node.start_pipe_animation()
+        view = self.scene().view
+        view.mark_sub_scene(self)
+        # save scene and flag
+        last_scene_flag = view.current_scene_flag
+        last_scene = view.current_scene
 
-        for logic in self.next_logic:
-            if not logic.attribute_animation:
-                logic.start_pipe_animation()
+        # sub scene, the scene and its widgets get the saved ids
+        with serializable.Serializable.ids.loading():
+            sub_scene = Scene(self.sub_scene_flag, view, self)
+            self.set_sub_scene(sub_scene)
+            self.sub_scene_flag.setData(0, QtCore.Qt.ToolTipRole, sub_scene)
+            view.register_scene(sub_scene)
 
-        for sub_node in self.attribute_sub_widgets:
-            if isinstance(sub_node, AttributeWidget) and not sub_node.attribute_animation:
-                sub_node.start_pipe_animation()
+            view.current_scene = sub_scene
+            view.current_scene_flag = self.sub_scene_flag
+
+            hashmap = {}
+            sub_scene.deserialize(sub_scene_serialization, hashmap, view, True)
+            sub_scene.deserialize(sub_scene_serialization, hashmap, view, False)
+
+        # restore scene and flag
+        view.current_scene = last_scene
+        view.current_scene_flag = last_scene_flag
+        return sub_scene
+
+    def start_pipe_animation(self):
+        """"
+        Only start animation in output port and sub widgets.
+
+        """
+
+        pipe_animation(self, True)
 
     def end_pipe_animation(self):
         """
         Only end animation in output port and sub widgets.
         """
 
-        self.true_output_port.end_pipes_animation()
-        self.false_output_port.end_pipes_animation()
-        self.attribute_animation = False
+        pipe_animation(self, False)
 
-        for node in self.next_attribute:
-            if node.attribute_animation:
-                node.end_pipe_animation()
+    def set_ports_animation(self, start):
+        if start:
+            self.true_output_port.start_pipes_animation()
+            self.false_output_port.start_pipes_animation()
+        else:
+            self.true_output_port.end_pipes_animation()
+            self.false_output_port.end_pipes_animation()
+        self.attribute_animation = start
 
-        for logic in self.next_logic:
-            if logic.attribute_animation:
-                logic.end_pipe_animation()
+    def animation_neighbours(self, graph, start):
+        # the next widgets and the sub widgets
+        return graph.successors(self) + [sub_node for sub_node in self.attribute_sub_widgets
+                                         if isinstance(sub_node, AttributeWidget)]
 
-        for sub_node in self.attribute_sub_widgets:
-            if isinstance(sub_node, AttributeWidget) and sub_node.attribute_animation:
-                sub_node.end_pipe_animation()
+    def search_changed(self):
+        # the search and the palette read the text again before their next query
+        if self.scene():
+            self.scene().view.mark_search(self)
+
+    def palette_text(self):
+        # the title is the first line
+        return self.attribute_widget.label_item.toPlainText().split("\n", 1)[0]
 
     def update_treelist(self):
         if self.sub_scene:
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.scene().view.mainwindow.scene_list)
-            while iterator.value():
-                scene_flag = iterator.value()
-                iterator += 1
-                if scene_flag.data(0, QtCore.Qt.ToolTipRole) is self.sub_scene:
-                    scene_flag.setText(0, self.attribute_widget.label_item.toPlainText())
+            self.sub_scene.sub_scene_flag.setText(0, self.attribute_widget.label_item.toPlainText())
+        elif self.sub_scene_data:
+            self.sub_scene_flag.setText(0, self.attribute_widget.label_item.toPlainText())
 
     def travers_subitem(self, subitem: list):
         for item in subitem:
@@ -3381,253 +3359,7 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         self.moving = True
 
         if self.scene().view.mainwindow.view_widget.line_flag:
-            # draw line
-            #       init
-            offect = 5
-            line_hitem_up = None
-            line_hitem_down = None
-            line_vitem_left = None
-            line_vitem_right = None
-            move_h = None
-            move_v = None
-            hpath = None
-            vpath = None
-            line_hdistance_up = float("inf")
-            line_hdistance_down = float("inf")
-            line_vdistance_left = float("inf")
-            line_vdistance_right = float("inf")
-            pen = QtGui.QPen(QtGui.QColor(77, 148, 255), 2, QtCore.Qt.CustomDashLine, QtCore.Qt.RoundCap)
-            pen.setDashPattern((1, 3, 1, 3))
-
-            #       judge move direction
-            if not self.hlast:
-                self.hlast = self.scenePos().y()
-                move_h = constants.down
-            elif self.hlast > self.scenePos().y():
-                move_h = constants.up
-                self.hlast = self.scenePos().y()
-            elif self.hlast <= self.scenePos().y():
-                move_h = constants.down
-                self.hlast = self.scenePos().y()
-
-            if not self.vlast:
-                self.vlast = self.scenePos().x()
-                move_v = constants.left
-            elif self.vlast > self.scenePos().x():
-                move_v = constants.left
-                self.vlast = self.scenePos().x()
-            elif self.vlast <= self.scenePos().x():
-                move_v = constants.right
-                self.vlast = self.scenePos().x()
-
-            #       select close item
-            for item in self.scene().items():
-                if isinstance(item, (AttributeWidget, LogicWidget)):
-                    if item not in self.attribute_sub_widgets and item is not self:
-                        #   different move directions
-                        if move_h == constants.up:
-                            #   find line_hitem_down
-                            if item.scenePos().y() + item.boundingRect().height() - offect <= self.scenePos().y():
-                                h_distance_down = self.scenePos().y() - (item.scenePos().y() + item.boundingRect().height())
-                                if h_distance_down < line_hdistance_down:
-                                    line_hdistance_down = h_distance_down
-                                    line_hitem_down = item
-                            #   find line_hitem_up
-                            if item.scenePos().y() - offect <= self.scenePos().y():
-                                h_distance_up = self.scenePos().y() - item.scenePos().y()
-                                if h_distance_up < line_hdistance_up:
-                                    line_hdistance_up = h_distance_up
-                                    line_hitem_up = item
-
-                        elif move_h == constants.down:
-                            #   find line_hitem_up
-                            if item.scenePos().y() + offect >= self.scenePos().y() + self.boundingRect().height():
-                                h_distance_up = item.scenePos().y() + item.boundingRect().height() - self.scenePos().y()
-                                if h_distance_up < line_hdistance_up:
-                                    line_hdistance_up = h_distance_up
-                                    line_hitem_up = item
-                            #   find line_hitem_down
-                            if item.y() + item.boundingRect().height() + offect >= self.y() + self.boundingRect().height():
-                                h_distance_down = item.scenePos().y() + item.boundingRect().height() - \
-                                                  (self.scenePos().y() + self.boundingRect().height())
-                                if h_distance_down < line_hdistance_down:
-                                    line_hdistance_down = h_distance_down
-                                    line_hitem_down = item
-
-                        if move_v == constants.left:
-                            #   find line_vitem_right
-                            if item.scenePos().x() + item.boundingRect().width() - offect <= self.scenePos().x():
-                                v_distance_right = self.scenePos().x() - (item.scenePos().x() + item.boundingRect().width())
-                                if v_distance_right < line_vdistance_right:
-                                    line_vdistance_right = v_distance_right
-                                    line_vitem_right = item
-                            #   find line_vitem_left
-                            if item.x() - offect <= self.scenePos().x():
-                                v_distance_left = self.scenePos().x() - item.scenePos().x()
-                                if v_distance_left < line_vdistance_left:
-                                    line_vdistance_left = v_distance_left
-                                    line_vitem_left = item
-
-                        elif move_v == constants.right:
-                            #   find line_vitem_left
-                            if item.scenePos().x() + offect >= self.scenePos().x() + self.boundingRect().width():
-                                v_distance_left = item.scenePos().x() - (self.scenePos().x() + self.boundingRect().width())
-                                if v_distance_left < line_vdistance_left:
-                                    line_vdistance_left = v_distance_left
-                                    line_vitem_left = item
-                            #   find line_vitem_right
-                            if item.scenePos().x() + item.boundingRect().width() + offect >= \
-                                    self.scenePos().x() + self.boundingRect().width():
-                                v_distance_right = item.scenePos().x() + item.boundingRect().width() - \
-                                                   (self.scenePos().x() + self.boundingRect().width())
-                                if v_distance_right < line_vdistance_right:
-                                    line_vdistance_right = v_distance_right
-                                    line_vitem_right = item
-
-            #   calculate the closest hitem and vitem
-            #       hitem
-            if move_h == constants.up:
-                if line_hitem_down and line_hitem_up:
-
-                    if line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() >= \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-                    elif line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() < \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_up.scenePos().y(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_up.scenePos().y())
-
-                elif line_hitem_up and not line_hitem_down:
-
-                    hpath = QtWidgets.QGraphicsLineItem(
-                        self.scene().sceneRect().left(),
-                        line_hitem_up.scenePos().y(),
-                        self.scene().sceneRect().right(),
-                        line_hitem_up.scenePos().y())
-
-            elif move_h == constants.down:
-                if line_hitem_down and line_hitem_up:
-
-                    if line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() < \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-                    elif line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height() >= \
-                            line_hitem_up.scenePos().y():
-                        hpath = QtWidgets.QGraphicsLineItem(
-                            self.scene().sceneRect().left(),
-                            line_hitem_up.scenePos().y(),
-                            self.scene().sceneRect().right(),
-                            line_hitem_up.scenePos().y())
-
-                elif line_hitem_down and not line_hitem_up:
-
-                    hpath = QtWidgets.QGraphicsLineItem(
-                        self.scene().sceneRect().left(),
-                        line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height(),
-                        self.scene().sceneRect().right(),
-                        line_hitem_down.scenePos().y() + line_hitem_down.boundingRect().height())
-
-            #       vitem
-            if move_v == constants.left:
-                if line_vitem_left and line_vitem_right:
-
-                    if line_vitem_left.scenePos().x() > \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().bottom())
-
-                    elif line_vitem_left.scenePos().x() <= \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().bottom())
-
-                elif line_vitem_left and not line_vitem_right:
-
-                    vpath = QtWidgets.QGraphicsLineItem(
-                        line_vitem_left.scenePos().x(),
-                        self.scene().sceneRect().top(),
-                        line_vitem_left.scenePos().x(),
-                        self.scene().sceneRect().bottom())
-
-            elif move_v == constants.right:
-                if line_vitem_left and line_vitem_right:
-
-                    if line_vitem_left.scenePos().x() <= \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_left.scenePos().x(),
-                            self.scene().sceneRect().bottom())
-
-                    elif line_vitem_left.scenePos().x() > \
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width():
-                        vpath = QtWidgets.QGraphicsLineItem(
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().top(),
-                            line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                            self.scene().sceneRect().bottom())
-
-                elif line_vitem_right and not line_vitem_left:
-
-                    vpath = QtWidgets.QGraphicsLineItem(
-                        line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                        self.scene().sceneRect().top(),
-                        line_vitem_right.scenePos().x() + line_vitem_right.boundingRect().width(),
-                        self.scene().sceneRect().bottom())
-
-            if hpath:
-                if not self.hpath:
-                    self.hpath = hpath
-                    self.hpath.setPen(pen)
-                    self.scene().addItem(self.hpath)
-                elif self.hpath is not hpath and self.hpath:
-                    if self.hpath in self.scene().items():
-                        self.scene().removeItem(self.hpath)
-                    self.hpath = hpath
-                    self.hpath.setPen(pen)
-                    self.scene().addItem(self.hpath)
-                    self.hpath_flag = True
-            elif self.hpath_flag:
-                if self.hpath in self.scene().items():
-                    self.scene().removeItem(self.hpath)
-                    self.hpath = None
-
-            if vpath:
-                if not self.vpath:
-                    self.vpath = vpath
-                    self.vpath.setPen(pen)
-                    self.scene().addItem(self.vpath)
-                elif self.vpath is not vpath and self.vpath:
-                    if self.vpath in self.scene().items():
-                        self.scene().removeItem(self.vpath)
-                    self.vpath = vpath
-                    self.vpath.setPen(pen)
-                    self.scene().addItem(self.vpath)
-                    self.vpath_flag = True
-            elif self.vpath_flag:
-                if self.vpath in self.scene().items():
-                    self.scene().removeItem(self.vpath)
-                    self.vpath = None
+            update_guide_lines(self, [self] + self.scene().selectedItems())
 
         if self.resizing:
             self.mouse_update_node_size(event)
@@ -3644,18 +3376,23 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         if self.was_moved:
             self.was_moved = False
             if self.scene().view.mode == constants.MODE_NOOP and self.scene().view.undo_flag:
-                self.scene().history.store_history("Attribute Widget Moved")
+                self.scene().history.store_history("Attribute Widget Moved",
+                                                    self.scene().selectedItems() + [self])
+        self.finish_colliding_detection()
         self.colliding_release(event)
+        # moves made by the release itself are not detected
+        self.colliding_timer.stop()
+        self.colliding_relations = None
 
-        if self.vpath and self.vpath in self.scene().items():
+        if self.vpath and self.vpath.scene() is self.scene():
             self.scene().removeItem(self.vpath)
-        if self.hpath and self.hpath in self.scene().items():
+        if self.hpath and self.hpath.scene() is self.scene():
             self.scene().removeItem(self.hpath)
 
         if self.resizing:
             self.mouse_update_node_size(event)
             if self.scene().view.mode == constants.MODE_NOOP and self.scene().view.undo_flag:
-                self.scene().history.store_history("Attribute Widget Size Changed")
+                self.scene().history.store_history("Attribute Widget Size Changed", [self])
         else:
             super(AttributeWidget, self).mouseReleaseEvent(event)
     
@@ -3762,10 +3499,15 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
                 self.move_down_widget(self)
             self.context_flag = False
 
+    def snap_changed(self):
+        # index the new edges before the next alignment guide query
+        if self.scene():
+            self.scene().snap_moved.add(self)
+
     def moveEvent(self, event: 'QtWidgets.QGraphicsSceneMoveEvent') -> None:
         super(AttributeWidget, self).moveEvent(event)
-        if self.moving:
-            self.colliding_detection()
+        if self.moving and not self.colliding_timer.isActive():
+            self.colliding_timer.start()
         self.update_pipe_position()
 
     def serialize(self, attr_serialization=None):
@@ -3815,6 +3557,14 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         # sub scene
         if self.sub_scene and AttributeWidget.export_sub_scene_flag:
             self.sub_scene.serialize(attr_serialization.sub_scene_serialization.add())
+        elif self.sub_scene_data and AttributeWidget.export_sub_scene_flag:
+            view = self.scene().view
+            if AttributeWidget.sub_scene_segments is not None and view.root_flag:
+                AttributeWidget.sub_scene_segments.append((self.sub_scene_id, self.id, self.sub_scene_data))
+            else:
+                sub_scene_serialization = attr_serialization.sub_scene_serialization.add()
+                sub_scene_serialization.ParseFromString(self.sub_scene_data)
+                view.nest_sub_scene_segments(sub_scene_serialization)
 
         # highlighter
         attr_serialization.highlighter = True if self.attribute_widget.label_item.pythonlighter else False
@@ -3846,6 +3596,74 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
         attr_serialization.mouse_flag = self.mouse_flag
         attr_serialization.mouse_text_width = self.attribute_widget.label_item.textWidth()
 
+    def restore_state(self, data):
+        """
+        Restore geometry, contents and style from the serialization without touching ports,
+        connections or sub widgets, so it can be replayed on a live widget.
+
+        Args:
+            data: The protobuff object.
+
+        """
+
+        # geometry and contents
+        if not self.parentItem():
+            self.setGeometry(data.position[0], data.position[1], data.size[0], data.size[1])
+
+        html_data = data.contents
+        if html_data.find(r'<img src=') != -1:
+            html_data = re.sub(r'<img src="(.+?)"(.*?)>', self.sub_function, html_data)
+        if html_data != self.attribute_widget.label_item.toHtml():
+            self.attribute_widget.label_item.setHtml(html_data)
+
+        # highlighter
+        if data.highlighter and not self.attribute_widget.label_item.pythonlighter:
+            self.attribute_widget.label_item.pythonlighter = \
+                PythonHighlighter(self.attribute_widget.label_item.document())
+        elif not data.highlighter and self.attribute_widget.label_item.pythonlighter:
+            self.attribute_widget.label_item.pythonlighter.setDocument(None)
+            self.attribute_widget.label_item.pythonlighter = None
+
+        # style
+        font = QtGui.QFont()
+        font.setFamily(data.self_attr_font_family)
+        font.setPointSize(data.self_attr_font_size)
+        self.attribute_widget.label_item.font = font
+        self.attribute_widget.label_item.document().setDefaultFont(font)
+
+        self.attribute_widget.label_item.font_color = QtGui.QColor()
+        self.attribute_widget.label_item.font_color.setRgba(data.self_attr_color[0])
+        self.attribute_widget.label_item.setDefaultTextColor(self.attribute_widget.label_item.font_color)
+
+        self.color = QtGui.QColor()
+        self.color.setRgba(data.self_attr_color[1])
+
+        self.selected_color = QtGui.QColor()
+        self.selected_color.setRgba(data.self_attr_color[2])
+
+        self.border_color = QtGui.QColor()
+        self.border_color.setRgba(data.self_attr_color[3])
+
+        self.selected_border_color = QtGui.QColor()
+        self.selected_border_color.setRgba(data.self_attr_color[4])
+
+        self.attribute_widget.label_item.font_flag = data.attr_flag[0]
+        self.attribute_widget.label_item.font_color_flag = data.attr_flag[1]
+
+        self.color_flag = data.attr_flag[2]
+        self.selected_color_flag = data.attr_flag[3]
+        self.border_flag = data.attr_flag[4]
+        self.selected_border_flag = data.attr_flag[5]
+        self.style_version = -1
+        self.attribute_widget.label_item.style_version = -1
+
+        # text width
+        self.mouse_flag = data.mouse_flag
+        if self.mouse_flag:
+            self.attribute_widget.label_item.setTextWidth(data.mouse_text_width)
+            self.text_change_node_shape()
+            self.resize(0, self.size().height())
+
     @staticmethod
     def sub_function(get_str):
         '<img src="(.+?)"(.*?)>'
@@ -3862,90 +3680,35 @@ class AttributeWidget(BaseWidget, serializable.Serializable):
             # id and hashmap
             self.id = data.attr_id
             hashmap[data.attr_id] = self
-            # geometry and contents
-            self.setGeometry(data.position[0], data.position[1], data.size[0], data.size[1])
-
-            html_data = data.contents
-            if html_data.find(r'<img src=') != -1:
-                html_data = re.sub(r'<img src="(.+?)"(.*?)>',self.sub_function , html_data)
-
-            self.attribute_widget.label_item.setHtml(html_data)
             # ports
             self.true_input_port.deserialize(data.attr_port[0], hashmap, view, flag=True)
             self.false_input_port.deserialize(data.attr_port[1], hashmap, view, flag=True)
             self.true_output_port.deserialize(data.attr_port[2], hashmap, view, flag=True)
             self.false_output_port.deserialize(data.attr_port[3], hashmap, view, flag=True)
+            view.current_scene.register_item(self)
             # layout
             self.item_row = data.attr_location[0]
             self.item_column = data.attr_location[1]
             self.current_row = data.next_location[0]
             self.current_column = data.next_location[1]
-            # highlighter
-            if data.highlighter:
-                self.attribute_widget.label_item.pythonlighter = \
-                    PythonHighlighter(self.attribute_widget.label_item.document())
-            # style
-            font = QtGui.QFont()
-            font.setFamily(data.self_attr_font_family)
-            font.setPointSize(data.self_attr_font_size)
-            self.attribute_widget.label_item.font = font
-            self.attribute_widget.label_item.document().setDefaultFont(font)
-
-            self.attribute_widget.label_item.font_color = QtGui.QColor()
-            self.attribute_widget.label_item.font_color.setRgba(data.self_attr_color[0])
-            self.attribute_widget.label_item.setDefaultTextColor(self.attribute_widget.label_item.font_color)
-
-            self.color = QtGui.QColor()
-            self.color.setRgba(data.self_attr_color[1])
-
-            self.selected_color = QtGui.QColor()
-            self.selected_color.setRgba(data.self_attr_color[2])
-
-            self.border_color = QtGui.QColor()
-            self.border_color.setRgba(data.self_attr_color[3])
-
-            self.selected_border_color = QtGui.QColor()
-            self.selected_border_color.setRgba(data.self_attr_color[4])
-
-            self.attribute_widget.label_item.font_flag = data.attr_flag[0]
-            self.attribute_widget.label_item.font_color_flag = data.attr_flag[1]
-
-            self.color_flag = data.attr_flag[2]
-            self.selected_color_flag = data.attr_flag[3]
-            self.border_flag = data.attr_flag[4]
-            self.selected_border_flag = data.attr_flag[5]
-
-            # text width
-            self.mouse_flag = data.mouse_flag
-            if self.mouse_flag:
-                self.attribute_widget.label_item.setTextWidth(data.mouse_text_width)
-                self.text_change_node_shape()
-                self.resize(0, self.size().height())
-
-            # sub scene
-            if data.sub_scene_serialization:
-                # save scene and flag
-                last_scene_flag = view.current_scene_flag
-                last_scene = view.current_scene
+            # geometry, contents and style
+            self.restore_state(data)
 
-                # sub scene
-                from ..GraphicsView.scene import Scene
+            # sub scene, kept serialized until it is entered
+            sub_scene_segment = None
+            if data.sub_scene_serialization:
+                sub_scene_segment = (data.sub_scene_serialization[0].scene_id,
+                                     data.sub_scene_serialization[0].SerializeToString())
+            elif data.attr_id in view.root_view().sub_scene_segments:
+                # the segment read from the note, it is not decoded here
+                sub_scene_segment = view.root_view().sub_scene_segments.pop(data.attr_id)
+            if sub_scene_segment:
                 from ..GraphicsView.view import TreeWidgetItem
-                sub_scene_flag = TreeWidgetItem(
+                self.sub_scene_id, self.sub_scene_data = sub_scene_segment
+                self.sub_scene_flag = TreeWidgetItem(
                     view.current_scene_flag,
                     (self.attribute_widget.label_item.toPlainText(),))
-                sub_scene = Scene(sub_scene_flag, view, self)
-                self.set_sub_scene(sub_scene)
-                sub_scene_flag.setData(0, QtCore.Qt.ToolTipRole, sub_scene)
-
-                view.current_scene = sub_scene
-                view.current_scene_flag = sub_scene_flag
-
-                sub_scene.deserialize(data.sub_scene_serialization[0], hashmap, view, True)
-                sub_scene.deserialize(data.sub_scene_serialization[0], hashmap, view, False)
-
-                # restore scene and flag
-                view.current_scene = last_scene
-                view.current_scene_flag = last_scene_flag
+                self.sub_scene_flag.setData(0, QtCore.Qt.UserRole, self)
+                view.mark_sub_scene(self)
 
         return True
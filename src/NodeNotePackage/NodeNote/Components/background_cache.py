@@ -0,0 +1,132 @@
+"""
+background_cache.py - Background images shared by all scenes.
+"""
+
+import collections
+import math
+import os
+
+from PyQt5 import QtCore, QtGui, QtSvg
+
+from ..Model import constants
+
+
+__all__ = ["BackgroundCache"]
+
+
+class BackgroundCache:
+    """
+    Process wide cache of background images.
+        - One decoded pixmap per image path.
+        - One svg renderer per svg path.
+        - Svg images rasterized per (path, size, zoom bucket), the least recently used are dropped.
+
+    """
+
+    pixmaps = dict()
+    renderers = dict()
+    svg_pixmaps = collections.OrderedDict()
+    # rasterized svg images kept
+    svg_limit = 8
+    # zoom buckets per doubling of the scale
+    zoom_steps = 2
+
+    @staticmethod
+    def absolute_path(path):
+        return path if os.path.isabs(path) else os.path.abspath(os.path.join(constants.work_dir, path))
+
+    @classmethod
+    def pixmap(cls, path):
+        """
+        The decoded image.
+
+        Args:
+            path: Absolute path or relative path to the work dir.
+
+        Returns:
+            pixmap: QPixmap shared by every caller.
+
+        """
+
+        path = cls.absolute_path(path)
+        if path not in cls.pixmaps:
+            cls.pixmaps[path] = QtGui.QPixmap(path)
+        return cls.pixmaps[path]
+
+    @classmethod
+    def renderer(cls, path):
+        """
+        The svg renderer.
+
+        Args:
+            path: Absolute path or relative path to the work dir.
+
+        Returns:
+            renderer: QSvgRenderer shared by every caller.
+
+        """
+
+        path = cls.absolute_path(path)
+        if path not in cls.renderers:
+            cls.renderers[path] = QtSvg.QSvgRenderer(path)
+        return cls.renderers[path]
+
+    @classmethod
+    def svg_pixmap(cls, path, size, scale):
+        """
+        The svg image rasterized for a size and zoom.
+
+        Args:
+            path: Absolute path or relative path to the work dir.
+            size: QSizeF in item coordinates.
+            scale: The level of detail of the painter, rounded to a zoom bucket.
+
+        Returns:
+            pixmap: QPixmap of size * bucket scale pixels.
+
+        """
+
+        path = cls.absolute_path(path)
+        bucket = round(math.log2(max(scale, 1e-3)) * cls.zoom_steps)
+        bucket_scale = 2 ** (bucket / cls.zoom_steps)
+        key = (path, round(size.width()), round(size.height()), bucket)
+        if key in cls.svg_pixmaps:
+            cls.svg_pixmaps.move_to_end(key)
+            return cls.svg_pixmaps[key]
+
+        pixmap = QtGui.QPixmap(max(1, round(size.width() * bucket_scale)),
+                               max(1, round(size.height() * bucket_scale)))
+        pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.SmoothPixmapTransform)
+        cls.renderer(path).render(painter, QtCore.QRectF(pixmap.rect()))
+        painter.end()
+
+        cls.svg_pixmaps[key] = pixmap
+        while len(cls.svg_pixmaps) > cls.svg_limit:
+            cls.svg_pixmaps.popitem(last=False)
+        return pixmap
+
+    @staticmethod
+    def draw_exposed(painter, target, pixmap, exposed):
+        """
+        Draw only the exposed part of a pixmap stretched over the target rect.
+
+        Args:
+            painter: The painter.
+            target: QRectF the whole pixmap covers.
+            pixmap: QPixmap.
+            exposed: QRectF which needs painting.
+
+        """
+
+        exposed = exposed.intersected(target)
+        if exposed.isEmpty() or target.isEmpty():
+            return
+        x_scale = pixmap.width() / target.width()
+        y_scale = pixmap.height() / target.height()
+        source = QtCore.QRectF((exposed.x() - target.x()) * x_scale,
+                               (exposed.y() - target.y()) * y_scale,
+                               exposed.width() * x_scale,
+                               exposed.height() * y_scale)
+        painter.drawPixmap(exposed, pixmap, source)
@@ -213,6 +213,8 @@ class Draw(QtWidgets.QGraphicsWidget, serializable.Serializable):
             elif event.type() == QtCore.QEvent.TabletRelease:
                 if self.device_down and event.buttons() == QtCore.Qt.NoButton:
                     self.device_down = False
+                    # the stroke is finished
+                    self.mark_dirty()
                 self.update()
 
     def mousePressEvent(self, event) -> None:
@@ -251,6 +253,7 @@ class Draw(QtWidgets.QGraphicsWidget, serializable.Serializable):
             if self.resize_flag:
                 self.resize_flag = False
                 self.setCursor(QtCore.Qt.ArrowCursor)
+                self.mark_dirty()
 
     def serialize(self, draw_serialization=None):
         # Path
@@ -274,14 +277,27 @@ class Draw(QtWidgets.QGraphicsWidget, serializable.Serializable):
         view.current_scene.addItem(self)
         view.draw_widgets.append(self)
 
-        # Geometry
+        # Geometry and path
         self.id = data.draw_id
+        self.restore_state(data)
+
+    def restore_state(self, data):
+        """
+        Restore geometry and canvas from the serialization, so it can be replayed on a live widget.
+
+        Args:
+            data: Google protobuff object.
+
+        """
+
+        # Geometry
         self.resize(data.draw_size[0], data.draw_size[1])
         self.setPos(data.draw_pos[0], data.draw_pos[1])
 
         # Path
-        self.canvas_item.path = data.path
-        self.canvas_item.load_from_path(self.canvas_item.path)
+        if self.canvas_item.path != data.path:
+            self.canvas_item.path = data.path
+            self.canvas_item.load_from_path(self.canvas_item.path)
         self.update()
 
 
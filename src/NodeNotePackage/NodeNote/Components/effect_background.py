@@ -1,5 +1,4 @@
-import os
-
+from ..Components.background_cache import BackgroundCache
 from ..Model import constants
 
 from PyQt5 import QtWidgets, QtCore, QtGui, QtSvg
@@ -22,9 +21,10 @@ class EffectBackground(QtSvg.QGraphicsSvgItem):
         self.view = view
         self.width = 1080
         self.height = 900
-        self.svg = QtSvg.QSvgRenderer(os.path.join(constants.work_dir, self.name))
+        self.svg = BackgroundCache.renderer(self.name)
         self.setSharedRenderer(self.svg)
-        self.setCacheMode(QtWidgets.QGraphicsItem.ItemCoordinateCache)
+        # the rasterized svg is cached by BackgroundCache, only the exposed rect is drawn
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
 
     def resize(self, width, height):
         """
@@ -36,8 +36,10 @@ class EffectBackground(QtSvg.QGraphicsSvgItem):
 
         """
 
-        self.width = width
-        self.height = height
+        if (width, height) != (self.width, self.height):
+            self.prepareGeometryChange()
+            self.width = width
+            self.height = height
 
     def change_svg(self, path):
         """
@@ -49,14 +51,15 @@ class EffectBackground(QtSvg.QGraphicsSvgItem):
         """
 
         self.name = path
-        self.svg = QtSvg.QSvgRenderer(os.path.join(constants.work_dir, path))
+        self.svg = BackgroundCache.renderer(path)
         self.setSharedRenderer(self.svg)
+        self.update()
 
     def boundingRect(self) -> QtCore.QRectF:
         return QtCore.QRectF(0, 0, self.width, self.height)
 
     def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionGraphicsItem, widget=None) -> None:
-        super(EffectBackground, self).paint(painter, option, widget)
-        painter.save()
-        self.renderer().render(painter, self.boundingRect())
-        painter.restore()
+        rect = self.boundingRect()
+        pixmap = BackgroundCache.svg_pixmap(self.name, rect.size(),
+                                            option.levelOfDetailFromTransform(painter.worldTransform()))
+        BackgroundCache.draw_exposed(painter, rect, pixmap, option.exposedRect)
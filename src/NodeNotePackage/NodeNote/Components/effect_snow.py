@@ -1,11 +1,26 @@
-import random
 import os
 
-from PyQt5 import QtCore, QtGui, QtWidgets, sip
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
 from ..Model import constants
 
 
 class EffectSkyWidget(QtWidgets.QWidget):
+    """
+    The sky contains flowing images.
+    Flakes are rows of NumPy arrays advanced together once per frame and drawn by one paint event,
+    the animation pauses while the widget is hidden.
+
+    """
+
+    image_path = constants.flowing_image
+    # seconds between two new flakes
+    spawn_interval = 6.0
+    # seconds a flake falls and fades
+    life_time = (25.0, 30.0)
+    sizes = (12, 18, 24)
+    # milliseconds between two frames
+    frame_interval = 40
 
     def __init__(self, view_widget, parent=None):
         """
@@ -19,123 +34,148 @@ class EffectSkyWidget(QtWidgets.QWidget):
         super(EffectSkyWidget, self).__init__(parent)
         self.view_widget = view_widget
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
-        self.path_list = list()
-        self.index = 0
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.snow_create)
-        self.timer.start(6000)
 
-    def snow_create(self):
+        # particles, one row per flake
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.flake_size = np.zeros(0, dtype=int)
+        self.opacity = np.zeros(0)
+        self.age = np.zeros(0)
+        self.life = np.zeros(0)
+        self.fade = np.zeros(0)
+        self.random = np.random.default_rng()
+        self.spawn_elapsed = 0.0
+
+        # pixmap per flake size
+        self.pixmaps = dict()
+        self.pixmaps_path = None
+
+        # frames
+        self.clock = QtCore.QElapsedTimer()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.CoarseTimer)
+        self.timer.timeout.connect(self.step)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super(EffectSkyWidget, self).showEvent(event)
+        self.clock.start()
+        self.timer.start(self.frame_interval)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        super(EffectSkyWidget, self).hideEvent(event)
+        self.timer.stop()
+
+    def spawn(self, count=1):
         """
-        Create flowing image.
+        Create flowing images at random positions, they fall to the bottom and fade out.
+
+        Args:
+            count: The number of flakes.
 
         """
 
         # DEBUG
         if constants.DEBUG_EFFECT_SNOW:
-            print("1-Debug:    snow_create function running")
-        # create snow widget and its path
-        snow_widget = SnowWidget(self)
-        opacity_snow = QtWidgets.QGraphicsOpacityEffect(snow_widget)
-        run_path = QtCore.QPropertyAnimation(snow_widget, b"pos")
-        opacity_path = QtCore.QPropertyAnimation(opacity_snow, b"opacity")
-        self.path_list.append(QtCore.QParallelAnimationGroup())
-        self.snow_falling(snow_widget, run_path, opacity_path, self.path_list[self.index])
-        self.index += 1
-
-    def snow_falling(self, snow_widget, run_path, opacity_path, path_group):
+            print("1-Debug:    snow spawn running")
+        width, height = max(self.width(), 1), max(self.height(), 1)
+        position = self.random.uniform((0, 0), (width, height), (count, 2))
+        life = self.random.uniform(*self.life_time, count)
+        velocity = np.zeros((count, 2))
+        velocity[:, 1] = (height - position[:, 1]) / life
+
+        self.position = np.concatenate((self.position, position))
+        self.velocity = np.concatenate((self.velocity, velocity))
+        self.flake_size = np.concatenate((self.flake_size, self.random.choice(self.sizes, count, p=(0.3, 0.3, 0.4))))
+        self.opacity = np.concatenate((self.opacity, np.ones(count)))
+        self.age = np.concatenate((self.age, np.zeros(count)))
+        self.life = np.concatenate((self.life, life))
+        self.fade = np.concatenate((self.fade, self.random.uniform(*self.life_time, count)))
+
+    def step(self):
         """
-        Falling image.
-
-        Args:
-            snow_widget: The flowing image.
-            run_path: The flowing path.
-            opacity_path: The opacity.
-            path_group: The start object.
+        Advance every flake by the time since the last frame and repaint where they were and are.
 
         """
 
-        # DEBUG
-        if constants.DEBUG_EFFECT_SNOW:
-            print("2-Debug:    snow_falling function running")
-        # pos and size
-        start_x = random.randint(0, int(self.width()))
-        start_y = random.randint(0, int(self.height()))
-        random_size = random.randint(0, 9)
-        width = 24 if random_size >= 6 else (18 if random_size >= 3 else 12)
-        height = 24 if random_size >= 6 else (18 if random_size >= 3 else 12)
-        snow_widget.setGeometry(start_x, start_y, width, height)
-        snow_widget.setVisible(True)
-
-        # fall speed
-        fall_time_run_path = random.randint(25000, 30000)
-        fall_time_opacity_path = random.randint(25000, 30000)
-        run_path.setStartValue(QtCore.QPoint(start_x, start_y))
-        run_path.setEndValue(QtCore.QPoint(start_x, self.height()))
-        run_path.setDuration(fall_time_run_path)
-        run_path.setEasingCurve(QtCore.QEasingCurve.InOutCubic)
-        opacity_path.setStartValue(1)
-        opacity_path.setEndValue(0)
-        opacity_path.setDuration(fall_time_opacity_path)
-        path_group.addAnimation(run_path)
-        path_group.addAnimation(opacity_path)
-
-        # falling
-        path_group.start()
-        path_group.finished.connect(lambda: self.snow_end(snow_widget, path_group))
-
-    def snow_end(self, snow_widget, path_group):
+        if self.window().isMinimized():
+            self.clock.restart()
+            return
+        # a long pause is not caught up
+        elapsed = min(self.clock.restart() / 1000, 0.5)
+
+        self.spawn_elapsed += elapsed
+        while self.spawn_elapsed >= self.spawn_interval:
+            self.spawn_elapsed -= self.spawn_interval
+            self.spawn()
+
+        if not len(self.age):
+            return
+        dirty = self.dirty_region()
+        self.position += self.velocity * elapsed
+        self.age += elapsed
+        self.opacity = np.clip(1 - self.age / self.fade, 0, 1)
+
+        alive = self.age < self.life
+        if not alive.all():
+            self.position = self.position[alive]
+            self.velocity = self.velocity[alive]
+            self.flake_size = self.flake_size[alive]
+            self.opacity = self.opacity[alive]
+            self.age = self.age[alive]
+            self.life = self.life[alive]
+            self.fade = self.fade[alive]
+            # DEBUG
+            if constants.DEBUG_EFFECT_SNOW:
+                print("3-Debug:    delete snow successfully")
+        self.update(dirty + self.dirty_region())
+
+    def dirty_region(self):
         """
-        Delete the finished image.
-
-        Args:
-            snow_widget:
-            path_group:
+        The region covered by the flakes.
 
         Returns:
+            region: QRegion.
 
         """
-        sip.delete(snow_widget)
-        self.index -= 1
-        self.path_list.remove(path_group)
-        if constants.DEBUG_EFFECT_SNOW:
-            print("3-Debug:    delete snow widget successfully")
-
 
-class SnowWidget(QtWidgets.QWidget):
-    image_path = constants.flowing_image
+        region = QtGui.QRegion()
+        for (x, y), size in zip(self.position.astype(int).tolist(), self.flake_size.tolist()):
+            region += QtCore.QRect(x, y, size + 1, size + 1)
+        return region
 
-    def __init__(self, parent=None):
+    def pixmap(self, size):
         """
-        Create flowing image.
+        The flowing image scaled to a flake size, cached until the image changes.
 
         Args:
-            parent: Parent item.
-        """
-
-        super(SnowWidget, self).__init__(parent)
+            size: The flake size.
 
-    def change_image_path(self, path):
-        """
-        Change the flowing image.
-
-        Args:
-            path: relative path of The flowing image path.
+        Returns:
+            pixmap: QPixmap.
 
         """
 
-        self.image_path = path
-        self.update()
+        if self.pixmaps_path != EffectSkyWidget.image_path:
+            self.pixmaps = dict()
+            self.pixmaps_path = EffectSkyWidget.image_path
+        if size not in self.pixmaps:
+            self.pixmaps[size] = QtGui.QPixmap(os.path.join(constants.work_dir, self.pixmaps_path)).scaled(
+                size, size, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+        return self.pixmaps[size]
 
     def paintEvent(self, event):
         """
-        Draw the flowing image.
+        Draw every flowing image.
 
         Args:
             event: QPaintevent.
 
         """
-        
-        super().paintEvent(event)
+
+        if not len(self.age):
+            return
         painter = QtGui.QPainter(self)
-        painter.drawPixmap(self.rect(), QtGui.QPixmap(os.path.join(constants.work_dir, self.image_path)), QtCore.QRect())
+        for (x, y), size, opacity in zip(self.position.tolist(), self.flake_size.tolist(), self.opacity.tolist()):
+            painter.setOpacity(opacity)
+            painter.drawPixmap(QtCore.QPointF(x, y), self.pixmap(size))
+        painter.end()
@@ -0,0 +1,284 @@
+"""
+minimap.py - The thumbnail of the current scene used to navigate it quickly.
+"""
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+__all__ = ["Minimap", "MinimapThread"]
+
+
+class MinimapThread(QtCore.QThread):
+    """
+    Render scene models into images off the GUI thread.
+    A model requested while another one is rendered replaces the waiting one.
+
+    """
+
+    rendered = QtCore.pyqtSignal(QtGui.QImage)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent=parent)
+        self.mutex = QtCore.QMutex()
+        self.condition = QtCore.QWaitCondition()
+        # the model waiting to be rendered
+        self.pending = None
+        self.stop_flag = False
+
+    def request(self, model):
+        """
+        Queue a model, it replaces the model which is not rendered yet.
+
+        Args:
+            model: (width, height, area, nodes, pipes, viewport) of plain values, see Minimap.scene_model.
+
+        """
+
+        self.mutex.lock()
+        self.pending = model
+        self.stop_flag = False
+        self.condition.wakeOne()
+        self.mutex.unlock()
+        if not self.isRunning():
+            self.start()
+
+    def finish(self):
+        """
+        Drop the waiting model and stop the thread.
+
+        """
+
+        self.mutex.lock()
+        self.pending = None
+        self.stop_flag = True
+        self.condition.wakeOne()
+        self.mutex.unlock()
+        self.wait()
+
+    def run(self):
+        while True:
+            self.mutex.lock()
+            while self.pending is None and not self.stop_flag:
+                self.condition.wait(self.mutex)
+            model, self.pending = self.pending, None
+            self.mutex.unlock()
+
+            if model is None:
+                return
+            self.rendered.emit(self.render(model))
+
+    @staticmethod
+    def render(model):
+        """
+        Draw node rects, pipe polylines and the visible area.
+
+        Args:
+            model: (width, height, area, nodes, pipes, viewport).
+
+        Returns:
+            image: QImage.
+
+        """
+
+        width, height, area, nodes, pipes, viewport = model
+        image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtGui.QColor(255, 255, 255, 120))
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.scale(width / area[2], height / area[3])
+        painter.translate(-area[0], -area[1])
+
+        # pipes
+        for rgba, points in pipes:
+            pen = QtGui.QPen(QtGui.QColor.fromRgba(rgba), 0)
+            painter.setPen(pen)
+            painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in points]))
+
+        # nodes
+        painter.setPen(QtCore.Qt.NoPen)
+        for rgba, (x, y, w, h) in nodes:
+            painter.setBrush(QtGui.QColor.fromRgba(rgba))
+            painter.drawRect(QtCore.QRectF(x, y, w, h))
+
+        # visible area
+        painter.setBrush(QtGui.QColor(254, 207, 42, 40))
+        painter.setPen(QtGui.QPen(QtGui.QColor(254, 207, 42), 0))
+        painter.drawRect(QtCore.QRectF(*viewport))
+        painter.end()
+        return image
+
+
+class Minimap(QtWidgets.QLabel):
+    """
+    Thumbnail of the current scene of the view.
+        - The scene is reduced to node rects and pipe polylines, rendered by MinimapThread.
+        - It is rendered again only after the scene reported a changed region or the view moved,
+          and only when the reduced scene differs from the last one.
+        - Click or drag on it to move the view there.
+
+    """
+
+    interval = 500
+
+    def __init__(self, view, parent=None):
+        """
+        Create the minimap.
+
+        Args:
+            view: The root manager.
+            parent: Parent widget.
+
+        """
+
+        super(Minimap, self).__init__(parent)
+        self.view = view
+        self.setAlignment(QtCore.Qt.AlignCenter)
+        self.setCursor(QtCore.Qt.PointingHandCursor)
+
+        # dirty tracking
+        self.scene = None
+        self.dirty_rect = QtCore.QRectF()
+        self.dirty_flag = True
+        self.model = None
+        self.timer_id = 0
+
+        # render thread
+        self.render_thread = MinimapThread(self)
+        self.render_thread.rendered.connect(self.show_image)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super(Minimap, self).showEvent(event)
+        self.view.horizontalScrollBar().valueChanged.connect(self.view_changed)
+        self.view.verticalScrollBar().valueChanged.connect(self.view_changed)
+        self.dirty_flag = True
+        self.update_model()
+        self.timer_id = self.startTimer(self.interval, QtCore.Qt.VeryCoarseTimer)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        super(Minimap, self).hideEvent(event)
+        if not self.timer_id:
+            return
+        self.killTimer(self.timer_id)
+        self.timer_id = 0
+        self.view.horizontalScrollBar().valueChanged.disconnect(self.view_changed)
+        self.view.verticalScrollBar().valueChanged.disconnect(self.view_changed)
+        self.track_scene(None)
+        self.model = None
+
+    def track_scene(self, scene):
+        """
+        Listen to the changed regions of the scene shown by the view.
+
+        Args:
+            scene: The current scene or None.
+
+        """
+
+        if self.scene is scene:
+            return
+        if self.scene is not None:
+            try:
+                self.scene.changed.disconnect(self.scene_changed)
+            except TypeError:
+                pass
+        self.scene = scene
+        if scene is not None:
+            scene.changed.connect(self.scene_changed)
+        self.dirty_flag = True
+
+    def scene_changed(self, regions):
+        for rect in regions:
+            self.dirty_rect = self.dirty_rect.united(rect)
+
+    def view_changed(self):
+        self.dirty_flag = True
+
+    def timerEvent(self, event: QtCore.QTimerEvent) -> None:
+        if event.timerId() == self.timer_id:
+            self.update_model()
+        else:
+            super(Minimap, self).timerEvent(event)
+
+    def update_model(self):
+        """
+        Render the scene again when it is dirty and its reduced model changed.
+
+        """
+
+        self.track_scene(self.view.current_scene)
+        if not self.dirty_flag and self.dirty_rect.isEmpty():
+            return
+        self.dirty_flag = False
+        self.dirty_rect = QtCore.QRectF()
+
+        model = self.scene_model()
+        if model != self.model:
+            self.model = model
+            self.render_thread.request(model)
+
+    def scene_model(self):
+        """
+        Reduce the scene to plain values which the render thread can use.
+
+        Returns:
+            model: (width, height, area, nodes, pipes, viewport)
+                - area: (x, y, width, height) of the scene rect.
+                - nodes: ((rgba, (x, y, width, height)), ...) of attribute and logic widgets.
+                - pipes: ((rgba, ((x, y), ...)), ...).
+                - viewport: (x, y, width, height) of the visible scene area.
+
+        """
+
+        scene = self.scene
+        size = self.size() - QtCore.QSize(10, 10)
+        area = scene.scene_rect
+        # the items still in the scene, each one once
+        items = {kind: [item for item in dict.fromkeys(scene.id_items[kind].values()) if item.scene() is scene]
+                 for kind in ("attr", "logic", "pipe")}
+        nodes = []
+        for item in items["attr"]:
+            rect = item.sceneBoundingRect()
+            nodes.append((item.color.rgba(), (rect.x(), rect.y(), rect.width(), rect.height())))
+        for item in items["logic"]:
+            rect = item.sceneBoundingRect()
+            nodes.append((item.background_color.rgba(), (rect.x(), rect.y(), rect.width(), rect.height())))
+        pipes = []
+        for item in items["pipe"]:
+            points = (item.pos_source, item.source_item.scenePos(), item.destination_item.scenePos(),
+                      item.pos_destination)
+            pipes.append((item.color.rgba(), tuple((point.x(), point.y()) for point in points)))
+        viewport = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        return (max(size.width(), 1), max(size.height(), 1),
+                (area.x(), area.y(), area.width(), area.height()),
+                tuple(nodes), tuple(pipes),
+                (viewport.x(), viewport.y(), viewport.width(), viewport.height()))
+
+    def show_image(self, image):
+        if self.isVisible():
+            self.setPixmap(QtGui.QPixmap.fromImage(image))
+
+    def navigate(self, position):
+        """
+        Center the view on the scene position under the cursor.
+
+        Args:
+            position: The position in the minimap.
+
+        """
+
+        if not self.model:
+            return
+        width, height, area = self.model[:3]
+        x = (position.x() - (self.width() - width) / 2) / width
+        y = (position.y() - (self.height() - height) / 2) / height
+        self.view.centerOn(area[0] + min(max(x, 0), 1) * area[2], area[1] + min(max(y, 0), 1) * area[3])
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        if event.button() == QtCore.Qt.LeftButton:
+            self.navigate(event.pos())
+        event.accept()
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
+        if event.buttons() & QtCore.Qt.LeftButton:
+            self.navigate(event.pos())
+        event.accept()
@@ -0,0 +1,110 @@
+"""
+palette.py - Jump to a node, a sub scene, a todo or a file by typing a part of its name.
+"""
+
+from PyQt5 import QtWidgets, QtCore
+
+
+__all__ = ["Palette"]
+
+
+class Palette(QtWidgets.QWidget):
+    """
+    Ctrl+P command palette of the root view.
+        - The matches are ranked by the trigram index of the root view and shown as you type.
+        - Up and Down choose a match, Enter or a click jumps to it, Escape closes the palette.
+
+    """
+
+    limit = 50
+
+    def __init__(self, view, parent=None):
+        """
+        Create the palette.
+
+        Args:
+            view: The root manager.
+            parent: Parent widget.
+
+        """
+
+        super(Palette, self).__init__(parent)
+        self.view = view
+        self.setVisible(False)
+
+        self.input_widget = QtWidgets.QLineEdit(self)
+        self.input_widget.setPlaceholderText("Jump to node, scene, todo or file")
+        self.input_widget.installEventFilter(self)
+        self.result_widget = QtWidgets.QListWidget(self)
+        self.result_widget.setFocusPolicy(QtCore.Qt.NoFocus)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.input_widget)
+        layout.addWidget(self.result_widget)
+        self.setLayout(layout)
+
+        self.input_widget.textChanged.connect(self.update_results)
+        self.result_widget.itemClicked.connect(self.jump)
+
+    def toggle(self):
+        if self.isVisible():
+            self.setVisible(False)
+            return
+        self.setGeometry(self.view.size().width() // 2 - 250, 0, 500, 300)
+        self.view.update_palette_scenes()
+        self.setVisible(True)
+        self.raise_()
+        self.input_widget.setFocus()
+        self.input_widget.selectAll()
+        self.update_results()
+
+    def update_results(self):
+        """
+        Show the best matches of the typed text.
+
+        """
+
+        self.result_widget.clear()
+        text = self.input_widget.text()
+        if not text.strip():
+            return
+        self.view.update_palette_index()
+        for key in self.view.palette_index.query(text, self.limit):
+            kind, title = self.view.palette_entry(key)
+            result = QtWidgets.QListWidgetItem("%s    %s" % (title, kind))
+            result.setData(QtCore.Qt.UserRole, key)
+            self.result_widget.addItem(result)
+        self.result_widget.setCurrentRow(0)
+
+    def jump(self, result=None):
+        """
+        Focus the chosen match and close the palette.
+
+        Args:
+            result: The item of the result list, the current one if it is None.
+
+        """
+
+        result = result or self.result_widget.currentItem()
+        if result is None:
+            return
+        self.setVisible(False)
+        self.view.palette_select(result.data(QtCore.Qt.UserRole))
+
+    def eventFilter(self, watched, event) -> bool:
+        if watched is self.input_widget and event.type() == QtCore.QEvent.KeyPress:
+            if event.key() in (QtCore.Qt.Key_Down, QtCore.Qt.Key_Up):
+                step = 1 if event.key() == QtCore.Qt.Key_Down else -1
+                row = self.result_widget.currentRow() + step
+                if 0 <= row < self.result_widget.count():
+                    self.result_widget.setCurrentRow(row)
+                return True
+            elif event.key() in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+                self.jump()
+                return True
+            elif event.key() == QtCore.Qt.Key_Escape:
+                self.setVisible(False)
+                self.view.setFocus()
+                return True
+        return super(Palette, self).eventFilter(watched, event)
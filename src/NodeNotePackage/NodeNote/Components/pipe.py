@@ -20,12 +20,19 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         - Text.
     """
 
+    # rolling ball
+    ball_radius = 6
+    ball_duration = 2000
+    ball_color = QtGui.QColor(255, 153, 153, 200)
+
     width = constants.pipe_width
     color = constants.pipe_color
     selected_color = constants.pipe_selected_color
     font = constants.pipe_font
     font.setPointSize(6)
     font_color = constants.pipe_font_color
+    # arrow pixmap shared by all pipes
+    arrow_image = None
 
     def __init__(self, start_port=None, end_port=None, node=None):
         """
@@ -54,26 +61,9 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         self.pos_destination = self.pos_source
         self.status = constants.PIPE_STATUS_NEW
 
-        # ANIMATION
-        self.timeline = QtCore.QTimeLine(2000)
-        self.timeline.frameChanged.connect(self.timeline_frame_changed)
-        self.timeline.setLoopCount(0)
-
-        ellips_size = QtCore.QRectF(-5, -5, 10, 10)
-        ellips_color = QtGui.QColor(255, 153, 153, 200)
-        ellips_thickness = 2
-        ellips_pen = QtGui.QPen(ellips_color, ellips_thickness, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap,
-                                QtCore.Qt.RoundJoin)
-        self.ellips_item = QtWidgets.QGraphicsEllipseItem(ellips_size, self)
-        self.ellips_item.setBrush(ellips_color)
-        self.ellips_item.setPen(ellips_pen)
-        if start_port.port_type == constants.OUTPUT_NODE_TYPE:
-            self.ellips_item.setPos(self.path().pointAtPercent(0.0))
-            self.timeline.setFrameRange(0, 100)
-        else:
-            self.ellips_item.setPos(self.path().pointAtPercent(1))
-            self.timeline.setFrameRange(100, 0)
-        self.ellips_item.hide()
+        # ANIMATION, the rolling ball is driven by the animation clock of the scene
+        self.animation_start = 0
+        self.ball_point = None
 
         # EDIT
         self.edit_widget = QtWidgets.QGraphicsWidget(self)
@@ -87,24 +77,58 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         self.edit_layout.addItem(self.edit_box)
         self.edit.setFont(self.font)
         self.edit.setDefaultTextColor(self.font_color)
-        bound_rect_width, bound_rect_height = self.edit.boundingRect().width(), self.edit.boundingRect().height()
-        self.edit_widget.setPos(self.mapToScene(self.path().pointAtPercent(0.5).x() - (bound_rect_width // 2),
-                         self.path().pointAtPercent(0.5).y() - (bound_rect_height // 2)))
+        self.edit.document().contentsChanged.connect(self.update_edit_position)
 
         # CONTROL
         self.choose_first = True
 
         self.source_item = ControlPoint(self)
         self.destination_item = ControlPoint(self)
-        self.show_flag = False
+        self._show_flag = False
         self.control_line_color = QtGui.QColor(128, 205, 255)
 
+        # GEOMETRY, rebuilt when the ports or the control points move
+        self.bounding_rect = QtCore.QRectF()
+        self.arrow_rectf = QtCore.QRectF()
+        self.update_path()
+
         # Style init
         self.width_flag = False
         self.color_flag = False
         self.selected_color_flag = False
         self.font_type_flag = False
         self.font_color_flag = False
+        # the scene style version the style was resolved for
+        self.style_version = -1
+
+    @classmethod
+    def arrow(cls):
+        """
+        The arrow pixmap, loaded once.
+
+        Returns:
+            image: QPixmap.
+
+        """
+
+        if cls.arrow_image is None:
+            cls.arrow_image = QtGui.QPixmap(os.path.abspath(os.path.join(constants.work_dir,
+                                                                         "Resources/Images/arrow.png")))
+        return cls.arrow_image
+
+    @property
+    def show_flag(self):
+        return self._show_flag
+
+    @show_flag.setter
+    def show_flag(self, value):
+        self._show_flag = value
+        self.source_item.setVisible(value)
+        self.destination_item.setVisible(value)
+
+    @property
+    def animating(self):
+        return self.scene() is not None and self.scene().animation_clock.running(self)
 
     def perform_evaluation_feedback(self):
         """
@@ -112,9 +136,9 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
 
         """
 
-        if self.timeline.state() == QtCore.QTimeLine.NotRunning:
-            self.ellips_item.show()
-            self.timeline.start()
+        if self.scene() is not None and not self.animating:
+            self.animation_start = self.scene().animation_clock.now()
+            self.scene().animation_clock.add(self)
 
     def end_evaluation_feedback(self):
         """
@@ -122,24 +146,43 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
 
         """
 
-        if self.timeline.state() == QtCore.QTimeLine.Running:
-            self.ellips_item.hide()
-            self.timeline.stop()
+        if self.animating:
+            self.scene().animation_clock.remove(self)
+            self.update(self.ball_rect())
+            self.ball_point = None
+
+    def ball_rect(self):
+        """
+        The rect of the rolling ball.
 
-    def timeline_frame_changed(self, frame_num):
         """
-        Set the position of the rolling ball.
+
+        if self.ball_point is None:
+            return QtCore.QRectF()
+        return QtCore.QRectF(self.ball_point.x() - self.ball_radius, self.ball_point.y() - self.ball_radius,
+                             2 * self.ball_radius, 2 * self.ball_radius)
+
+    def advance_animation(self, now, visible):
+        """
+        Move the rolling ball, it runs from the output port to the input port every 2 seconds.
 
         Args:
-            frame_num: Effect number.
+            now: Milliseconds of the animation clock.
+            visible: The visible scene rect.
+
+        Returns:
+            rect: The dirty rect or None when the pipe is not visible.
 
         """
 
-        if self.start_port.port_type == constants.OUTPUT_NODE_TYPE:
-            point = self.path().pointAtPercent(float(frame_num) / float(self.timeline.endFrame()))
-        else:
-            point = self.path().pointAtPercent(float(frame_num) / float(self.timeline.startFrame()))
-        self.ellips_item.setPos(point)
+        if not visible.intersects(self.sceneBoundingRect()):
+            return None
+        percent = (now - self.animation_start) % self.ball_duration / self.ball_duration
+        if self.start_port.port_type != constants.OUTPUT_NODE_TYPE:
+            percent = 1 - percent
+        dirty = self.ball_rect()
+        self.ball_point = self.path().pointAtPercent(percent)
+        return self.mapRectToScene(dirty.united(self.ball_rect()))
 
     def get_input_node(self):
         """
@@ -284,70 +327,21 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         else:
             self.pos_destination = self.pos_source
 
-        self.start_port.parentItem().layout.activate()
+        if self.start_port:
+            self.start_port.parentItem().layout.activate()
         if self.end_port:
             self.end_port.parentItem().layout.activate()
 
-    def boundingRect(self) -> QtCore.QRectF:
+        self.update_path()
 
-        src_point = self.mapFromScene(self.pos_source)
-        des_point = self.mapFromScene(self.pos_destination)
-        con1_point = self.mapFromScene(self.source_item.scenePos())
-        con2_point = self.mapFromScene(self.destination_item.scenePos())
-
-        x_min = min(src_point.x(), des_point.x(), con1_point.x(), con2_point.x())
-        y_min = min(src_point.y(), des_point.y(), con1_point.y(), con2_point.y())
-        x_max = max(src_point.x(), des_point.x(), con1_point.x(), con2_point.x())
-        y_max = max(src_point.y(), des_point.y(), con1_point.y(), con2_point.y())
-
-        return QtCore.QRectF(
-            x_min,
-            y_min,
-            abs(x_max - x_min),
-            abs(y_max - y_min),
-        )
-
-    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionGraphicsItem, widget=None) -> None:
+    def update_path(self):
         """
-        Draw widget.
-
-        Args:
-            painter: Draw pen.
-            option: None
-            widget: None
+        Rebuild the path, the control points, the arrow and the bounding rect.
+        Called when the ports or the control points move, paint only draws them.
 
         """
 
-        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing | QtGui.QPainter.SmoothPixmapTransform)
-
-        # Width and color init
-        if self.scene():
-            if self.scene().pipe_style_width and not self.width_flag:
-                self.width = self.scene().pipe_style_width
-            if self.scene().pipe_style_background_color and not self.color_flag:
-                self.color = self.scene().pipe_style_background_color
-            if self.scene().pipe_style_selected_background_color and not self.selected_color_flag:
-                self.selected_color = self.scene().pipe_style_selected_background_color
-            if self.scene().pipe_style_font_type and not self.font_type_flag:
-                self.font = self.scene().pipe_style_font_type
-            if self.scene().pipe_style_font_color and not self.font_color_flag:
-                self.font_color = self.scene().pipe_style_font_color
-        
-        # font
-        if self.edit_widget:
-            if not self.font.family() == self.edit.font().family() or not self.font.pointSize() == self.edit.font().pointSize():
-                self.edit.setFont(self.font)
-            if self.edit.defaultTextColor()!= self.font_color:
-                self.edit.setDefaultTextColor(self.font_color)
-
-        # DEFAULT PEN
-        pen = QtGui.QPen(self.color if not self.isSelected() else self.selected_color)
-        pen.setWidth(self.width)
-
-        # DRAGGING PEN
-        dragging_pen = QtGui.QPen(self.color)
-        dragging_pen.setStyle(QtCore.Qt.DashLine)
-        dragging_pen.setWidth(self.width)
+        self.prepareGeometryChange()
 
         # PATH
         s = self.pos_source
@@ -365,41 +359,20 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
                 ((s.x() < d.x()) and sspos == constants.INPUT_NODE_TYPE):
             s_x *= -1  # > 0, s_y = 0  | < 0
             d_x *= -1  # < 0, d_y = 0  | > 0
-        path = QtGui.QPainterPath(self.pos_source)
 
-        # create ellipse item
-        if not self.source_item.first_flag and not self.destination_item.first_flag:
-            self.source_item.first_flag = True
-            self.destination_item.first_flag = True
-            self.scene().addItem(self.source_item)
-            self.scene().addItem(self.destination_item)
-
-        # control show
-        if self.show_flag:
-            self.source_item.setVisible(True)
-            self.destination_item.setVisible(True)
-        else:
-            self.source_item.setVisible(False)
-            self.destination_item.setVisible(False)
-
-        if not self.source_item.moving:
+        # CONTROL
+        if not self.source_item.moving or not self.start_port:
             self.source_item.setPos(
                 s.x() + s_x, s.y() + s_y)
         else:
             self.source_item.setPos(self.start_port.scenePos() + self.source_item.offect)
-        if not self.destination_item.moving:
+        if not self.destination_item.moving or not self.start_port:
             self.destination_item.setPos(
                 d.x() + d_x, d.y() + d_y)
         else:
             self.destination_item.setPos(self.start_port.scenePos() + self.destination_item.offect)
 
-        # PEN
-        if self.end_port is None or (self.start_flag == constants.INPUT_NODE_START and self.start_port is None):
-            painter.setPen(dragging_pen)
-        else:
-            painter.setPen(pen)
-
-        # DRAW
+        path = QtGui.QPainterPath(self.pos_source)
         path.lineTo(self.source_item.scenePos())
         path.moveTo(self.source_item.scenePos())
         path.lineTo(self.destination_item.scenePos())
@@ -407,27 +380,40 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         path.lineTo(self.pos_destination)
         path.moveTo(self.pos_destination)
         self.setPath(path)
-        painter.setBrush(QtCore.Qt.NoBrush)
-        painter.drawPath(self.path())
 
         # ARROW
-        image = QtGui.QPixmap(os.path.abspath(os.path.join(constants.work_dir, "Resources/Images/arrow.png")))
-        image_rectf = QtCore.QRectF(image.rect().x(), image.rect().y(), image.rect().width(), image.rect().height())
-        target_rectf = QtCore.QRectF(0, 0, 0, 0)
+        image = self.arrow()
         if self.start_flag == constants.OUTPUT_NODE_START or (self.start_flag == constants.INPUT_NODE_START and
                                                               self.start_port is None):
-            target_rectf = QtCore.QRectF(d.x() - image.width() / 2, d.y() - image.height() / 2,
-                                         image.width(), image.height())
+            self.arrow_rectf = QtCore.QRectF(d.x() - image.width() / 2, d.y() - image.height() / 2,
+                                             image.width(), image.height())
         elif self.start_flag == constants.INPUT_NODE_START:
-            target_rectf = QtCore.QRectF(s.x() - image.width() / 2, s.y() - image.height() / 2,
-                                         image.width(), image.height())
-        painter.drawPixmap(target_rectf, image, image_rectf)
+            self.arrow_rectf = QtCore.QRectF(s.x() - image.width() / 2, s.y() - image.height() / 2,
+                                             image.width(), image.height())
+
+        # BOUNDING RECT
+        src_point = self.mapFromScene(self.pos_source)
+        des_point = self.mapFromScene(self.pos_destination)
+        con1_point = self.mapFromScene(self.source_item.scenePos())
+        con2_point = self.mapFromScene(self.destination_item.scenePos())
+
+        x_min = min(src_point.x(), des_point.x(), con1_point.x(), con2_point.x())
+        y_min = min(src_point.y(), des_point.y(), con1_point.y(), con2_point.y())
+        x_max = max(src_point.x(), des_point.x(), con1_point.x(), con2_point.x())
+        y_max = max(src_point.y(), des_point.y(), con1_point.y(), con2_point.y())
+
+        margin = max(self.width / 2, self.ball_radius) + 1
+        self.bounding_rect = QtCore.QRectF(
+            x_min,
+            y_min,
+            abs(x_max - x_min),
+            abs(y_max - y_min),
+        ).adjusted(-margin, -margin, margin, margin).united(self.arrow_rectf)
+        # SHAPE, built when it is asked for
+        self.pipe_shape = None
 
         # EDIT
-        if self.edit_widget:
-            bound_rect_width, bound_rect_height = self.edit.boundingRect().width(), self.edit.boundingRect().height()
-            self.edit_widget.setPos(self.path().pointAtPercent(0.5).x() - (bound_rect_width // 2),
-                            self.path().pointAtPercent(0.5).y() - (bound_rect_height // 2))
+        self.update_edit_position()
 
         # ZVALUE
         if self.start_port and self.end_port:
@@ -435,6 +421,112 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         else:
             self.setZValue(constants.Z_VAL_PIPE)
 
+    def update_edit_position(self):
+        """
+        Center the text on the path.
+
+        """
+
+        if self.edit_widget:
+            bound_rect_width, bound_rect_height = self.edit.boundingRect().width(), self.edit.boundingRect().height()
+            self.edit_widget.setPos(self.path().pointAtPercent(0.5).x() - (bound_rect_width // 2),
+                                    self.path().pointAtPercent(0.5).y() - (bound_rect_height // 2))
+
+    def boundingRect(self) -> QtCore.QRectF:
+        return self.bounding_rect
+
+    def shape(self) -> QtGui.QPainterPath:
+        """
+        The stroked path with the arrow and the control points, so partial viewport updates
+        and hit tests cover everything the pipe draws.
+
+        """
+
+        if self.pipe_shape is None:
+            stroker = QtGui.QPainterPathStroker()
+            stroker.setWidth(max(self.width, 1))
+            self.pipe_shape = stroker.createStroke(self.path())
+            self.pipe_shape.addRect(self.arrow_rectf)
+            radius = ControlPoint.control_point_radius / 2
+            for control_point in (self.source_item, self.destination_item):
+                self.pipe_shape.addEllipse(control_point.pos(), radius, radius)
+            self.pipe_shape = self.pipe_shape.simplified()
+        return self.pipe_shape
+
+    def resolve_style(self):
+        """
+        Resolve the width, colors and font from the scene style once per style version.
+
+        """
+
+        scene = self.scene()
+        if scene.pipe_style_width and not self.width_flag and self.width != scene.pipe_style_width:
+            self.width = scene.pipe_style_width
+            self.update_path()
+        if scene.pipe_style_background_color and not self.color_flag:
+            self.color = scene.pipe_style_background_color
+        if scene.pipe_style_selected_background_color and not self.selected_color_flag:
+            self.selected_color = scene.pipe_style_selected_background_color
+        if scene.pipe_style_font_type and not self.font_type_flag:
+            self.font = scene.pipe_style_font_type
+        if scene.pipe_style_font_color and not self.font_color_flag:
+            self.font_color = scene.pipe_style_font_color
+
+        # font
+        if self.edit_widget:
+            if not self.font.family() == self.edit.font().family() or not self.font.pointSize() == self.edit.font().pointSize():
+                self.edit.setFont(self.font)
+                self.update_edit_position()
+            if self.edit.defaultTextColor() != self.font_color:
+                self.edit.setDefaultTextColor(self.font_color)
+        self.style_version = scene.style_version
+
+    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionGraphicsItem, widget=None) -> None:
+        """
+        Draw widget.
+
+        Args:
+            painter: Draw pen.
+            option: None
+            widget: None
+
+        """
+
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing | QtGui.QPainter.SmoothPixmapTransform)
+
+        # Width and color init
+        if self.scene() and self.style_version != self.scene().style_version:
+            self.resolve_style()
+
+        # PEN
+        if self.end_port is None or (self.start_flag == constants.INPUT_NODE_START and self.start_port is None):
+            # DRAGGING PEN
+            pen = QtGui.QPen(self.color)
+            pen.setStyle(QtCore.Qt.DashLine)
+        else:
+            # DEFAULT PEN
+            pen = QtGui.QPen(self.color if not self.isSelected() else self.selected_color)
+        pen.setWidth(self.width)
+        painter.setPen(pen)
+
+        # DRAW
+        painter.setBrush(QtCore.Qt.NoBrush)
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            # zoomed out, a straight line without the arrow
+            painter.drawLine(self.pos_source, self.pos_destination)
+            return
+        painter.drawPath(self.path())
+
+        # ARROW
+        image = self.arrow()
+        painter.drawPixmap(self.arrow_rectf, image, QtCore.QRectF(image.rect()))
+
+        # ROLLING BALL
+        if self.ball_point is not None:
+            painter.setPen(QtGui.QPen(self.ball_color, 2, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap, QtCore.Qt.RoundJoin))
+            painter.setBrush(self.ball_color)
+            painter.drawEllipse(self.ball_point, self.ball_radius - 1, self.ball_radius - 1)
+
     def serialize(self, pipe_serialization=None):
         """
         Serialization.
@@ -476,21 +568,16 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         pipe_serialization.pipe_flag.append(self.font_type_flag)
         pipe_serialization.pipe_flag.append(self.font_color_flag)
 
-    def deserialize(self, data, hashmap: dict, view=None, flag=True):
+    def restore_state(self, data):
         """
-        Deserialization.
+        Restore control points, text and style from the serialization without touching ports,
+        so it can be replayed on a live pipe.
 
         Args:
             data: Google protobuff object.
-            hashmap: Hashmap.
-            view: The manager.
-            flag: Deserialization times.
 
         """
 
-        # added into current scene and view
-        view.current_scene.addItem(self)
-        view.pipes.append(self)
         # control point
         self.prepareGeometryChange()
         self.source_item.moving = data.source_move_status
@@ -500,9 +587,6 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         self.source_item.offect = QtCore.QPointF(data.offset_start_point[0], data.offset_start_point[1])
         self.destination_item.offect = QtCore.QPointF(data.offset_destination_point[0],
                                                       data.offset_destination_point[1])
-        # id and hashmap
-        self.id = data.pipe_id
-        hashmap[data.pipe_id] = self
         # text
         self.edit.setPlainText(data.pipe_text)
         # style
@@ -528,8 +612,32 @@ class Pipe(QtWidgets.QGraphicsPathItem, serializable.Serializable):
         self.width_flag = data.pipe_flag[0]
         self.color_flag = data.pipe_flag[1]
         self.selected_color_flag = data.pipe_flag[2]
+        self.style_version = -1
 
+        self.update_path()
         self.update()
+
+    def deserialize(self, data, hashmap: dict, view=None, flag=True):
+        """
+        Deserialization.
+
+        Args:
+            data: Google protobuff object.
+            hashmap: Hashmap.
+            view: The manager.
+            flag: Deserialization times.
+
+        """
+
+        # added into current scene and view
+        view.current_scene.addItem(self)
+        view.pipes.append(self)
+        # id and hashmap
+        self.id = data.pipe_id
+        hashmap[data.pipe_id] = self
+        view.current_scene.register_item(self)
+        # control point, text and style
+        self.restore_state(data)
         return True
 
 
@@ -554,7 +662,6 @@ class ControlPoint(QtWidgets.QGraphicsItem):
         super(ControlPoint, self).__init__(pipe_item)
         self.moving = False
         self.control_point_flag = True
-        self.first_flag = False
         self.pipe_item = pipe_item
         self.offect = QtCore.QPointF()
         self.setFlags(QtWidgets.QGraphicsItem.ItemIsSelectable |
@@ -568,14 +675,15 @@ class ControlPoint(QtWidgets.QGraphicsItem):
     def paint(self, painter, option, widget=None) -> None:
         painter.setBrush(self.control_point_color)
         painter.setPen(self.control_point_border_color)
-        painter.drawEllipse(self.boundingRect())
+        painter.drawEllipse(self.boundingRect().adjusted(0.5, 0.5, -0.5, -0.5))
 
     def mouseMoveEvent(self, event: 'QtWidgets.QGraphicsSceneMouseEvent') -> None:
         super(ControlPoint, self).mouseMoveEvent(event)
         self.moving = True
         self.offect = self.scenePos() - self.pipe_item.start_port.scenePos()
+        self.pipe_item.update_path()
 
     def mouseReleaseEvent(self, event: 'QtWidgets.QGraphicsSceneMouseEvent') -> None:
         super(ControlPoint, self).mouseReleaseEvent(event)
         if self.scene().view.undo_flag:
-            self.scene().history.store_history("Change Pipe Control Point")
+            self.scene().history.store_history("Change Pipe Control Point", [self.pipe_item])
@@ -51,6 +51,8 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
         self.hovered_border_color_flag = False
         self.activated_color_flag = False
         self.activated_border_color_flag = False
+        # the scene style version the style was resolved for
+        self.style_version = -1
 
     def get_node(self):
         """
@@ -70,6 +72,8 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
         """
 
         self.pipes.append(pipe_widget)
+        if self.scene():
+            self.scene().graph_stale = True
 
     def remove_pipes(self, pipe_widget):
         """
@@ -82,6 +86,8 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
 
         if pipe_widget in self.pipes:
             self.pipes.remove(pipe_widget)
+            if self.scene():
+                self.scene().graph_stale = True
 
     def update_pipes_position(self):
         """
@@ -120,6 +126,33 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
                 self.width = self.scene().port_style_width
         return QtCore.QSizeF(self.width, self.width)
 
+    def resolve_style(self):
+        """
+        Resolve the colors and the width from the scene style once per style version,
+        the geometry is only updated when the width changed.
+
+        """
+
+        scene = self.scene()
+        if scene.port_style_color and not self.color_flag:
+            self.color = scene.port_style_color
+        if scene.port_style_border_color and not self.border_color_flag:
+            self.border_color = scene.port_style_border_color
+        if scene.port_style_hovered_color and not self.hovered_color_flag:
+            self.hovered_color = scene.port_style_hovered_color
+        if scene.port_style_hovered_border_color and not self.hovered_border_color_flag:
+            self.hovered_border_color = scene.port_style_hovered_border_color
+        if scene.port_style_activated_color and not self.activated_color_flag:
+            self.activated_color = scene.port_style_activated_color
+        if scene.port_style_activated_border_color and not self.activated_border_color_flag:
+            self.activated_border_color = scene.port_style_activated_border_color
+
+        if scene.port_style_width and not self.width_flag and self.maximumWidth() != scene.port_style_width:
+            self.width = scene.port_style_width
+            self.setMaximumSize(self.width, self.width)
+            self.updateGeometry()
+        self.style_version = scene.style_version
+
     def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionGraphicsItem, widget=None) -> None:
         """
         Draw port widget.
@@ -131,25 +164,13 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
 
         """
 
-        # Color init
-        if self.scene().port_style_color and not self.color_flag:
-            self.color = self.scene().port_style_color
-        if self.scene().port_style_border_color and not self.border_color_flag:
-            self.border_color = self.scene().port_style_border_color
-        if self.scene().port_style_hovered_color and not self.hovered_color_flag:
-            self.hovered_color = self.scene().port_style_hovered_color
-        if self.scene().port_style_hovered_border_color and not self.hovered_border_color_flag:
-            self.hovered_border_color = self.scene().port_style_hovered_border_color
-        if self.scene().port_style_activated_color and not self.activated_color_flag:
-            self.activated_color = self.scene().port_style_activated_color
-        if self.scene().port_style_activated_border_color and not self.activated_border_color_flag:
-            self.activated_border_color = self.scene().port_style_activated_border_color
-
-        # Size init
-        if self.scene().port_style_width and not self.width_flag:
-            self.width = self.scene().port_style_width
-            self.setMaximumSize(self.width, self.width)
-            self.updateGeometry()
+        # zoomed out, the ports are too small to hit
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            return
+
+        # Style init
+        if self.style_version != self.scene().style_version:
+            self.resolve_style()
 
         # SIZE
         rect_width = self.width / 1.8
@@ -297,6 +318,7 @@ class Port(QtWidgets.QGraphicsWidget, serializable.Serializable):
             self.hovered_border_color_flag = data.port_flag[4]
             self.activated_color_flag = data.port_flag[5]
             self.activated_border_color_flag = data.port_flag[6]
+            self.style_version = -1
 
         else:
             # deserialize pipes
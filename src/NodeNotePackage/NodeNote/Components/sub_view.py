@@ -3,7 +3,7 @@ sub_view.py - Create sub view manager.
 """
 
 
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 from ..GraphicsView import view
 from ..Model import constants, serializable
 
@@ -56,6 +56,20 @@ class ProxyView(QtWidgets.QGraphicsProxyWidget, serializable.Serializable):
         self.item_row = 0
         self.item_column = 0
 
+        # level of detail, the sub view grabbed once when zoomed out
+        self.snapshot = None
+
+    def paint(self, painter: QtGui.QPainter, option, widget=None) -> None:
+        if QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < constants.LOD_SCALE:
+            # zoomed out, the cached snapshot instead of the whole sub view
+            if self.snapshot is None:
+                self.snapshot = self.sub_view_widget.grab()
+            painter.drawPixmap(self.boundingRect(), self.snapshot, QtCore.QRectF(self.snapshot.rect()))
+            return
+        # a new snapshot is grabbed next time, the sub view may have changed
+        self.snapshot = None
+        super(ProxyView, self).paint(painter, option, widget)
+
     def mousePressEvent(self, event: 'QtWidgets.QGraphicsSceneMouseEvent') -> None:
         super(ProxyView, self).mousePressEvent(event)
         self.root_window.view_widget.current_scene.clearSelection()
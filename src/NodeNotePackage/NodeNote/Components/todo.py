@@ -25,6 +25,8 @@ class Todo(BaseWidget, serializable.Serializable):
     """
 
     close_flag = False  # Used to store time when the note window was closed
+    # the clock only counts seconds, the animation clock of the scene ticks it once a second
+    animation_interval = 1000
 
     def __init__(self, parent=None):
         """
@@ -47,6 +49,8 @@ class Todo(BaseWidget, serializable.Serializable):
         self.control_layout = QtWidgets.QGraphicsLinearLayout(QtCore.Qt.Horizontal)
 
         self.edit = QtWidgets.QLineEdit("task")
+        self.edit.textEdited.connect(self.task_edited)
+        self.edit.textChanged.connect(self.palette_changed)
 
         self.time_show = QtWidgets.QLabel("0:0:0 + 0:0:0")
         self.time_show.setObjectName("todo_label")
@@ -89,8 +93,8 @@ class Todo(BaseWidget, serializable.Serializable):
         self.total_time = 0
         self.start_time = 0
         self.use_time = 0
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.time_update)
+        # the time text is refreshed by the animation clock of the scene every second
+        self.next_update = 0
         self.time_button.pressed.connect(self.turn_start if self.start else self.turn_pause)
 
         # layout
@@ -113,10 +117,23 @@ class Todo(BaseWidget, serializable.Serializable):
         selected_pen = QtGui.QPen(AttributeWidget.selected_border_color, 0.5)
         painter.setPen(pen if not self.isSelected() else selected_pen)
         painter.setBrush(QtCore.Qt.NoBrush)
-        painter.drawRoundedRect(0, 0, self.size().width(), self.size().height(), 5, 5)
+        painter.drawRoundedRect(QtCore.QRectF(0, 0, self.size().width(), self.size().height()).adjusted(
+            0.25, 0.25, -0.25, -0.25), 5, 5)
 
         painter.restore()
 
+    def palette_text(self):
+        return self.edit.text()
+
+    def palette_changed(self):
+        # the palette reads the task again before its next query
+        if self.scene():
+            self.scene().view.mark_palette(self)
+
+    def task_edited(self):
+        # typed by the user, setting the task while loading keeps the scene clean
+        self.mark_dirty()
+
     def turn_start(self):
         """
         Start clock of this time.
@@ -124,9 +141,12 @@ class Todo(BaseWidget, serializable.Serializable):
         """
 
         self.time_button.setIcon(self.pause_png)
-        self.timer.start(1000)
         self.start_time = time.time()
+        if self.scene():
+            self.next_update = 0
+            self.scene().animation_clock.add(self)
         self.time_button.pressed.connect(self.turn_pause)
+        self.mark_dirty()
 
     def turn_pause(self):
         """
@@ -135,11 +155,35 @@ class Todo(BaseWidget, serializable.Serializable):
         """
 
         self.time_button.setIcon(self.start_png)
-        self.timer.stop()
+        if self.scene():
+            self.scene().animation_clock.remove(self)
         self.time_button.pressed.connect(self.turn_start)
         self.total_time += self.use_time
         self.start_time = time.time()
         self.time_update()
+        self.mark_dirty()
+
+    def advance_animation(self, now, visible):
+        """
+        Count the used time every second, the text is only changed while the todo is visible.
+
+        Args:
+            now: Milliseconds of the animation clock.
+            visible: The visible scene rect.
+
+        Returns:
+            rect: None, the time label repaints itself.
+
+        """
+
+        if now < self.next_update:
+            return None
+        self.next_update = now + 1000
+        if visible.intersects(self.sceneBoundingRect()):
+            self.time_update()
+        else:
+            self.use_time = time.time() - self.start_time
+        return None
 
     def time_update(self):
         """
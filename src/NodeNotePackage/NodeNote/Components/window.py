@@ -4,7 +4,7 @@ import os
 from PyQt5 import QtCore, QtGui, QtWebChannel, QtWebEngineWidgets, QtWidgets
 
 from ..Components import (attribute, draw, effect_background, markdown_edit,
-                          pipe, port)
+                          minimap, pipe, port)
 from ..Components.effect_snow import EffectSkyWidget
 from ..GraphicsView.view import View
 from ..Model import constants
@@ -45,6 +45,9 @@ class FileView(QtWidgets.QTreeView):
         create_new_note = context_menu.addAction(QtCore.QCoreApplication.translate("FileView", "create new note"))
         create_new_note.setIcon(QtGui.QIcon(
             os.path.abspath(os.path.join(constants.work_dir, "Resources/Images/create_new_note.png"))))
+        restore_backup = context_menu.addAction(QtCore.QCoreApplication.translate("FileView", "restore backup"))
+        restore_backup.setIcon(QtGui.QIcon(
+            os.path.abspath(os.path.join(constants.work_dir, "Resources/Images/file_view_create.png"))))
         
         action = context_menu.exec_(a0.globalPos())
         if action == delete_dir_file:
@@ -59,6 +62,11 @@ class FileView(QtWidgets.QTreeView):
                 self.mainwindow.load_window.new_note_file(self.mainwindow.file_model.filePath(self.currentIndex()))
             else:
                  self.mainwindow.load_window.new_note_file(self.mainwindow.file_model.filePath(self.currentIndex().parent()))
+        elif action == restore_backup:
+            if self.mainwindow.file_model.isDir(self.currentIndex()):
+                self.mainwindow.load_window.restore_backup(self.mainwindow.file_model.filePath(self.currentIndex()))
+            else:
+                self.mainwindow.load_window.restore_backup(self.mainwindow.file_model.filePath(self.currentIndex().parent()))
     
     def load_new_file(self, model_index: QtCore.QModelIndex):
         if not self.mainwindow.file_model.isDir(model_index) and self.mainwindow.file_model.fileName(model_index).endswith(".note"):
@@ -428,10 +436,9 @@ class NoteWindow(QtWidgets.QMainWindow):
         self.central_widget.addWidget(self.view_widget)
 
         # thumbnails
-        self.thumbnails = QtWidgets.QLabel(self.view_widget)
+        self.thumbnails = minimap.Minimap(self.view_widget, self.view_widget)
         self.thumbnails.setGeometry(0, 0, 300, 300)
         self.thumbnails.hide()
-        self.time_id = 0
 
         # markdown
         #   web engine
@@ -468,9 +475,9 @@ class NoteWindow(QtWidgets.QMainWindow):
 
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
 
-        self.view_widget.run_thumbnails.killTimer(self.time_id) 
-        self.view_widget.run_thumbnails.exit(0)
-        
+        self.thumbnails.hide()
+        self.thumbnails.render_thread.finish()
+
         self.load_window.closeEvent(a0)
 
     def color_label_changed(self, label: QtWidgets.QLabel, color):
@@ -514,6 +521,34 @@ class NoteWindow(QtWidgets.QMainWindow):
         label.setText(QtCore.QCoreApplication.translate("NoteWindow", "Width: "))
         label.setText(label.text() + str(width))
 
+    def invalidate_style(self, current_index):
+        """
+        Make the widgets resolve the changed style again, in every scene for the default style.
+
+        Args:
+            current_index: The current drop-down box index on the top of the style list.
+
+        """
+
+        if current_index == 0:
+            self.view_widget.current_scene.all_styles_changed()
+        else:
+            self.view_widget.current_scene.style_changed()
+
+    def store_style_history(self, current_index):
+        """
+        Store the style change of the current scene or of the selected items.
+
+        Args:
+            current_index: The current drop-down box index on the top of the style list.
+
+        """
+
+        if current_index in (1, 2) and self.view_widget.undo_flag:
+            self.view_widget.current_scene.history.store_history(
+                "Style Changed",
+                self.view_widget.current_scene.selectedItems() + [self.view_widget.current_scene])
+
     def color_changed(self, widget_type, current_index):
         """
         Change the color of the widgets of all or of scene or of selected items.
@@ -1032,6 +1067,9 @@ class NoteWindow(QtWidgets.QMainWindow):
             for item in child_view.sub_view_widget_view.current_scene.items():
                 item.update()
 
+        self.invalidate_style(current_index)
+        self.store_style_history(current_index)
+
     def font_changed(self, widget_type, current_index):
         """
         Change the font of widgets of all or current scene or selected items.
@@ -1090,7 +1128,9 @@ class NoteWindow(QtWidgets.QMainWindow):
                             item.font = font_type
                             item.edit.setFont(font_type)
                 self.font_label_changed(self.pipe_style_font_type_label, font_type)
-                    
+
+        self.invalidate_style(current_index)
+        self.store_style_history(current_index)
 
     def width_changed(self, widget_type, current_index):
         """
@@ -1109,6 +1149,8 @@ class NoteWindow(QtWidgets.QMainWindow):
                 if current_index == 0:
                     pipe.Pipe.width = width
                     self.width_label_changed(self.pipe_style_width_label, pipe.Pipe.width)
+                    for item in self.view_widget.pipes:
+                        item.update_path()
 
                 elif current_index == 1:
                     self.view_widget.current_scene.pipe_style_width = width
@@ -1120,6 +1162,7 @@ class NoteWindow(QtWidgets.QMainWindow):
                         if isinstance(item, pipe.Pipe):
                             item.width = width
                             item.width_flag = True
+                            item.update_path()
                             self.width_label_changed(self.pipe_style_width_label, width)
 
         elif widget_type == "Port_width":
@@ -1155,7 +1198,10 @@ class NoteWindow(QtWidgets.QMainWindow):
                 draw.Draw.pen_width = width
                 draw.SideDraw.pen_width = width
                 self.width_label_changed(self.draw_style_width_label, width)
-    
+
+        self.invalidate_style(current_index)
+        self.store_style_history(current_index)
+
     def path_changed(self, current_index=0, window_style=False):
         """
         Update background image path.
@@ -1178,7 +1224,8 @@ class NoteWindow(QtWidgets.QMainWindow):
                             scene_flag = iterator.value()
                             iterator += 1
                             scene = scene_flag.data(0, QtCore.Qt.ToolTipRole)
-                            if not scene.background_image_flag:
+                            # serialized sub scenes get the new background when they are materialized
+                            if scene and not scene.background_image_flag:
                                 scene.background_image.change_svg(os.path.relpath(filename, constants.work_dir))
 
                     elif current_index == 1:
@@ -1791,14 +1838,7 @@ class NoteWindow(QtWidgets.QMainWindow):
             self.redirect_last_scene()
             return
         if a0.key() == QtCore.Qt.Key_B and int(a0.modifiers()) & QtCore.Qt.ShiftModifier:
-            if self.thumbnails.isVisible():
-                self.view_widget.run_thumbnails.wait()
-                self.view_widget.run_thumbnails.killTimer(self.time_id)
-                self.thumbnails.hide()
-            else:
-                self.view_widget.run_thumbnails.run()
-                self.time_id = self.view_widget.run_thumbnails.startTimer(500, timerType=QtCore.Qt.VeryCoarseTimer)
-                self.thumbnails.show()
+            self.thumbnails.setVisible(not self.thumbnails.isVisible())
             return
         if a0.key() == QtCore.Qt.Key_B and int(a0.modifiers()) & QtCore.Qt.ControlModifier:
             if self.toolbar.isVisible():
@@ -14,7 +14,7 @@ from ..Components.attribute import AttributeWidget
 from ..Components.todo import Todo
 from ..Components.window import NoteWindow
 from ..GraphicsView.scene import Scene
-from ..Model import constants, serialize_pb2
+from ..Model import backup_store, constants, note_file, serializable, serialize_pb2
 
 
 class ReadOnlyDeletgate(QtWidgets.QItemDelegate):
@@ -48,6 +48,155 @@ class RuntimeStylesheets():
             pass
 
 
+class SaveThread(QtCore.QThread):
+    """
+    Write snapshots and journal records of notes off the GUI thread.
+    A snapshot requested while another one is written replaces the waiting one of the same note,
+    together with the journal records queued before it.
+
+    """
+
+    saved = QtCore.pyqtSignal(str)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent=parent)
+        self.mutex = QtCore.QMutex()
+        self.condition = QtCore.QWaitCondition()
+        # {path: (view serialization, sub scene segments, backup directory)} waiting to be written
+        self.pending = {}
+        # {path: {(kind, scene id): (attribute id, protobuff object)}} waiting to be journaled
+        self.pending_journal = {}
+        self.stop_flag = False
+
+    def request(self, path, view_serialization, backup_dir="", sub_scenes=()):
+        """
+        Queue a snapshot, it replaces the snapshot and journal records of the note which are not written yet.
+
+        Args:
+            path: absolute path.
+            view_serialization: The protobuff object, owned by the thread from now on.
+            backup_dir: absolute path of the backup store, empty for no backup.
+            sub_scenes: [(scene id, attribute id, bytes)], sub scene segments written as they are.
+
+        """
+
+        self.mutex.lock()
+        self.pending[path] = (view_serialization, sub_scenes, backup_dir)
+        self.pending_journal.pop(path, None)
+        self.wake()
+
+    def request_journal(self, path, records):
+        """
+        Queue journal records, a record replaces the waiting record of the same scene and moves after
+        the other waiting records, so a tombstone and a later record of its scene keep their order.
+
+        Args:
+            path: absolute path.
+            records: [(kind, scene id, attribute id, protobuff object or None)], owned by the thread from now on.
+
+        """
+
+        self.mutex.lock()
+        journal = self.pending_journal.setdefault(path, {})
+        for kind, scene_id, attribute_id, serialization in records:
+            journal.pop((kind, scene_id), None)
+            journal[(kind, scene_id)] = (attribute_id, serialization)
+        self.wake()
+
+    def wake(self):
+        """
+        Wake the thread, the mutex is locked by the caller.
+
+        """
+
+        self.stop_flag = False
+        self.condition.wakeOne()
+        self.mutex.unlock()
+        if not self.isRunning():
+            self.start()
+
+    def busy(self, path):
+        self.mutex.lock()
+        pending = path in self.pending or path in self.pending_journal
+        self.mutex.unlock()
+        return pending
+
+    def finish(self):
+        """
+        Write the waiting snapshots and stop the thread.
+
+        """
+
+        self.mutex.lock()
+        self.stop_flag = True
+        self.condition.wakeOne()
+        self.mutex.unlock()
+        self.wait()
+
+    def run(self):
+        while True:
+            self.mutex.lock()
+            while not self.pending and not self.pending_journal and not self.stop_flag:
+                self.condition.wait(self.mutex)
+            pending, self.pending = self.pending, {}
+            pending_journal, self.pending_journal = self.pending_journal, {}
+            self.mutex.unlock()
+
+            if not pending and not pending_journal:
+                return
+            # snapshots first, the journal records were queued after them
+            for path, (view_serialization, sub_scenes, backup_dir) in pending.items():
+                try:
+                    self.write(path, view_serialization, backup_dir, sub_scenes)
+                    self.saved.emit(path)
+                except Exception as e:
+                    self.failed.emit(f"{e}")
+            for path, journal in pending_journal.items():
+                try:
+                    note_file.append_journal(path, [(kind, scene_id, attribute_id,
+                                                     serialization.SerializeToString() if serialization else b"")
+                                                    for (kind, scene_id), (attribute_id, serialization)
+                                                    in journal.items()])
+                    self.saved.emit(path)
+                except Exception as e:
+                    self.failed.emit(f"{e}")
+
+    @staticmethod
+    def write(path, view_serialization, backup_dir="", sub_scenes=()):
+        """
+        Write into a temporary file, sync it and rename it over the note, then back it up.
+        The journal is compacted into the note.
+
+        Args:
+            path: absolute path.
+            view_serialization: The protobuff object.
+            backup_dir: absolute path of the backup store, empty for no backup.
+            sub_scenes: [(scene id, attribute id, bytes)], sub scene segments written as they are.
+
+        """
+
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            note_file.write_note_file(file, view_serialization, sub_scenes)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        if os.name == "posix":
+            dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        # the journal no longer matches the note
+        note_file.remove_journal(path)
+
+        if backup_dir:
+            store = backup_store.BackupStore(backup_dir)
+            store.backup(path)
+            store.prune()
+
+
 class WorkDirInterface(QtWidgets.QWidget):
     def __init__(self, app, trans) -> None:
         super().__init__()
@@ -108,6 +257,14 @@ class WorkDirInterface(QtWidgets.QWidget):
         self.timer.start(180000)
         self.current_file = ""
 
+        # saving, autosave writes the dirty scenes into the journal and compacts it every few times
+        self.journal_flag = False
+        self.autosave_count = 0
+        self.compact_interval = 10
+        self.save_thread = SaveThread(self)
+        self.save_thread.saved.connect(self.file_saved)
+        self.save_thread.failed.connect(lambda error: QtWidgets.QErrorMessage(self).showMessage(f"Wrong:\n{error}"))
+
         # database
         self.database_connect = None
     
@@ -176,6 +333,8 @@ class WorkDirInterface(QtWidgets.QWidget):
                 #   create Documents which stores markdown documents.
                 if not os.path.exists(os.path.join(work_dir, "Documents")):
                     os.mkdir(os.path.join(work_dir, "Documents"))
+                #   ids are unique in the work dir, the documents and drawings are stored by id.
+                serializable.Serializable.ids.bind(work_dir)
                 #   create database to store markdown text.
                 if self.database_connect:
                     self.database_connect.commit()
@@ -308,9 +467,14 @@ class WorkDirInterface(QtWidgets.QWidget):
         view_serialization = serialize_pb2.ViewSerialization()
 
         # scene
+        ids = serializable.IdAllocator()
+        ids.bind(constants.work_dir)
         root_scene = Scene(self.window.scene_list, self.window.view_widget)
+        root_scene.id = ids.allocate()
         root_scene.serialize(view_serialization.scene_serialization.add())
         view_serialization.current_scene_id = root_scene.id
+        view_serialization.next_id = ids.next_id
+        ids.release()
 
         # style
         view_serialization.style_path = constants.style_path
@@ -354,15 +518,16 @@ class WorkDirInterface(QtWidgets.QWidget):
         if self.window.view_widget.root_flag:
             view_serialization.line_flag = constants.view_line_flag
         view_serialization.undo_flag = constants.view_undo_flag
+        view_serialization.update_mode = constants.view_update_mode
         # flowing image
         view_serialization.flowing_flag = constants.view_flowing_flag
 
         if not path:
             with open(os.path.join(os.path.join(constants.work_dir, "Notes"), "NodeNote_" + str(int(time.time())) + ".note"), "wb") as f:
-                f.write(view_serialization.SerializeToString())  
+                note_file.write_note_file(f, view_serialization)
         else:
             with open(os.path.join(path, "NodeNote_" + str(int(time.time())) + ".note"), "wb") as f:
-                f.write(view_serialization.SerializeToString())  
+                note_file.write_note_file(f, view_serialization)
 
         # load
         if not path:
@@ -371,6 +536,43 @@ class WorkDirInterface(QtWidgets.QWidget):
             file_path = os.path.relpath(os.path.join(path, "NodeNote_" + str(int(time.time())) + ".note"), constants.work_dir)
         self.load_from_file(os.path.join(constants.work_dir, file_path))
     
+    def restore_backup(self, path=""):
+        """
+        Choose a backup and restore it as a new note file in path.
+
+        Args:
+            path: usual work_dir/Notes.
+
+        """
+
+        store = backup_store.BackupStore(os.path.join(constants.work_dir, "History"))
+        snapshots = list(reversed(store.snapshots()))
+        if not snapshots:
+            QtWidgets.QMessageBox.information(self.window,
+                                              QtCore.QCoreApplication.translate("WorkDirInterface", "restore backup"),
+                                              QtCore.QCoreApplication.translate("WorkDirInterface", "No backups."))
+            return
+        labels = [f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['time']))}  {snapshot['name']}"
+                  for snapshot in snapshots]
+        label, ok = QtWidgets.QInputDialog.getItem(self.window,
+                                                   QtCore.QCoreApplication.translate("WorkDirInterface", "restore backup"),
+                                                   QtCore.QCoreApplication.translate("WorkDirInterface", "backup"),
+                                                   labels, 0, False)
+        if not ok:
+            return
+
+        snapshot = snapshots[labels.index(label)]
+        if not path:
+            path = os.path.join(constants.work_dir, "Notes")
+        name = os.path.splitext(os.path.basename(snapshot["name"]))[0]
+        file_path = os.path.join(path, f"{name}_{time.strftime('%Y_%m_%d_%H_%M_%S', time.localtime(snapshot['time']))}.note")
+        try:
+            store.restore(snapshot["snapshot"], file_path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QErrorMessage(self).showMessage(f"Wrong:\n{e}")
+            return
+        self.load_from_file(file_path)
+
     def load_from_file(self, path=None):
         """
         Load .note file and save last file.
@@ -383,14 +585,34 @@ class WorkDirInterface(QtWidgets.QWidget):
         # save last file
         if self.current_file:
             self.save_to_file(self.current_file)
+            if os.path.abspath(path) == os.path.abspath(self.current_file):
+                # read the file after the snapshot is written
+                self.save_thread.finish()
         
-        # load new file
-        with open(path, "rb") as file:
-            view_serialization = serialize_pb2.ViewSerialization()
-            view_serialization.ParseFromString(file.read())
+        # load new file, the files before the container are read by the compatibility reader
+        with note_file.NoteFile(path) as file:
+            # only the root scenes are decoded, the sub scenes are decoded when they are entered
+            view_serialization, sub_scenes = file.read_root_view()
+            # the journal extends containers only, notes without saved ids get new ids
+            self.journal_flag = not file.legacy and view_serialization.HasField("next_id")
+            if view_serialization.HasField("next_id"):
+                serializable.Serializable.ids.restore(view_serialization)
+            else:
+                # the new ids are given through the whole note, then its sub scenes are split again
+                view_serialization = file.read_view()
+                serializable.Serializable.ids.restore(view_serialization)
+                sub_scenes = note_file.split_root(view_serialization)
+            self.window.view_widget.sub_scene_segments = sub_scenes
             self.window.view_widget.deserialize(view_serialization, {}, self.window.view_widget, True)
             self.window.setWindowTitle(path + "-Life")
             self.current_file = path
+            self.autosave_count = 0
+
+        # old notes got new ids, their documents and drawings follow and the note is saved with the new ids
+        if serializable.Serializable.ids.mapping:
+            self.migrate_ids(serializable.Serializable.ids.mapping)
+            serializable.Serializable.ids.mapping = dict()
+            self.save_to_file(path)
         
         # save into last opened file
         if not os.path.exists(os.path.join(constants.work_dir, ".NODENOTE")):
@@ -404,21 +626,97 @@ class WorkDirInterface(QtWidgets.QWidget):
     
     def save_to_file(self, path=None):
         """
-        Save .note and backup .note
+        Save .note and backup .note.
+        The snapshot is taken here, the save thread writes it.
 
         Args:
             path: absolute path
 
         """
 
-        # save file
+        # snapshot
         AttributeWidget.export_sub_scene_flag = True
-        with open(path, 'wb') as file:
-            file.write(self.window.view_widget.serialize())
-        self.window.setWindowTitle(path)
+        view_serialization = serialize_pb2.ViewSerialization()
+        # the serialized sub scenes are written as the segments they were read from
+        sub_scenes = AttributeWidget.sub_scene_segments = list()
+        try:
+            self.window.view_widget.serialize(view_serialization)
+        finally:
+            AttributeWidget.sub_scene_segments = None
+        sub_scenes.extend((scene_id, attribute_id, data) for attribute_id, (scene_id, data)
+                          in self.window.view_widget.sub_scene_segments.items())
+        for scene in self.loaded_scenes():
+            scene.dirty = False
+        self.window.view_widget.dropped_scenes = set()
+        # the saved next id follows the used ids, the rest of the block goes back to the work dir
+        serializable.Serializable.ids.release()
+        self.journal_flag = True
+        self.autosave_count = 0
+
+        # save and backup file
+        self.save_thread.request(path, view_serialization, os.path.join(constants.work_dir, "History"), sub_scenes)
+        self.window.setWindowTitle(path + QtCore.QCoreApplication.translate("WorkDirInterface", " - saving..."))
+
+    def save_to_journal(self, path):
+        """
+        Append the dirty scenes and the styles to the journal of the note.
+        Without undo the changes are not tracked and every loaded scene is written.
+
+        Args:
+            path: absolute path
+
+        """
+
+        view_widget = self.window.view_widget
+        view_serialization = serialize_pb2.ViewSerialization()
+        view_widget.serialize_styles(view_serialization)
+        records = [(note_file.SEGMENT_STYLES, 0, 0, view_serialization)]
+        # the deleted sub scenes are dropped before the scenes written again
+        records.extend((note_file.SEGMENT_DROPPED, scene_id, 0, None) for scene_id in view_widget.dropped_scenes)
+        view_widget.dropped_scenes = set()
+
+        export_sub_scene_flag = AttributeWidget.export_sub_scene_flag
+        AttributeWidget.export_sub_scene_flag = False
+        try:
+            for scene in self.loaded_scenes():
+                if scene.dirty or not view_widget.undo_flag:
+                    scene_serialization = serialize_pb2.ViewSerialization.SceneSerialization()
+                    scene.serialize(scene_serialization)
+                    attribute_id = scene.attribute_widget.id if scene.attribute_widget else 0
+                    records.append((note_file.SEGMENT_SCENE, scene.id, attribute_id, scene_serialization))
+                    scene.dirty = False
+        finally:
+            AttributeWidget.export_sub_scene_flag = export_sub_scene_flag
+
+        self.save_thread.request_journal(path, records)
+        self.window.setWindowTitle(path + QtCore.QCoreApplication.translate("WorkDirInterface", " - saving..."))
+
+    def loaded_scenes(self):
+        """
+        The materialized scenes in scene list.
+
+        """
 
-        # backup file
-        self.copy_file(path, os.path.join(constants.work_dir, os.path.join("History", f"{time.strftime('%Y_%m_%d_%H_%M_%S', time.localtime(time.time()))}" + "_" + os.path.basename(path.replace('\\', os.sep)))))
+        scenes = []
+        iterator = QtWidgets.QTreeWidgetItemIterator(self.window.scene_list)
+        while iterator.value():
+            scene = iterator.value().data(0, QtCore.Qt.ToolTipRole)
+            iterator += 1
+            if scene:
+                scenes.append(scene)
+        return scenes
+
+    def file_saved(self, path):
+        """
+        Leave the saving state when no snapshot is waiting.
+
+        Args:
+            path: absolute path
+
+        """
+
+        if not self.save_thread.busy(path) and path == self.current_file:
+            self.window.setWindowTitle(path)
     
     def save_markdown(self, dict_id: dict, mark_text: str):
         """
@@ -451,6 +749,34 @@ class WorkDirInterface(QtWidgets.QWidget):
                 if constants.DEBUG_MARKDOWN:
                     print(f"Write 3.save_markdown {mark_text}")
     
+    def migrate_ids(self, mapping: dict):
+        """
+        Move the markdown texts, documents and drawings stored by the old ids of a remapped note.
+
+        Args:
+            mapping: {old id: new id}.
+
+        """
+
+        if self.database_connect:
+            database_cursor = self.database_connect.cursor()
+            old_ids = [row[0] for row in database_cursor.execute('SELECT id from markdown').fetchall()
+                       if row[0] in mapping]
+            for old_id in old_ids:
+                database_cursor.execute('UPDATE markdown SET id=? WHERE id=?', (mapping[old_id], old_id))
+            database_cursor.close()
+            self.database_connect.commit()
+
+        for directory, extension in (("Documents", ".md"), ("Assets", ".png")):
+            directory = os.path.join(constants.work_dir, directory)
+            if not os.path.isdir(directory):
+                continue
+            for file_name in os.listdir(directory):
+                name, file_extension = os.path.splitext(file_name)
+                if file_extension == extension and name.isdigit() and int(name) in mapping:
+                    os.replace(os.path.join(directory, file_name),
+                               os.path.join(directory, str(mapping[int(name)]) + extension))
+
     def save_image(self, dict_id: dict, image: draw.Canvas):
         """
         Save attr draw image.
@@ -500,17 +826,22 @@ class WorkDirInterface(QtWidgets.QWidget):
 
     def auto_save(self):
         """
-        Save .note and backup .note
+        Journal the dirty scenes, save .note and backup .note every few times.
 
         """
 
         if self.current_file:
-            self.save_to_file(self.current_file)
+            self.autosave_count += 1
+            if not self.journal_flag or self.autosave_count >= self.compact_interval:
+                self.save_to_file(self.current_file)
+            else:
+                self.save_to_journal(self.current_file)
 
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
         if self.current_file:
             Todo.close_flag = True
             self.save_to_file(self.current_file)
+        self.save_thread.finish()
         if self.database_connect:
             self.database_connect.commit()
             self.database_connect.close()
@@ -2,11 +2,13 @@
 Sets the scene stylesheet and serialization .
 """
 
-import os
+import itertools
+import weakref
 
-from PyQt5 import QtWidgets, QtCore, QtGui
-from ..Components import effect_background, effect_cutline, attribute, pipe, draw, port
-from ..Model import serializable, constants, history
+from PyQt5 import QtWidgets, QtCore, QtGui, sip
+from ..Components import effect_background, effect_cutline, attribute, pipe, draw, port, animation_clock, todo
+from ..Components.background_cache import BackgroundCache
+from ..Model import serializable, constants, history, snap_index, graph_index
 
 __all__ = ["Scene"]
 
@@ -17,6 +19,11 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
     """
 
+    # style versions are unique across scenes, so a widget moved into another scene resolves its style again
+    style_versions = itertools.count(1)
+    # the live scenes, a change of the default style bumps all of them
+    instances = weakref.WeakSet()
+
     def __init__(self, sub_scene_flag, view, attribute_widget=None, parent=None):
         """
         Create the scene which contains many widgets.
@@ -29,6 +36,14 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
         """
 
         super(Scene, self).__init__(parent)
+        # bumped whenever the style of this scene changes,
+        # its widgets resolve their style again when it differs from the version they resolved.
+        self.style_version = next(Scene.style_versions)
+        Scene.instances.add(self)
+        # {kind: {id: item}}, kept by addItem, removeItem and the deserialization of widgets.
+        self.id_items = {"attr": {}, "logic": {}, "port": {}, "pipe": {}}
+        # {item: (kind, id)}, the key each item is indexed by, so a changed id does not leave the old key
+        self.item_keys = {}
         self.view = view
         self.attribute_widget = attribute_widget
         self.scene_rect = QtCore.QRectF(-1000, -1000, 2000, 2000)
@@ -37,6 +52,24 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
         # History
         self.history = history.History(self.view)
+        # changed since the last save or journal write
+        self.dirty = False
+        # pipe and todo animations
+        self.animation_clock = animation_clock.AnimationClock(self)
+
+        # alignment guides
+        self.snap_index = snap_index.SnapIndex()
+        # widgets were added or removed since the snap index was built
+        self.snap_stale = True
+        # widgets moved or resized since their edges were indexed
+        self.snap_moved = set()
+
+        # pipe connections
+        self.graph_index = graph_index.GraphIndex()
+        # {(output widget, input widget): [pipe, ...]}
+        self.graph_pipes = dict()
+        # widgets or pipes were added, removed or reconnected since the graph index was built
+        self.graph_stale = True
 
         # background image
         self.background_image_flag = constants.scene_background_image_flag
@@ -92,8 +125,194 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
         self.port_style_activated_color = None
         self.port_style_activated_border_color = None
         #   =================================================
-        self.draw_image = QtGui.QImage(os.path.abspath(os.path.join(constants.work_dir,
-                                                    "Resources/Images/common_background_image.png")))
+        self.draw_image = BackgroundCache.pixmap("Resources/Images/common_background_image.png")
+
+    def addItem(self, item: QtWidgets.QGraphicsItem) -> None:
+        super(Scene, self).addItem(item)
+        self.register_item(item)
+
+    def removeItem(self, item: QtWidgets.QGraphicsItem) -> None:
+        self.unregister_item(item)
+        super(Scene, self).removeItem(item)
+
+    @staticmethod
+    def item_kind(item):
+        """
+        The kind of an item in the id index.
+
+        Args:
+            item: The graphics item.
+
+        Returns:
+            kind: "attr", "logic", "port", "pipe" or None if it is not indexed.
+
+        """
+
+        if isinstance(item, attribute.AttributeWidget):
+            return "attr"
+        elif isinstance(item, attribute.LogicWidget):
+            return "logic"
+        elif isinstance(item, port.Port):
+            return "port"
+        elif isinstance(item, pipe.Pipe):
+            return "pipe"
+        return None
+
+    def register_item(self, item):
+        """
+        Index the item, its ports and its sub widgets by id.
+        Call it again after the id of the item changes.
+
+        Args:
+            item: The graphics item.
+
+        """
+
+        kind = self.item_kind(item)
+        if kind is not None:
+            last_kind, last_id = self.item_keys.get(item, (kind, item.id))
+            if last_id != item.id and self.id_items[last_kind].get(last_id) is item:
+                del self.id_items[last_kind][last_id]
+            self.id_items[kind][item.id] = item
+            self.item_keys[item] = (kind, item.id)
+        if kind in ("attr", "logic"):
+            self.snap_stale = True
+        if kind in ("attr", "logic", "pipe"):
+            self.graph_stale = True
+        if kind == "attr":
+            self.view.register_node(item)
+        elif isinstance(item, (attribute.AttributeFile, todo.Todo)):
+            self.view.mark_palette(item)
+        for child_item in item.childItems():
+            self.register_item(child_item)
+
+    def unregister_item(self, item):
+        """
+        Remove the item, its ports and its sub widgets from the id index.
+
+        Args:
+            item: The graphics item.
+
+        """
+
+        kind = self.item_kind(item)
+        if kind is not None:
+            last_kind, last_id = self.item_keys.pop(item, (kind, item.id))
+            for key_kind, key_id in {(last_kind, last_id), (kind, item.id)}:
+                if self.id_items[key_kind].get(key_id) is item:
+                    del self.id_items[key_kind][key_id]
+        if kind in ("attr", "logic"):
+            self.snap_stale = True
+        if kind in ("attr", "logic", "pipe"):
+            self.graph_stale = True
+        if kind == "attr":
+            self.view.unregister_node(item)
+        elif isinstance(item, (attribute.AttributeFile, todo.Todo)):
+            self.view.mark_palette(item)
+        for child_item in item.childItems():
+            self.unregister_item(child_item)
+
+    @staticmethod
+    def snap_edges(item):
+        """
+        The edges of a widget the alignment guides snap to.
+
+        Args:
+            item: Attribute widget or logic widget.
+
+        Returns:
+            edges: (top, bottom), (left, right) in scene coordinates.
+
+        """
+
+        position = item.scenePos()
+        rect = item.boundingRect()
+        return (position.y(), position.y() + rect.height()), (position.x(), position.x() + rect.width())
+
+    def snap_item(self, item):
+        """
+        Index the edges of a widget and of its sub widgets again.
+
+        Args:
+            item: The moved or resized widget.
+
+        """
+
+        if self.item_kind(item) in ("attr", "logic"):
+            self.snap_index.set(id(item), *self.snap_edges(item))
+        for child_item in item.childItems():
+            self.snap_item(child_item)
+
+    def update_snap_index(self, excluded):
+        """
+        Bring the snap index up to date before the guides of a dragged widget are queried.
+        The widgets moving with it stay as they were, so the cached answers are reused during the drag.
+
+        Args:
+            excluded: The dragged widget and the widgets moving with it.
+
+        Returns:
+            exclude: frozenset of the index keys of the excluded widgets and their sub widgets.
+
+        """
+
+        exclude = set()
+        items = list(excluded)
+        while items:
+            item = items.pop()
+            exclude.add(id(item))
+            items.extend(item.childItems())
+
+        if self.snap_stale:
+            self.snap_index.clear()
+            for kind in ("attr", "logic"):
+                for item in self.id_items[kind].values():
+                    if item.scene() is self:
+                        self.snap_index.set(id(item), *self.snap_edges(item))
+            self.snap_stale = False
+            self.snap_moved.clear()
+        else:
+            for item in list(self.snap_moved):
+                if id(item) not in exclude:
+                    self.snap_moved.discard(item)
+                    if item.scene() is self:
+                        self.snap_item(item)
+        return frozenset(exclude)
+
+    def update_graph_index(self):
+        """
+        Build the graph index again from the pipes if the connections changed since the last build.
+
+        Returns:
+            graph: The graph index of the widgets in this scene.
+
+        """
+
+        if self.graph_stale:
+            self.graph_pipes = dict()
+            for pipe_widget in self.id_items["pipe"].values():
+                if pipe_widget.scene() is self and pipe_widget.start_port and pipe_widget.end_port:
+                    edge = (pipe_widget.get_output_node(), pipe_widget.get_input_node())
+                    self.graph_pipes.setdefault(edge, list()).append(pipe_widget)
+            nodes = [item for kind in ("attr", "logic") for item in self.id_items[kind].values() if item.scene() is self]
+            self.graph_index.build(nodes, self.graph_pipes)
+            self.graph_stale = False
+        return self.graph_index
+
+    def get_id_item(self, kind, item_id):
+        """
+        Get an item of the scene by id.
+
+        Args:
+            kind: "attr", "logic", "port" or "pipe".
+            item_id: The id of the item.
+
+        """
+
+        item = self.id_items[kind].get(item_id)
+        if item is not None and item.id == item_id and item.scene() is self:
+            return item
+        return None
 
     def get_id_attribute(self, attribute_id) -> attribute.AttributeWidget:
         """
@@ -104,10 +323,7 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
         """
 
-        for item in self.items():
-            if isinstance(item, attribute.AttributeWidget):
-                if item.id == attribute_id:
-                    return item
+        return self.get_id_item("attr", attribute_id)
 
     def get_id_logic(self, logic_id) -> attribute.LogicWidget:
         """
@@ -118,10 +334,7 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
          """
 
-        for item in self.items():
-            if isinstance(item, attribute.LogicWidget):
-                if item.id == logic_id:
-                    return item
+        return self.get_id_item("logic", logic_id)
 
     def get_id_port(self, port_id) -> port.Port:
         """
@@ -132,21 +345,7 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
          """
 
-        for item in self.items():
-            if isinstance(item, attribute.AttributeWidget):
-                if item.true_input_port.id == port_id:
-                    return item.true_input_port
-                elif item.false_input_port.id == port_id:
-                    return item.false_input_port
-                elif item.true_output_port.id == port_id:
-                    return item.true_output_port
-                elif item.false_output_port.id == port_id:
-                    return item.false_output_port
-            elif isinstance(item, attribute.LogicWidget):
-                if item.input_port.id == port_id:
-                    return item.input_port
-                elif item.output_port.id == port_id:
-                    return item.output_port
+        return self.get_id_item("port", port_id)
 
     def get_id_pipe(self, pipe_id) -> pipe.Pipe:
         """
@@ -157,15 +356,23 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
         """
 
-        for item in self.items():
-            if isinstance(item, pipe.Pipe):
-                if item.id == pipe_id:
-                    return item
+        return self.get_id_item("pipe", pipe_id)
+
+    def mark_dirty(self):
+        """
+        Mark the scene changed since the last save.
+        A sub view is saved with the scene which contains it.
+
+        """
+
+        self.dirty = True
+        if not self.view.root_flag and self.view.proxy_widget and self.view.proxy_widget.scene():
+            self.view.proxy_widget.scene().mark_dirty()
 
     def drawBackground(self, painter: QtGui.QPainter, rect: QtCore.QRectF) -> None:
         #   Background
         super(Scene, self).drawBackground(painter, rect)
-        painter.drawImage(self.scene_rect, self.draw_image)
+        BackgroundCache.draw_exposed(painter, self.scene_rect, self.draw_image, rect)
 
     def serialize(self, scene_serialization=None):
         """
@@ -175,8 +382,6 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
             scene_serialization: The protobuff object.
 
         """
-        # scene id
-        scene_serialization.scene_id = self.id
 
         # items
         for item in self.items():
@@ -190,6 +395,21 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
             elif isinstance(item, draw.Draw):
                 item.serialize(scene_serialization.draw_serialization.add())
 
+        # ui and rect
+        self.serialize_state(scene_serialization)
+
+    def serialize_state(self, scene_serialization=None):
+        """
+        Serialize the background, style overrides and rect of the scene without its items.
+
+        Args:
+            scene_serialization: The protobuff object.
+
+        """
+
+        # scene id
+        scene_serialization.scene_id = self.id
+
         # ui serialization
         scene_serialization.background_image_flag = self.background_image_flag
         scene_serialization.background_image = self.background_image.name
@@ -258,6 +478,174 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
         scene_serialization.width = self.sceneRect().width()
         scene_serialization.height = self.sceneRect().height()
 
+    def style_changed(self):
+        """
+        Invalidate the resolved style of the widgets of this scene.
+
+        """
+
+        self.style_version = next(Scene.style_versions)
+
+    @staticmethod
+    def all_styles_changed():
+        """
+        Invalidate the resolved style of the widgets of every scene, after the default style changed.
+
+        """
+
+        for scene in list(Scene.instances):
+            if not sip.isdeleted(scene):
+                scene.style_changed()
+
+    def restore_state(self, data):
+        """
+        Restore the background and style overrides of the scene without touching its items.
+
+        Args:
+            data: The protobuff object.
+
+        """
+
+        # background image
+        if data.HasField("background_image_flag"):
+            self.background_image_flag = data.background_image_flag
+        self.background_image.change_svg(data.background_image)
+        # style
+        if data.scene_attr_font_family and data.scene_attr_font_size:
+            font = QtGui.QFont()
+            font.setFamily(data.scene_attr_font_family)
+            font.setPointSize(data.scene_attr_font_size)
+            self.attribute_style_font = font
+        else:
+            self.attribute_style_font = None
+
+        if data.scene_attr_style_font_color:
+            self.attribute_style_font_color = QtGui.QColor()
+            self.attribute_style_font_color.setRgba(data.scene_attr_style_font_color)
+        else:
+            self.attribute_style_font_color = None
+
+        if data.scene_attr_style_background_color:
+            self.attribute_style_background_color = QtGui.QColor()
+            self.attribute_style_background_color.setRgba(data.scene_attr_style_background_color)
+        else:
+            self.attribute_style_background_color = None
+
+        if data.scene_attr_style_selected_background_color:
+            self.attribute_style_selected_background_color = QtGui.QColor()
+            self.attribute_style_selected_background_color.setRgba(data.scene_attr_style_selected_background_color)
+        else:
+            self.attribute_style_selected_background_color = None
+
+        if data.scene_attr_style_border_color:
+            self.attribute_style_border_color = QtGui.QColor()
+            self.attribute_style_border_color.setRgba(data.scene_attr_style_border_color)
+        else:
+            self.attribute_style_border_color = None
+
+        if data.scene_attr_style_selected_border_color:
+            self.attribute_style_selected_border_color = QtGui.QColor()
+            self.attribute_style_selected_border_color.setRgba(data.scene_attr_style_selected_border_color)
+        else:
+            self.attribute_style_selected_border_color = None
+
+        if data.scene_logic_style_background_color:
+            self.logic_style_background_color = QtGui.QColor()
+            self.logic_style_background_color.setRgba(data.scene_logic_style_background_color)
+        else:
+            self.logic_style_background_color = None
+
+        if data.scene_logic_style_selected_background_color:
+            self.logic_style_selected_background_color = QtGui.QColor()
+            self.logic_style_selected_background_color.setRgba(data.scene_logic_style_selected_background_color)
+        else:
+            self.logic_style_selected_background_color = None
+
+        if data.scene_logic_style_border_color:
+            self.logic_style_border_color = QtGui.QColor()
+            self.logic_style_border_color.setRgba(data.scene_logic_style_border_color)
+        else:
+            self.logic_style_border_color = None
+
+        if data.scene_logic_style_selected_border_color:
+            self.logic_style_selected_border_color = QtGui.QColor()
+            self.logic_style_selected_border_color.setRgba(data.scene_logic_style_selected_border_color)
+        else:
+            self.logic_style_selected_border_color = None
+
+        if data.scene_pipe_width:
+            self.pipe_style_width = data.scene_pipe_width
+        else:
+            self.pipe_style_width = None
+
+        if data.scene_pipe_style_background_color:
+            self.pipe_style_background_color = QtGui.QColor()
+            self.pipe_style_background_color.setRgba(data.scene_pipe_style_background_color)
+        else:
+            self.pipe_style_background_color = None
+
+        if data.scene_pipe_style_selected_background_color:
+            self.pipe_style_selected_background_color = QtGui.QColor()
+            self.pipe_style_selected_background_color.setRgba(data.scene_pipe_style_selected_background_color)
+        else:
+            self.pipe_style_selected_background_color = None
+        
+        if data.scene_pipe_font_color:
+            self.pipe_style_font_color = QtGui.QColor()
+            self.pipe_style_font_color.setRgba(data.scene_pipe_font_color)
+        else:
+            self.pipe_style_font_color = None
+        
+        if data.scene_pipe_font_family and data.scene_pipe_font_size:
+            self.pipe_style_font_type = QtGui.QFont()
+            self.pipe_style_font_type.setFamily(data.scene_pipe_font_family)
+            self.pipe_style_font_type.setPointSize(data.scene_pipe_font_size)
+        else:
+            self.pipe_style_font_type = None
+
+        if data.scene_port_width:
+            self.port_style_width = data.scene_port_width
+        else:
+            self.port_style_width = None
+
+        if data.scene_port_style_color:
+            self.port_style_color = QtGui.QColor()
+            self.port_style_color.setRgba(data.scene_port_style_color)
+        else:
+            self.port_style_color = None
+
+        if data.scene_port_style_border_color:
+            self.port_style_border_color = QtGui.QColor()
+            self.port_style_border_color.setRgba(data.scene_port_style_border_color)
+        else:
+            self.port_style_border_color = None
+
+        if data.scene_port_style_hovered_color:
+            self.port_style_hovered_color = QtGui.QColor()
+            self.port_style_hovered_color.setRgba(data.scene_port_style_hovered_color)
+        else:
+            self.port_style_hovered_color = None
+
+        if data.scene_port_style_hovered_border_color:
+            self.port_style_hovered_border_color = QtGui.QColor()
+            self.port_style_hovered_border_color.setRgba(data.scene_port_style_hovered_border_color)
+        else:
+            self.port_style_hovered_border_color = None
+
+        if data.scene_port_style_activated_color:
+            self.port_style_activated_color = QtGui.QColor()
+            self.port_style_activated_color.setRgba(data.scene_port_style_activated_color)
+        else:
+            self.port_style_activated_color = None
+
+        if data.scene_port_style_activated_border_color:
+            self.port_style_activated_border_color = QtGui.QColor()
+            self.port_style_activated_border_color.setRgba(data.scene_port_style_activated_border_color)
+        else:
+            self.port_style_activated_border_color = None
+
+        self.style_changed()
+
     def deserialize(self, data, hashmap: dict, view=None, flag=True):
         """
         Deserialization.
@@ -272,13 +660,20 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
 
         if flag is True:
             # deserialize id
+            registered = self.view.get_scene(self.id) is self
             self.id = data.scene_id
             hashmap[data.scene_id] = self
+            if registered:
+                self.view.register_scene(self)
 
             # size
             self.scene_rect = QtCore.QRectF(data.x, data.y, data.width, data.height)
             self.setSceneRect(self.scene_rect)
 
+            # the scene is reused when loading another file
+            self.history.clear_history()
+            self.dirty = False
+
             # deserialize attribute widgets with (id, geometry)
             for attribute_data in data.attr_serialization:
                 attribute.AttributeWidget().deserialize(attribute_data, hashmap, view, flag=True)
@@ -299,263 +694,144 @@ class Scene(QtWidgets.QGraphicsScene, serializable.Serializable):
             # deserialize container widgets with all
             for draw_data in data.draw_serialization:
                 draw.Draw().deserialize(draw_data, hashmap, view, flag)
-            # background image
-            if data.HasField("background_image_flag"):
-                self.background_image_flag = data.background_image_flag
-            self.background_image.change_svg(data.background_image)
-            # style
-            if data.scene_attr_font_family and data.scene_attr_font_size:
-                font = QtGui.QFont()
-                font.setFamily(data.scene_attr_font_family)
-                font.setPointSize(data.scene_attr_font_size)
-                self.attribute_style_font = font
-            else:
-                self.attribute_style_font = None
-
-            if data.scene_attr_style_font_color:
-                self.attribute_style_font_color = QtGui.QColor()
-                self.attribute_style_font_color.setRgba(data.scene_attr_style_font_color)
-            else:
-                self.attribute_style_font_color = None
-
-            if data.scene_attr_style_background_color:
-                self.attribute_style_background_color = QtGui.QColor()
-                self.attribute_style_background_color.setRgba(data.scene_attr_style_background_color)
-            else:
-                self.attribute_style_background_color = None
-
-            if data.scene_attr_style_selected_background_color:
-                self.attribute_style_selected_background_color = QtGui.QColor()
-                self.attribute_style_selected_background_color.setRgba(data.scene_attr_style_selected_background_color)
-            else:
-                self.attribute_style_selected_background_color = None
-
-            if data.scene_attr_style_border_color:
-                self.attribute_style_border_color = QtGui.QColor()
-                self.attribute_style_border_color.setRgba(data.scene_attr_style_border_color)
-            else:
-                self.attribute_style_border_color = None
-
-            if data.scene_attr_style_selected_border_color:
-                self.attribute_style_selected_border_color = QtGui.QColor()
-                self.attribute_style_selected_border_color.setRgba(data.scene_attr_style_selected_border_color)
-            else:
-                self.attribute_style_selected_border_color = None
-
-            if data.scene_logic_style_background_color:
-                self.logic_style_background_color = QtGui.QColor()
-                self.logic_style_background_color.setRgba(data.scene_logic_style_background_color)
-            else:
-                self.logic_style_background_color = None
-
-            if data.scene_logic_style_selected_background_color:
-                self.logic_style_selected_background_color = QtGui.QColor()
-                self.logic_style_selected_background_color.setRgba(data.scene_logic_style_selected_background_color)
-            else:
-                self.logic_style_selected_background_color = None
-
-            if data.scene_logic_style_border_color:
-                self.logic_style_border_color = QtGui.QColor()
-                self.logic_style_border_color.setRgba(data.scene_logic_style_border_color)
-            else:
-                self.logic_style_border_color = None
-
-            if data.scene_logic_style_selected_border_color:
-                self.logic_style_selected_border_color = QtGui.QColor()
-                self.logic_style_selected_border_color.setRgba(data.scene_logic_style_selected_border_color)
-            else:
-                self.logic_style_selected_border_color = None
-
-            if data.scene_pipe_width:
-                self.pipe_style_width = data.scene_pipe_width
-            else:
-                self.pipe_style_width = None
-
-            if data.scene_pipe_style_background_color:
-                self.pipe_style_background_color = QtGui.QColor()
-                self.pipe_style_background_color.setRgba(data.scene_pipe_style_background_color)
-            else:
-                self.pipe_style_background_color = None
-
-            if data.scene_pipe_style_selected_background_color:
-                self.pipe_style_selected_background_color = QtGui.QColor()
-                self.pipe_style_selected_background_color.setRgba(data.scene_pipe_style_selected_background_color)
-            else:
-                self.pipe_style_selected_background_color = None
-            
-            if data.scene_pipe_font_color:
-                self.pipe_style_font_color = QtGui.QColor()
-                self.pipe_style_font_color.setRgba(data.scene_pipe_font_color)
-            else:
-                self.pipe_style_font_color = None
-            
-            if data.scene_pipe_font_family and data.scene_pipe_font_size:
-                self.pipe_style_font_type = QtGui.QFont()
-                self.pipe_style_font_type.setFamily(data.scene_pipe_font_family)
-                self.pipe_style_font_type.setPointSize(data.scene_pipe_font_size)
-            else:
-                self.pipe_style_font_type = None
-
-            if data.scene_port_width:
-                self.port_style_width = data.scene_port_width
-            else:
-                self.port_style_width = None
-
-            if data.scene_port_style_color:
-                self.port_style_color = QtGui.QColor()
-                self.port_style_color.setRgba(data.scene_port_style_color)
-            else:
-                self.port_style_color = None
-
-            if data.scene_port_style_border_color:
-                self.port_style_border_color = QtGui.QColor()
-                self.port_style_border_color.setRgba(data.scene_port_style_border_color)
-            else:
-                self.port_style_border_color = None
-
-            if data.scene_port_style_hovered_color:
-                self.port_style_hovered_color = QtGui.QColor()
-                self.port_style_hovered_color.setRgba(data.scene_port_style_hovered_color)
-            else:
-                self.port_style_hovered_color = None
-
-            if data.scene_port_style_hovered_border_color:
-                self.port_style_hovered_border_color = QtGui.QColor()
-                self.port_style_hovered_border_color.setRgba(data.scene_port_style_hovered_border_color)
-            else:
-                self.port_style_hovered_border_color = None
-
-            if data.scene_port_style_activated_color:
-                self.port_style_activated_color = QtGui.QColor()
-                self.port_style_activated_color.setRgba(data.scene_port_style_activated_color)
-            else:
-                self.port_style_activated_color = None
-
-            if data.scene_port_style_activated_border_color:
-                self.port_style_activated_border_color = QtGui.QColor()
-                self.port_style_activated_border_color.setRgba(data.scene_port_style_activated_border_color)
-            else:
-                self.port_style_activated_border_color = None
+            # background and style
+            self.restore_state(data)
 
         elif flag is False:
-            for item in self.items():
-                # deserialize attribute widgets second time
-                if isinstance(item, attribute.AttributeWidget):
-                    # deserialize attribute widgets with attribute sub widgets
-                    for attribute_widget_data in data.attr_serialization:
-                        if item.id == attribute_widget_data.attr_id:
-                            # deserialize sub attribute widgets
-                            for attribute_sub_id in attribute_widget_data.sub_attr:
-                                sub_attribute_widget = self.get_id_attribute(attribute_sub_id)
-                                item.attribute_sub_widgets.append(sub_attribute_widget)
-                                item.attribute_layout.addItem(sub_attribute_widget,
-                                                              sub_attribute_widget.item_row,
-                                                              sub_attribute_widget.item_column)
-                            from ..Components.sub_view import ProxyView
-                            from ..Components.todo import Todo
-                            for attribute_sub_file in attribute_widget_data.file_serialization:
-                                attribute_sub = attribute.AttributeFile(item)
-                                attribute_sub.deserialize(attribute_sub_file, hashmap, view, flag)
-                                item.attribute_sub_widgets.append(attribute_sub)
-                                item.attribute_layout.addItem(attribute_sub,
-                                                              attribute_sub.item_row,
-                                                              attribute_sub.item_column)
-                            for attribute_sub_todo in attribute_widget_data.todo_serialization:
-                                attribute_sub = Todo(item)
-                                attribute_sub.deserialize(attribute_sub_todo, hashmap, view, flag)
-                                item.attribute_sub_widgets.append(attribute_sub)
-                                item.attribute_layout.addItem(attribute_sub,
-                                                              attribute_sub.item_row,
-                                                              attribute_sub.item_column)
-                            for attribute_sub_view in attribute_widget_data.subview_serialization:
-                                attribute_sub = ProxyView(self.view.mainwindow)
-                                attribute_sub.deserialize(attribute_sub_view, hashmap,
-                                                          attribute_sub.sub_view_widget_view, flag=True)
-                                self.view.mainwindow.view_widget.children_view[attribute_sub.id] = attribute_sub
-                                item.attribute_sub_widgets.append(attribute_sub)
-                                item.attribute_layout.addItem(attribute_sub,
-                                                              attribute_sub.item_row,
-                                                              attribute_sub.item_column)
-                            for attribute_none_widget in attribute_widget_data.none_serialization:
-                                attribute_none = attribute.NoneWidget(attribute_none_widget.none_pos[0],
-                                                                      attribute_none_widget.none_pos[1],
-                                                                      item)
-                                attribute_none.deserialize(attribute_none_widget, hashmap, view, flag)
-                                item.attribute_sub_widgets.append(attribute_none)
-                                item.attribute_layout.addItem(attribute_none,
-                                                              attribute_none.item_row,
-                                                              attribute_none.item_column)
-
-                            item.text_change_node_shape()
-                            # deserialize attribute widgets with attribute next widgets
-                            for attribute_next_id in attribute_widget_data.next_attr_id:
-                                next_attribute_widget = self.get_id_attribute(attribute_next_id)
-                                item.next_attribute.append(next_attribute_widget)
-                                if constants.DEBUG_DESERIALIZE:
-                                    print("deserialize attribute widget: ", item,
-                                          "add next attribute: ", next_attribute_widget,
-                                          "current next attribute: ", item.next_attribute)
-                            # deserialize attribute widgets with attribute last widgets
-                            for attribute_last_id in attribute_widget_data.last_attr_id:
-                                last_attribute_widget = self.get_id_attribute(attribute_last_id)
-                                item.last_attribute.append(last_attribute_widget)
-                                if constants.DEBUG_DESERIALIZE:
-                                    print("deserialize attribute widget: ", item,
-                                          "add last attribute: ", last_attribute_widget,
-                                          "current last attribute: ", item.last_attribute)
-                            # deserialize attribute widgets with logic next widgets
-                            for logic_next_id in attribute_widget_data.next_logic_id:
-                                next_logic_widget = self.get_id_logic(logic_next_id)
-                                item.next_logic.append(next_logic_widget)
-                            # deserialize attribute widgets with logic next widgets
-                            for logic_last_id in attribute_widget_data.last_logic_id:
-                                last_logic_widget = self.get_id_logic(logic_last_id)
-                                item.last_logic.append(last_logic_widget)
-                            # deserialize attribute widgets with pipes
-                            for pipe_id in attribute_widget_data.attr_port[0].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.true_input_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
-                            for pipe_id in attribute_widget_data.attr_port[1].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.false_input_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
-                            for pipe_id in attribute_widget_data.attr_port[2].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.true_output_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
-                            for pipe_id in attribute_widget_data.attr_port[3].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.false_output_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
-                # deserialize logic widgets second time
-                elif isinstance(item, attribute.LogicWidget):
-                    for logic_widget_data in data.logic_serialization:
-                        # traverse list and find right logic
-                        if item.id == logic_widget_data.logic_id:
-                            # deserialize logic widgets with attribute next widgets
-                            for attribute_next_id in logic_widget_data.logic_next_attr:
-                                next_attribute_widget = self.get_id_attribute(attribute_next_id)
-                                item.next_attribute.append(next_attribute_widget)
-                            # deserialize logic widgets with attribute last widgets
-                            for attribute_last_id in logic_widget_data.logic_last_attr:
-                                last_attribute_widget = self.get_id_attribute(attribute_last_id)
-                                item.last_attribute.append(last_attribute_widget)
-                            # deserialize logic widgets with logic next widgets
-                            for logic_next_id in logic_widget_data.logic_next_logic:
-                                next_logic_widget = self.get_id_logic(logic_next_id)
-                                item.next_logic.append(next_logic_widget)
-                            # deserialize logic widgets with logic last widgets
-                            for logic_last_id in logic_widget_data.logic_last_logic:
-                                last_logic_widget = self.get_id_logic(logic_last_id)
-                                item.last_logic.append(last_logic_widget)
-                            # deserialize logic widgets with ports
-                            for pipe_id in logic_widget_data.logic_port[0].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.input_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
-                            for pipe_id in logic_widget_data.logic_port[1].pipes_id:
-                                pipe_widget = self.get_id_pipe(pipe_id)
-                                item.output_port.pipes.append(pipe_widget)
-                                item.update_pipe_position()
+            # deserialize attribute widgets second time with attribute sub widgets, found by id
+            for attribute_widget_data in data.attr_serialization:
+                item = self.get_id_attribute(attribute_widget_data.attr_id)
+                if item is not None:
+                    self.deserialize_sub_widgets(item, attribute_widget_data, hashmap, view)
+                    self.deserialize_connections(item, attribute_widget_data)
+            # deserialize logic widgets second time
+            for logic_widget_data in data.logic_serialization:
+                item = self.get_id_logic(logic_widget_data.logic_id)
+                if item is not None:
+                    self.deserialize_connections(item, logic_widget_data)
         return True
+
+    def deserialize_sub_widgets(self, item, data, hashmap: dict, view=None):
+        """
+        Deserialize the sub widgets of an attribute widget into its layout.
+
+        Args:
+            item: The attribute widget.
+            data: The protobuff object of the attribute widget.
+            hashmap: hashmap.
+            view: The manager.
+
+        """
+
+        from ..Components.sub_view import ProxyView
+        from ..Components.todo import Todo
+
+        # deserialize sub attribute widgets
+        for attribute_sub_id in data.sub_attr:
+            sub_attribute_widget = self.get_id_attribute(attribute_sub_id)
+            item.attribute_sub_widgets.append(sub_attribute_widget)
+            item.attribute_layout.addItem(sub_attribute_widget,
+                                          sub_attribute_widget.item_row,
+                                          sub_attribute_widget.item_column)
+        for attribute_sub_file in data.file_serialization:
+            attribute_sub = attribute.AttributeFile(item)
+            attribute_sub.deserialize(attribute_sub_file, hashmap, view, False)
+            item.attribute_sub_widgets.append(attribute_sub)
+            item.attribute_layout.addItem(attribute_sub,
+                                          attribute_sub.item_row,
+                                          attribute_sub.item_column)
+        for attribute_sub_todo in data.todo_serialization:
+            attribute_sub = Todo(item)
+            attribute_sub.deserialize(attribute_sub_todo, hashmap, view, False)
+            item.attribute_sub_widgets.append(attribute_sub)
+            item.attribute_layout.addItem(attribute_sub,
+                                          attribute_sub.item_row,
+                                          attribute_sub.item_column)
+        for attribute_sub_view in data.subview_serialization:
+            attribute_sub = ProxyView(self.view.mainwindow)
+            attribute_sub.deserialize(attribute_sub_view, hashmap,
+                                      attribute_sub.sub_view_widget_view, flag=True)
+            self.view.mainwindow.view_widget.children_view[attribute_sub.id] = attribute_sub
+            item.attribute_sub_widgets.append(attribute_sub)
+            item.attribute_layout.addItem(attribute_sub,
+                                          attribute_sub.item_row,
+                                          attribute_sub.item_column)
+        for attribute_none_widget in data.none_serialization:
+            attribute_none = attribute.NoneWidget(attribute_none_widget.none_pos[0],
+                                                  attribute_none_widget.none_pos[1],
+                                                  item)
+            attribute_none.deserialize(attribute_none_widget, hashmap, view, False)
+            item.attribute_sub_widgets.append(attribute_none)
+            item.attribute_layout.addItem(attribute_none,
+                                          attribute_none.item_row,
+                                          attribute_none.item_column)
+
+        item.text_change_node_shape()
+
+    def remove_sub_widgets(self, item):
+        """
+        Take every sub widget out of the layout of an attribute widget.
+
+        Sub attribute widgets are kept alive in the scene, the other sub widgets are removed.
+
+        Args:
+            item: The attribute widget.
+
+        """
+
+        from ..Components.sub_view import ProxyView
+
+        for sub_widget in item.attribute_sub_widgets:
+            item.attribute_layout.removeItem(sub_widget)
+            if isinstance(sub_widget, attribute.AttributeWidget):
+                sub_widget.setParentItem(None)
+                continue
+            if isinstance(sub_widget, ProxyView):
+                self.view.mainwindow.view_widget.children_view.pop(sub_widget.id, None)
+            if sub_widget.scene():
+                sub_widget.scene().removeItem(sub_widget)
+        item.attribute_sub_widgets = []
+
+    def deserialize_connections(self, item, data):
+        """
+        Deserialize the next/last widgets and the port pipes of an attribute or logic widget.
+
+        The existing connections of the widget are replaced.
+
+        Args:
+            item: The attribute widget or logic widget.
+            data: The protobuff object of the widget.
+
+        """
+
+        if isinstance(item, attribute.AttributeWidget):
+            next_attr_id, last_attr_id = data.next_attr_id, data.last_attr_id
+            next_logic_id, last_logic_id = data.next_logic_id, data.last_logic_id
+            ports = ((item.true_input_port, data.attr_port[0]),
+                     (item.false_input_port, data.attr_port[1]),
+                     (item.true_output_port, data.attr_port[2]),
+                     (item.false_output_port, data.attr_port[3]))
+        else:
+            next_attr_id, last_attr_id = data.logic_next_attr, data.logic_last_attr
+            next_logic_id, last_logic_id = data.logic_next_logic, data.logic_last_logic
+            ports = ((item.input_port, data.logic_port[0]),
+                     (item.output_port, data.logic_port[1]))
+
+        # deserialize widgets with attribute next widgets
+        item.next_attribute = [self.get_id_attribute(attribute_id) for attribute_id in next_attr_id]
+        if constants.DEBUG_DESERIALIZE:
+            print("deserialize widget: ", item,
+                  "current next attribute: ", item.next_attribute)
+        # deserialize widgets with attribute last widgets
+        item.last_attribute = [self.get_id_attribute(attribute_id) for attribute_id in last_attr_id]
+        if constants.DEBUG_DESERIALIZE:
+            print("deserialize widget: ", item,
+                  "current last attribute: ", item.last_attribute)
+        # deserialize widgets with logic next and last widgets
+        item.next_logic = [self.get_id_logic(logic_id) for logic_id in next_logic_id]
+        item.last_logic = [self.get_id_logic(logic_id) for logic_id in last_logic_id]
+        # deserialize widgets with pipes
+        self.graph_stale = True
+        for port_widget, port_data in ports:
+            port_widget.pipes = [self.get_id_pipe(pipe_id) for pipe_id in port_data.pipes_id]
+        item.update_pipe_position()
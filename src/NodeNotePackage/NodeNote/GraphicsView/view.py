@@ -11,8 +11,9 @@ from PyQt5 import QtGui, QtCore, QtWidgets, sip
 
 from .scene import Scene
 from ..Components import effect_water, attribute, port, pipe, effect_cutline, effect_background, effect_snow, \
-    draw, todo, sub_view
-from ..Model import constants, serializable, serialize_pb2
+    draw, todo, sub_view, palette
+from ..Components.background_cache import BackgroundCache
+from ..Model import constants, serializable, serialize_pb2, note_file, text_index, trigram_index, layered_layout
 
 
 class TreeWidgetItem(QtWidgets.QTreeWidgetItem):
@@ -63,38 +64,6 @@ class TreeWidgetItem(QtWidgets.QTreeWidgetItem):
             return 0
 
 
-class DisplayThumbnailsThread(QtCore.QThread):
-    def __init__(self, view, parent=None) -> None:
-        super().__init__(parent=parent)
-        self.view = view
-
-
-    def run(self):
-        """
-        Draw thumbnails to index the scene quickly.
-
-        """
-        pass
-    
-    def timerEvent(self, a0: 'QtCore.QTimerEvent') -> None:
-        area = self.view.mainwindow.view_widget.current_scene.scene_rect
-        image = QtGui.QImage(self.view.mainwindow.thumbnails.size() - QtCore.QSize(10, 10) , QtGui.QImage.Format_ARGB32)
-        painter = QtGui.QPainter(image)
-        self.view.mainwindow.view_widget.current_scene.render(
-            painter, 
-            QtCore.QRectF(
-                0, 0,
-                image.size().width(), image.size().height()
-            ),
-            area,
-            QtCore.Qt.IgnoreAspectRatio)
-        painter.end()
-        self.view.mainwindow.thumbnails.setPixmap(QtGui.QPixmap.fromImage(image))
-        for item in self.view.mainwindow.view_widget.current_scene.items():
-            item.update()
-        return super().timerEvent(a0)
-
-
 class View(QtWidgets.QGraphicsView, serializable.Serializable):
     """
     Class used for managing components.
@@ -129,11 +98,11 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.copy_attribute_widget = dict()
         self.undo_flag = constants.view_undo_flag
         # BASIC SETTINGS
-        self.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
         self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
-        self.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.HighQualityAntialiasing |
-                            QtGui.QPainter.TextAntialiasing | QtGui.QPainter.SmoothPixmapTransform)
+        self.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing |
+                            QtGui.QPainter.SmoothPixmapTransform)
+        self.set_update_mode(constants.view_update_mode)
         if self.root_flag:
             self.setDragMode(QtWidgets.QGraphicsView.RubberBandDrag)
 
@@ -179,6 +148,15 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         # Temp for indexing
         if self.root_flag:
             self.children_view = dict()
+            # {scene id: scene} of the scene list, a scene holds its tree item and its view
+            self.scenes = dict()
+            # {attribute widget id: attribute widget} of every scene and sub view
+            self.nodes = dict()
+            # ids of the sub scenes deleted since the note was saved, the journal drops them
+            self.dropped_scenes = set()
+            # {attribute widget id: (scene id, bytes)} sub scene segments of the note not taken by
+            # an attribute widget yet, they are nested in a sub scene which is still serialized
+            self.sub_scene_segments = dict()
 
         # SUB SCENE
         if self.root_flag:
@@ -189,6 +167,8 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.root_scene_flag = self.mainwindow.view_widget.current_scene_flag
 
         self.root_scene.sub_scene_flag = self.root_scene_flag
+        if self.root_flag:
+            self.register_scene(self.root_scene)
         self.current_scene = self.root_scene
         self.current_scene_flag = self.root_scene_flag
 
@@ -220,7 +200,30 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         self.search_list = list()
         self.search_position = -1
         self.search_result = False
+        # {attribute widget: [(position, char format), ...]} changed by the highlight of the last search
         self.text_format = {}
+        # attribute widgets of every scene and sub view, kept by the root view
+        self.search_index = text_index.TextIndex()
+        # attribute widgets added, removed or edited since they were indexed
+        self.search_dirty = set()
+        # texts of the serialized sub scenes, {(attribute widget holding the bytes, attr id): text}
+        self.sub_scene_index = text_index.TextIndex()
+        # {attribute widget: [keys]} of the sub scene index and of the palette index
+        self.sub_scene_keys = dict()
+        # attribute widgets whose serialized sub scene changed since it was indexed
+        self.sub_scene_dirty = set()
+
+        # Palette
+        if self.root_flag:
+            self.palette = palette.Palette(self, self)
+        # titles of the attribute widgets, todos, files and scene list items, kept by the root view
+        self.palette_index = trigram_index.TrigramIndex()
+        # widgets added, removed or edited since they were indexed
+        self.palette_dirty = set()
+        # scene list items in the palette index
+        self.palette_scenes = set()
+        # widgets of serialized sub scenes are indexed as
+        # (attribute widget holding the bytes, kind, title, attr id of the node, id of the widget)
 
         # file
         if len(self.mainwindow.argv) == 2:
@@ -239,9 +242,6 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         self.mouse_effect = True
         self.setAttribute(QtCore.Qt.WA_TabletTracking)
 
-        # thumbnails
-        self.run_thumbnails = DisplayThumbnailsThread(self)
-
         # flowing image
         self.flowing_flag = constants.view_flowing_flag
 
@@ -332,8 +332,56 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                     item.setPos(item.scenePos().x(), down_y - item.size().height())
             
             if self.undo_flag:
-                self.current_scene.history.store_history("change alignment.")
-    
+                self.current_scene.history.store_history("change alignment.", selected_widgets)
+
+    def layout_widgets(self):
+        """
+        Arrange the selected widgets in layers along their pipes, or every widget if less than two are selected.
+
+        """
+
+        widgets = [item for item in self.current_scene.selectedItems()
+                   if isinstance(item, (attribute.AttributeWidget, attribute.LogicWidget)) and item.parentItem() is None]
+        if len(widgets) < 2:
+            widgets = list(dict.fromkeys(
+                item for kind in ("attr", "logic") for item in self.current_scene.id_items[kind].values()
+                if item.scene() is self.current_scene and item.parentItem() is None))
+        if len(widgets) < 2:
+            return
+
+        # pipes of sub widgets connect their top level widgets
+        indices = {item: index for index, item in enumerate(widgets)}
+        sources, targets = list(), list()
+        self.current_scene.update_graph_index()
+        for output_node, input_node in self.current_scene.graph_pipes:
+            source = indices.get(output_node.topLevelItem())
+            target = indices.get(input_node.topLevelItem())
+            if source is not None and target is not None:
+                sources.append(source)
+                targets.append(target)
+
+        widths = [item.size().width() for item in widgets]
+        heights = [item.size().height() for item in widgets]
+        xs, ys = layered_layout.layered_layout(widths, heights, sources, targets)
+        left = min(item.scenePos().x() for item in widgets)
+        top = min(item.scenePos().y() for item in widgets)
+
+        # one geometry update, the item index is built again once instead of after every move
+        self.setUpdatesEnabled(False)
+        self.current_scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        try:
+            for item, x, y in zip(widgets, xs.tolist(), ys.tolist()):
+                item.setPos(left + x, top + y)
+        finally:
+            self.current_scene.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex)
+            self.setUpdatesEnabled(True)
+
+        layout_rect = QtCore.QRectF(left, top, float((xs + widths).max()), float((ys + heights).max()))
+        self.current_scene.scene_rect = self.current_scene.scene_rect.united(layout_rect.adjusted(-200, -200, 200, 200))
+        self.current_scene.setSceneRect(self.current_scene.scene_rect)
+        if self.undo_flag:
+            self.current_scene.history.store_history("Layout", widgets)
+
     def tanslation_expand(self, translation_flag: str):
         """
         tanslate items
@@ -422,7 +470,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             if image_name != "":
                 image_name = os.path.relpath(image_name, constants.work_dir)
                 self.image_path = image_name
-                effect_snow.SnowWidget.image_path = image_name
+                effect_snow.EffectSkyWidget.image_path = image_name
         else:
             if self.mainwindow.sky_widget.isVisible():
                 self.mainwindow.sky_widget.hide()
@@ -431,6 +479,22 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                 self.mainwindow.sky_widget.show()
                 self.flowing_flag = True
 
+    def set_update_mode(self, update_mode):
+        """
+        Choose how much of the viewport is repainted when items change.
+
+        Args:
+            update_mode: The index of constants.VIEW_UPDATE_MODES.
+
+        """
+
+        self.update_mode = update_mode % len(constants.VIEW_UPDATE_MODES)
+        viewport_update_mode = constants.VIEW_UPDATE_MODES[self.update_mode][1]
+        self.setViewportUpdateMode(viewport_update_mode)
+        self.setRenderHint(QtGui.QPainter.HighQualityAntialiasing,
+                           viewport_update_mode == QtWidgets.QGraphicsView.FullViewportUpdate)
+        self.viewport().update()
+
     def change_scale(self, event):
         """
         Press Ctrl + or Ctrl - to change the zoom.
@@ -471,12 +535,79 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         if len(self.current_scene.selectedItems()) >= 1:
             for item in self.current_scene.selectedItems():
                 if isinstance(item, pipe.Pipe):
-                    if item.timeline.state() == QtCore.QTimeLine.NotRunning:
+                    if not item.animating:
                         item.perform_evaluation_feedback()
-                    elif item.timeline.state() == QtCore.QTimeLine.Running:
+                    else:
                         item.end_evaluation_feedback()
-        if self.undo_flag:
-            self.current_scene.history.store_history("update pipe animation")
+
+    def selected_nodes(self):
+        return [item for item in self.current_scene.selectedItems()
+                if isinstance(item, (attribute.AttributeWidget, attribute.LogicWidget))]
+
+    def select_graph_items(self, nodes, edges=None):
+        """
+        Select widgets and the pipes between them instead of the current selection.
+
+        Args:
+            nodes: The attribute widgets and logic widgets.
+            edges: The (output widget, input widget) pairs whose pipes are selected, every pair of the nodes if None.
+
+        """
+
+        nodes = set(nodes)
+        graph_pipes = self.current_scene.graph_pipes
+        if edges is None:
+            edges = [edge for edge in graph_pipes if edge[0] in nodes and edge[1] in nodes]
+        self.current_scene.clearSelection()
+        for node in nodes:
+            node.setSelected(True)
+        for source, target in edges:
+            for pipe_widget in graph_pipes.get((source, target), []) + graph_pipes.get((target, source), []):
+                pipe_widget.setSelected(True)
+
+    def select_connected(self, downstream=True):
+        """
+        Select every widget reached from the selected widgets through pipes.
+
+        Args:
+            downstream: Follow the pipes to their input widgets, otherwise back to their output widgets.
+
+        """
+
+        starts = self.selected_nodes()
+        if starts:
+            graph = self.current_scene.update_graph_index()
+            self.select_graph_items(graph.traverse(starts, downstream=downstream, upstream=not downstream))
+
+    def select_path(self):
+        """
+        Select the shortest pipe path between the two selected widgets, in either direction.
+
+        """
+
+        starts = self.selected_nodes()
+        if len(starts) != 2:
+            return
+        graph = self.current_scene.update_graph_index()
+        path = graph.shortest_path(starts[0], starts[1]) or graph.shortest_path(starts[1], starts[0]) or \
+            graph.shortest_path(starts[0], starts[1], directed=False)
+        if path:
+            self.select_graph_items(path, zip(path, path[1:]))
+
+    def select_cycles(self):
+        """
+        Select the widgets and pipes forming cycles.
+
+        """
+
+        graph = self.current_scene.update_graph_index()
+        components = dict()
+        for number, cycle in enumerate(graph.find_cycles()):
+            for node in cycle:
+                components[node] = number
+        edges = [(source, target) for source, target in self.current_scene.graph_pipes
+                 if source in components and components[source] == components.get(target)]
+        self.select_graph_items(components, edges)
 
     def python_highlighter(self):
         """
@@ -503,30 +634,308 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         else:
             self.search_widget.setVisible(False)
 
-            for item_id in self.text_format:
-                # clear format in root view
-                for item in self.attribute_widgets:
-                    if item.id == item_id:
-                        if item.attribute_widget.label_item:
-                            cursor = item.attribute_widget.label_item.textCursor()
-                            for text_format in self.text_format[item_id]:
-                                cursor.setPosition(text_format[0])
-                                cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
-                                cursor.setCharFormat(text_format[1])
-                # clear format in sub view
-                for sub_view in self.children_view.values():
-                    for item in sub_view.sub_view_widget_view.attribute_widgets:
-                        if item.id == item_id:
-                            cursor = item.attribute_widget.label_item.textCursor()
-                            for text_format in self.text_format[item_id]:
-                                cursor.setPosition(text_format[0])
-                                cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
-                                cursor.setCharFormat(text_format[1])
+            self.clear_search_format()
 
             self.search_list = list()
             self.search_position = -1
             self.search_result = False
-            self.text_format = {}
+
+    def root_view(self):
+        return self if self.root_flag else self.mainwindow.view_widget
+
+    def register_scene(self, scene):
+        """
+        Index a scene of the scene list by id, call it again after its id changes.
+
+        Args:
+            scene: The scene whose tree item holds it.
+
+        """
+
+        self.root_view().scenes[scene.id] = scene
+
+    def get_scene(self, scene_id):
+        """
+        Get a scene of the scene list by id.
+
+        Args:
+            scene_id: The id of the scene.
+
+        Returns:
+            Scene: The scene or None, its tree item is scene.sub_scene_flag and its manager is scene.view.
+
+        """
+
+        scene = self.root_view().scenes.get(scene_id)
+        if scene is not None and not sip.isdeleted(scene) and scene.id == scene_id and \
+                not sip.isdeleted(scene.sub_scene_flag) and \
+                scene.sub_scene_flag.treeWidget() is self.mainwindow.scene_list:
+            return scene
+        return None
+
+    def register_node(self, item):
+        """
+        Index an attribute widget added to a scene by id, call it again after its id changes.
+
+        Args:
+            item: The attribute widget.
+
+        """
+
+        view = self.root_view()
+        view.nodes[item.id] = item
+        view.search_dirty.add(item)
+        view.palette_dirty.add(item)
+        view.sub_scene_dirty.add(item)
+
+    def unregister_node(self, item):
+        view = self.root_view()
+        if view.nodes.get(item.id) is item:
+            del view.nodes[item.id]
+        view.search_dirty.add(item)
+        view.palette_dirty.add(item)
+        view.sub_scene_dirty.add(item)
+
+    def get_node(self, attribute_id):
+        """
+        Get an attribute widget of any scene or sub view by id.
+
+        Args:
+            attribute_id: The id of the attribute widget.
+
+        Returns:
+            AttributeWidget: The attribute widget or None.
+
+        """
+
+        item = self.root_view().nodes.get(attribute_id)
+        if item is not None and not sip.isdeleted(item) and item.id == attribute_id and item.scene():
+            return item
+        return None
+
+    def mark_search(self, item):
+        """
+        Index the attribute widget again before the next search and palette query.
+
+        Args:
+            item: The edited attribute widget.
+
+        """
+
+        view = self.root_view()
+        view.search_dirty.add(item)
+        view.palette_dirty.add(item)
+
+    def mark_sub_scene(self, item):
+        """
+        Index the serialized sub scene of the attribute widget again before the next search.
+
+        Args:
+            item: The attribute widget whose sub scene bytes were set or dropped.
+
+        """
+
+        self.root_view().sub_scene_dirty.add(item)
+
+    def mark_palette(self, item):
+        """
+        Index the todo or file widget again before the next palette query.
+
+        Args:
+            item: The added, removed or edited widget.
+
+        """
+
+        self.root_view().palette_dirty.add(item)
+
+    def update_palette_index(self):
+        """
+        Index the widgets changed since the last palette query.
+
+        """
+
+        self.update_sub_scene_index()
+        for item in self.palette_dirty:
+            if sip.isdeleted(item) or not item.scene():
+                self.palette_index.remove(item)
+            else:
+                self.palette_index.update(item, item.palette_text())
+        self.palette_dirty = set()
+
+    def update_palette_scenes(self):
+        """
+        Index the names of the scene list items, called when the palette opens.
+
+        """
+
+        scene_flags = set()
+        iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
+        while iterator.value():
+            scene_flag = iterator.value()
+            iterator += 1
+            scene_flags.add(scene_flag)
+            self.palette_index.update(scene_flag, scene_flag.text(0))
+        for scene_flag in self.palette_scenes - scene_flags:
+            self.palette_index.remove(scene_flag)
+        self.palette_scenes = scene_flags
+
+    @staticmethod
+    def palette_entry(key):
+        """
+        The kind and the title of a palette match.
+
+        Args:
+            key: Widget or scene list item.
+
+        Returns:
+            (kind, title): str.
+
+        """
+
+        if isinstance(key, QtWidgets.QTreeWidgetItem):
+            return "Scene", key.text(0)
+        elif isinstance(key, tuple):
+            return key[1], key[2]
+        elif isinstance(key, todo.Todo):
+            return "Todo", key.palette_text()
+        elif isinstance(key, attribute.AttributeFile):
+            return "File", key.palette_text()
+        return "Node", key.palette_text()
+
+    def palette_select(self, key):
+        """
+        Focus a palette match like a search result, a serialized sub scene is materialized first.
+
+        Args:
+            key: Widget, scene list item or the key of a widget in a serialized sub scene.
+
+        """
+
+        if isinstance(key, tuple):
+            item, kind, _, attribute_id, widget_id = key
+            if sip.isdeleted(item) or not item.scene():
+                return
+            item.load_sub_scene()
+            key = self.get_node(attribute_id)
+            if key is not None and kind != "Node":
+                key = next((sub_widget for sub_widget in key.attribute_sub_widgets
+                            if isinstance(sub_widget, (todo.Todo, attribute.AttributeFile)) and
+                            sub_widget.id == widget_id), None)
+            if key is None:
+                return
+        if sip.isdeleted(key):
+            return
+        if isinstance(key, QtWidgets.QTreeWidgetItem):
+            if key.treeWidget() is self.mainwindow.scene_list:
+                self.change_current_scene(key)
+        elif key.scene():
+            self.mainwindow.scene_list.clearSelection()
+            self.focus_item(key.scene(), key)
+
+    def update_search_index(self):
+        """
+        Index the attribute widgets changed since the last search.
+
+        """
+
+        for item in self.search_dirty:
+            if sip.isdeleted(item) or not item.scene():
+                self.search_index.remove(item)
+            else:
+                self.search_index.update(item, item.attribute_widget.label_item.toPlainText())
+        self.search_dirty = set()
+
+    @staticmethod
+    def serialized_attributes(scene_serialization):
+        """
+        The attribute widgets of a serialized scene and of its nested sub scenes.
+
+        Args:
+            scene_serialization: The protobuff scene object.
+
+        Returns:
+            attribute_data: List of protobuff attribute objects.
+
+        """
+
+        attributes = list()
+        scenes = [scene_serialization]
+        while scenes:
+            for attribute_data in scenes.pop().attr_serialization:
+                attributes.append(attribute_data)
+                scenes.extend(attribute_data.sub_scene_serialization)
+        return attributes
+
+    def nest_sub_scene_segments(self, scene_serialization):
+        """
+        Put the sub scene segments not taken by an attribute widget yet into a serialized scene.
+
+        Args:
+            scene_serialization: The protobuff scene object.
+
+        """
+
+        segments = self.root_view().sub_scene_segments
+        for attribute_data in scene_serialization.attr_serialization:
+            if not attribute_data.sub_scene_serialization and attribute_data.attr_id in segments:
+                sub_scene_serialization = attribute_data.sub_scene_serialization.add()
+                sub_scene_serialization.ParseFromString(segments[attribute_data.attr_id][1])
+                self.nest_sub_scene_segments(sub_scene_serialization)
+
+    def update_sub_scene_index(self):
+        """
+        Index the texts and the palette titles of the serialized sub scenes changed since the last search
+        or palette query, each one is parsed once.
+
+        """
+
+        document = QtGui.QTextDocument()
+        for item in self.sub_scene_dirty:
+            for key in self.sub_scene_keys.pop(item, ()):
+                self.sub_scene_index.remove(key)
+                self.palette_index.remove(key)
+            if sip.isdeleted(item) or not item.scene() or not item.sub_scene_data:
+                continue
+            scene_serialization = serialize_pb2.ViewSerialization.SceneSerialization()
+            scene_serialization.ParseFromString(item.sub_scene_data)
+            self.nest_sub_scene_segments(scene_serialization)
+            keys = list()
+            for attribute_data in self.serialized_attributes(scene_serialization):
+                document.setHtml(attribute_data.contents)
+                text = document.toPlainText()
+                key = (item, attribute_data.attr_id)
+                self.sub_scene_index.update(key, text)
+                keys.append(key)
+
+                # titles like the palette_text of the widgets
+                titles = [("Node", text.split("\n", 1)[0], attribute_data.attr_id)]
+                titles.extend(("Todo", todo_data.task, todo_data.todo_id)
+                              for todo_data in attribute_data.todo_serialization)
+                titles.extend(("File", file_data.text, file_data.file_id)
+                              for file_data in attribute_data.file_serialization)
+                for kind, title, widget_id in titles:
+                    key = (item, kind, title, attribute_data.attr_id, widget_id)
+                    self.palette_index.update(key, title)
+                    keys.append(key)
+            self.sub_scene_keys[item] = keys
+        self.sub_scene_dirty = set()
+
+    def clear_search_format(self):
+        """
+        Restore the text formats changed by the highlight of the last search.
+
+        """
+
+        for item, text_formats in self.text_format.items():
+            # widgets removed or left behind by a reload are not formatted again
+            if sip.isdeleted(item) or not item.scene() or not item.attribute_widget.label_item:
+                continue
+            cursor = item.attribute_widget.label_item.textCursor()
+            for position, text_format in text_formats:
+                cursor.setPosition(position)
+                cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
+                cursor.setCharFormat(text_format)
+        self.text_format = {}
 
     def search(self, search_text, label_widget):
         """
@@ -543,83 +952,39 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         self.search_position = -1
         self.search_result = False
 
-        for item_id in self.text_format:
-            for item in self.attribute_widgets:
-                if item.id == item_id:
-                    cursor = item.attribute_widget.label_item.textCursor()
-                    for text_format in self.text_format[item_id]:
-                        cursor.setPosition(text_format[0])
-                        cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
-                        cursor.setCharFormat(text_format[1])
-        self.text_format = {}
+        self.clear_search_format()
 
         if search_text:
-            for item in self.attribute_widgets:
-                if isinstance(item, attribute.AttributeWidget):
-
-                    # search in node.
-                    text = item.attribute_widget.label_item.toPlainText()
-                    cursor = item.attribute_widget.label_item.textCursor()
-
-                    text_format = QtGui.QTextCharFormat()
-                    text_format.setBackground(QtGui.QBrush(QtGui.QColor(255, 153, 153, 200)))
-
-                    regex = QtCore.QRegExp(search_text)
-                    pos = 0
-                    index = regex.indexIn(text, pos)
-                    while index != -1:
-                        cursor.setPosition(index)
-                        cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
-                        last_format = cursor.charFormat()
-                        cursor.mergeCharFormat(text_format)
-
-                        if item.id not in self.text_format:
-                            self.text_format[item.id] = list()
-                            self.text_format[item.id].append((index, last_format))
-
-                        pos = index + regex.matchedLength()
-                        index = regex.indexIn(text, pos)
-                        self.search_result = True
-
-                    if self.search_result:
-                        self.search_list.append(item)
-                    self.search_result = False
-
-                    # search in sub view                  
-                    for sub_view_widget in self.children_view.values():
-                        for item in sub_view_widget.sub_view_widget_view.attribute_widgets:
-                            if isinstance(item, attribute.AttributeWidget):
-                                text = item.attribute_widget.label_item.toPlainText()
-                                cursor = item.attribute_widget.label_item.textCursor()
-
-                                text_format = QtGui.QTextCharFormat()
-                                text_format.setBackground(QtGui.QBrush(QtGui.QColor(255, 153, 153, 200)))
-
-                                regex = QtCore.QRegExp(search_text)
-                                pos = 0
-                                index = regex.indexIn(text, pos)
-                                while index != -1:
-                                    cursor.setPosition(index)
-                                    cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
-                                    last_format = cursor.charFormat()
-                                    cursor.mergeCharFormat(text_format)
-
-                                    if item.id not in self.text_format:
-                                        self.text_format[item.id] = list()
-                                        self.text_format[item.id].append((index, last_format))
-
-                                    pos = index + regex.matchedLength()
-                                    index = regex.indexIn(text, pos)
-                                    self.search_result = True
-
-                                if self.search_result and item not in self.search_list:
-                                    self.search_list.append(item)
-                                self.search_result = False
-
-                self.next_search(label_widget)
-
-                if not self.search_list:
-                    self.label_widget.setText("Result 0/0")
+            # materialize the serialized sub scenes with a hit, their nested sub scenes are indexed when loaded
+            self.update_sub_scene_index()
+            hits = {item for item, _ in self.sub_scene_index.query(search_text)}
+            while hits:
+                for item in hits:
+                    item.load_sub_scene()
+                self.update_sub_scene_index()
+                hits = {item for item, _ in self.sub_scene_index.query(search_text)}
+
+            # ranked hits of the index, then highlight the matching words of the hits only
+            self.update_search_index()
+            self.search_list = self.search_index.query(search_text)
+
+            text_format = QtGui.QTextCharFormat()
+            text_format.setBackground(QtGui.QBrush(QtGui.QColor(255, 153, 153, 200)))
+            for item in self.search_list:
+                # only the words the index matched, a query token starts them
+                text = item.attribute_widget.label_item.toPlainText()
+                cursor = item.attribute_widget.label_item.textCursor()
+                for index in text_index.match_positions(search_text, text):
+                    cursor.setPosition(index)
+                    cursor.movePosition(QtGui.QTextCursor.EndOfWord, 1)
+                    last_format = cursor.charFormat()
+                    cursor.mergeCharFormat(text_format)
+                    self.text_format.setdefault(item, list()).append((index, last_format))
+
+            self.next_search(label_widget)
+
+            if not self.search_list:
+                self.label_widget.setText("Result 0/0")
 
         else:
             self.label_widget.setText("Result 0/0")
@@ -666,27 +1031,32 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             
     
     def search_item(self, at_scene, label_widget):
+        self.focus_item(at_scene, self.search_list[self.search_position])
+        label_widget.setText("Result %d/%d" % (self.search_position + 1, len(self.search_list)))
+
+    def focus_item(self, at_scene, item):
+        """
+        Show the scene of an item and center the item.
+
+        Args:
+            at_scene: The scene of the item, in the root view or in a sub view.
+            item: The item.
+
+        """
+
         # if not sub view
         if at_scene.view.root_flag:
             self.mainwindow.view_widget.last_scene = self.mainwindow.view_widget.current_scene
             self.mainwindow.view_widget.last_scene_flag = self.mainwindow.view_widget.current_scene_flag
 
             self.current_scene = at_scene
-
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
-            while iterator.value():
-                scene_flag = iterator.value()
-                iterator += 1
-                if scene_flag.data(0, QtCore.Qt.ToolTipRole).id == at_scene.id:
-                    self.current_scene_flag = scene_flag
-                    scene_flag.setSelected(True)
-                    break
+            self.current_scene_flag = at_scene.sub_scene_flag
+            self.current_scene_flag.setSelected(True)
 
             self.background_image = at_scene.background_image
             self.cutline = at_scene.cutline
             self.setScene(at_scene)
-            self.centerOn(self.search_list[self.search_position])
-            label_widget.setText("Result %d/%d" % (self.search_position + 1, len(self.search_list)))
+            self.centerOn(item)
         # if sub view
         else:
             # 1. set last scene
@@ -697,14 +1067,8 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.current_scene = at_scene.view.proxy_widget.scene()
 
             # 3. set scene flag selected
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
-            while iterator.value():
-                scene_flag = iterator.value()
-                iterator += 1
-                if scene_flag.data(0, QtCore.Qt.ToolTipRole).id == self.current_scene.id:
-                    self.current_scene_flag = scene_flag
-                    scene_flag.setSelected(True)
-                    break
+            self.current_scene_flag = self.current_scene.sub_scene_flag
+            self.current_scene_flag.setSelected(True)
             
             # 4. change item
             self.background_image = self.current_scene.background_image
@@ -713,8 +1077,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
             # 5. focus on item
             self.centerOn(at_scene.view.proxy_widget)
-            at_scene.view.centerOn(self.search_list[self.search_position])
-            label_widget.setText("Result %d/%d" % (self.search_position + 1, len(self.search_list)))
+            at_scene.view.centerOn(item)
 
     def delete_connections(self, item):
         """
@@ -791,14 +1154,13 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             if isinstance(sub_item, ProxyView):
                 self.mainwindow.view_widget.children_view.pop(sub_item.id, 'not found')
 
+        if item.sub_scene_data:
+            item.load_sub_scene()
         if item.sub_scene:
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
-            while iterator.value():
-                scene_flag = iterator.value()
-                iterator += 1
-                if scene_flag.data(0, QtCore.Qt.ToolTipRole) is item.sub_scene:
-                    self.delete_sub_scene(scene_flag)
-                    break
+            # keep the sub scene for undo
+            self.current_scene.history.sub_scenes[item.id] = item.sub_scene
+            if item.sub_scene.sub_scene_flag.treeWidget() is self.mainwindow.scene_list:
+                self.delete_sub_scene(item.sub_scene.sub_scene_flag)
 
         if item.parentItem():
             parent_item = item.parentItem()
@@ -808,6 +1170,26 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         else:
             self.remove_attribute_widget(item)
 
+    def delete_logic_widget(self, item: attribute.LogicWidget):
+        """
+        Delete the logic widget with its pipes and connections.
+
+        Args:
+            item: The logic widget.
+
+        """
+
+        self.delete_connections(item)
+        for next_widget in item.next_attribute:
+            next_widget.remove_last_logic(item)
+        for next_widget in item.next_logic:
+            next_widget.remove_last_logic(item)
+        for last_widget in item.last_attribute:
+            last_widget.remove_next_logic(item)
+        for last_widget in item.last_logic:
+            last_widget.remove_next_logic(item)
+        self.remove_logic_widget(item)
+
     def delete_widgets(self, event, history_flag=False):
         """
         Delete the selected items.
@@ -825,16 +1207,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                     self.delete_attr_widget(item)
 
                 elif isinstance(item, attribute.LogicWidget):
-                    self.delete_connections(item)
-                    for next_widget in item.next_attribute:
-                        next_widget.remove_last_logic(item)
-                    for next_widget in item.next_logic:
-                        next_widget.remove_last_logic(item)
-                    for last_widget in item.last_attribute:
-                        last_widget.remove_next_logic(item)
-                    for last_widget in item.last_logic:
-                        last_widget.remove_next_logic(item)
-                    self.remove_logic_widget(item)
+                    self.delete_logic_widget(item)
                 elif isinstance(item, pipe.Pipe):
                     if item in self.current_scene.items() and item.start_port and item.end_port:
                         self.delete_pipe(item)
@@ -1049,14 +1422,18 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.get_all_children(parent_flag)
 
 
-    def create_attribute_from_data(self, data):
+    def create_attribute_from_data(self, data, copy_attribute_widget=None):
         """
         Used to create attribute from serialization to paste item.
 
         Args:
             data: Serialization of attribute widget.
+            copy_attribute_widget: {id: serialization} of the sub attribute widgets, the copied ones by default.
 
         """
+
+        if copy_attribute_widget is None:
+            copy_attribute_widget = self.mainwindow.view_widget.copy_attribute_widget
         node_widget = attribute.AttributeWidget()
 
         # Added into current scene and view
@@ -1122,7 +1499,8 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
         # sub items
         for attribute_sub_id in data.sub_attr:
-            sub_attribute_widget = self.create_attribute_from_data(self.mainwindow.view_widget.copy_attribute_widget.get(attribute_sub_id))
+            sub_attribute_widget = self.create_attribute_from_data(copy_attribute_widget.get(attribute_sub_id),
+                                                                   copy_attribute_widget)
             node_widget.attribute_sub_widgets.append(sub_attribute_widget)
             node_widget.attribute_layout.addItem(sub_attribute_widget,
                                             sub_attribute_widget.item_row,
@@ -1177,9 +1555,16 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
         """
         if self.mainwindow.view_widget.copy_attribute_widget:
+            # New ids for the pasted items, the copied items and their sub views keep theirs.
+            mapping = dict()
+            copy_attribute_widget = dict()
+            for copy_id, copy_data in self.mainwindow.view_widget.copy_attribute_widget.items():
+                data = type(copy_data)()
+                data.CopyFrom(copy_data)
+                serializable.Serializable.ids.remap(data, mapping)
+                copy_attribute_widget[data.attr_id if copy_id else 0] = data
             # Deserialize parent attribute widget.
-            data = self.mainwindow.view_widget.copy_attribute_widget[0]
-            self.create_attribute_from_data(data)
+            self.create_attribute_from_data(copy_attribute_widget[0], copy_attribute_widget)
 
     def remove_drag_pipe(self, port_widget, pipe_widget):
         """
@@ -1362,6 +1747,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
         """
         self.mainwindow.scene_list.clearSelection()
+        attribute_widget.load_sub_scene()
 
         if not attribute_widget.sub_scene:
             sub_scene_flag = TreeWidgetItem(self.current_scene_flag,
@@ -1378,6 +1764,9 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             attribute_widget.set_sub_scene(sub_scene)
 
             sub_scene_flag.setData(0, QtCore.Qt.ToolTipRole, sub_scene)
+            self.register_scene(sub_scene)
+            # an empty sub scene is still written by the journal
+            sub_scene.mark_dirty()
 
             if self.root_flag:
                 self.last_scene = self.current_scene
@@ -1443,16 +1832,17 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
         """
         self.mainwindow.scene_list.clearSelection()
+        sub_scene = self.flag_scene(sub_scene_item)
 
         if self.root_flag:
             if not remove_flag:
                 self.last_scene = self.current_scene
                 self.last_scene_flag = self.current_scene_flag
             else:
-                self.last_scene = sub_scene_item.data(0, QtCore.Qt.ToolTipRole)
+                self.last_scene = sub_scene
                 self.last_scene_flag = sub_scene_item
 
-            self.current_scene = sub_scene_item.data(0, QtCore.Qt.ToolTipRole)
+            self.current_scene = sub_scene
             self.current_scene_flag = sub_scene_item
             self.current_scene_flag.setSelected(True)
             self.setScene(self.current_scene)
@@ -1462,7 +1852,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.mainwindow.view_widget.last_scene = self.mainwindow.view_widget.current_scene
             self.mainwindow.view_widget.last_scene_flag = self.mainwindow.view_widget.current_scene_flag
 
-            self.mainwindow.view_widget.current_scene = sub_scene_item.data(0, QtCore.Qt.ToolTipRole)
+            self.mainwindow.view_widget.current_scene = sub_scene
             self.mainwindow.view_widget.current_scene_flag = sub_scene_item
             self.mainwindow.view_widget.current_scene_flag.setSelected(True)
             self.mainwindow.view_widget.setScene(self.mainwindow.view_widget.current_scene)
@@ -1485,11 +1875,83 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         parent_flag = sub_scene_item.parent()
 
         if parent_flag:
+            # the nested sub scenes are deleted with it, none of their segments is left behind
+            scenes = self.load_sub_scene_tree(sub_scene_item)
             # change current scene
             self.change_current_scene(parent_flag, remove_flag=True)
             # delete
             parent_flag.removeChild(sub_scene_item)
-            sub_scene_item.data(0, QtCore.Qt.ToolTipRole).attribute_widget.sub_scene = None
+            self.root_view().dropped_scenes.update(scene.id for scene in scenes)
+            scenes[0].attribute_widget.sub_scene = None
+
+    @staticmethod
+    def flag_scene(scene_flag: QtWidgets.QTreeWidgetItem):
+        """
+        Get the scene of an item in scene list, the sub scene is materialized if it is still serialized.
+
+        Args:
+            scene_flag: The item in scene list.
+
+        Returns:
+            Scene: The scene.
+
+        """
+
+        scene = scene_flag.data(0, QtCore.Qt.ToolTipRole)
+        if scene is None:
+            scene = scene_flag.data(0, QtCore.Qt.UserRole).load_sub_scene()
+        return scene
+
+    def load_sub_scene_tree(self, scene_flag: QtWidgets.QTreeWidgetItem):
+        """
+        Materialize the scene of an item in scene list and all sub scenes nested in it.
+
+        Args:
+            scene_flag: The item in scene list.
+
+        Returns:
+            scenes: The scene first, then its nested sub scenes.
+
+        """
+
+        scenes = list()
+        scene_flags = [scene_flag]
+        while scene_flags:
+            scene_flag = scene_flags.pop(0)
+            # the flags of its sub scenes are added when it is materialized
+            scenes.append(self.flag_scene(scene_flag))
+            scene_flags.extend(scene_flag.child(index) for index in range(scene_flag.childCount()))
+        return scenes
+
+    def load_sub_scenes(self, match):
+        """
+        Materialize the serialized sub scenes which contain a scene matching the condition.
+
+        Args:
+            match: Function of the protobuff scene object, returns bool.
+
+        """
+
+        def contains(scene_serialization):
+            if match(scene_serialization):
+                return True
+            for attribute_data in scene_serialization.attr_serialization:
+                for sub_scene_serialization in attribute_data.sub_scene_serialization:
+                    if contains(sub_scene_serialization):
+                        return True
+            return False
+
+        # the materialized widgets are appended, so nested sub scenes are visited too.
+        index = 0
+        while index < len(self.attribute_widgets):
+            item = self.attribute_widgets[index]
+            index += 1
+            if isinstance(item, attribute.AttributeWidget) and item.sub_scene_data:
+                scene_serialization = serialize_pb2.ViewSerialization.SceneSerialization()
+                scene_serialization.ParseFromString(item.sub_scene_data)
+                self.nest_sub_scene_segments(scene_serialization)
+                if contains(scene_serialization):
+                    item.load_sub_scene()
 
     def print_item(self, part: str):
         """
@@ -1504,12 +1966,10 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             pic = QtGui.QPixmap(self.current_scene.sceneRect().width(), self.current_scene.sceneRect().height())
             painter = QtGui.QPainter(pic)
             painter.setRenderHint(QtGui.QPainter.Antialiasing)
-            self.current_scene.draw_image = QtGui.QImage(os.path.abspath(os.path.join(constants.work_dir,
-                                                    "Resources/Images/scene_background.png")))
+            self.current_scene.draw_image = BackgroundCache.pixmap("Resources/Images/scene_background.png")
             self.current_scene.removeItem(self.background_image)
             self.current_scene.render(painter)
-            self.current_scene.draw_image = QtGui.QImage(os.path.abspath(os.path.join(constants.work_dir,
-                                                    "Resources/Images/common_background_image.png")))
+            self.current_scene.draw_image = BackgroundCache.pixmap("Resources/Images/common_background_image.png")
             self.current_scene.addItem(self.background_image)
             painter.end()
             name, ok = QtWidgets.QFileDialog.getSaveFileName(self, "Save Image", "./"+str(time.time())+".png", "Image type(*.png *.jpg)")
@@ -1559,8 +2019,10 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                                                                     "Export current scene including sub scene to note file", os.path.join(constants.work_dir, ".note"),
                                                                     "note (*.note)")
                 if filename and ok:
+                    view_serialization = serialize_pb2.ViewSerialization()
+                    self.serialize(view_serialization, export_current_scene=True)
                     with open(filename, 'wb') as file:
-                        file.write(self.serialize(export_current_scene=True))   
+                        note_file.write_note_file(file, view_serialization)
             else:
                 attribute.AttributeWidget.export_sub_scene_flag = False
 
@@ -1568,8 +2030,10 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                                                                         "Export current scene not including sub scene to note file", os.path.join(constants.work_dir, ".note"),
                                                                         "note (*.note)")
                 if filename and ok:
+                    view_serialization = serialize_pb2.ViewSerialization()
+                    self.serialize(view_serialization, export_current_scene=True)
                     with open(filename, 'wb') as file:
-                        file.write(self.serialize(export_current_scene=True))
+                        note_file.write_note_file(file, view_serialization)
                 
                 attribute.AttributeWidget.export_sub_scene_flag = True
 
@@ -1788,6 +2252,22 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         if event.key() == QtCore.Qt.Key_0 and int(event.modifiers()) & QtCore.Qt.ControlModifier:
             self.view_update_pipe_animation()
             return
+        if event.key() == QtCore.Qt.Key_D and int(event.modifiers()) & QtCore.Qt.AltModifier:
+            self.select_connected(downstream=True)
+            return
+        if event.key() == QtCore.Qt.Key_U and int(event.modifiers()) & QtCore.Qt.AltModifier:
+            self.select_connected(downstream=False)
+            return
+        if event.key() == QtCore.Qt.Key_P and int(event.modifiers()) & QtCore.Qt.AltModifier and \
+                not int(event.modifiers()) & QtCore.Qt.ControlModifier:
+            self.select_path()
+            return
+        if event.key() == QtCore.Qt.Key_L and int(event.modifiers()) & QtCore.Qt.AltModifier:
+            self.select_cycles()
+            return
+        if event.key() == QtCore.Qt.Key_A and int(event.modifiers()) & QtCore.Qt.AltModifier:
+            self.layout_widgets()
+            return
         if event.key() == QtCore.Qt.Key_9 and int(event.modifiers()) & QtCore.Qt.ControlModifier:
             self.python_highlighter()
             return
@@ -1815,6 +2295,9 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                 int(event.modifiers()) & QtCore.Qt.ShiftModifier:
             self.print_item(part="Items")
             return
+        if event.key() == QtCore.Qt.Key_P and int(event.modifiers()) & QtCore.Qt.ControlModifier and self.root_flag:
+            self.palette.toggle()
+            return
         if event.key() == QtCore.Qt.Key_S and int(event.modifiers()) & QtCore.Qt.AltModifier:
             self.export_current_scene(include=True)
             return
@@ -1827,6 +2310,11 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         if event.key() == QtCore.Qt.Key_F2 and self.root_flag:
             self.undo_flag = not self.undo_flag
             return
+        if event.key() == QtCore.Qt.Key_F3 and self.root_flag:
+            self.set_update_mode(self.update_mode + 1)
+            for child_view in self.children_view.values():
+                child_view.sub_view_widget_view.set_update_mode(self.update_mode)
+            return
         if event.key() == QtCore.Qt.Key_F11:
             self.change_flowing_image(True)
             return
@@ -1916,7 +2404,21 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         else:
             self.current_scene.serialize(view_serialization.scene_serialization.add())
 
+        self.serialize_styles(view_serialization)
+
+        return view_serialization.SerializeToString()
+
+    def serialize_styles(self, view_serialization):
+        """
+        Serialize the styles and flags of the view without scenes.
+
+        Args:
+            view_serialization: The protobuff object.
+
+        """
+
         view_serialization.current_scene_id = self.current_scene.id
+        view_serialization.next_id = serializable.Serializable.ids.next_id
 
         # ui serialization
         if self.image_path:
@@ -1970,12 +2472,11 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         if self.root_flag:
             view_serialization.line_flag = self.line_flag
         view_serialization.undo_flag = self.undo_flag
+        view_serialization.update_mode = self.update_mode
 
         # flowing image
         view_serialization.flowing_flag = self.flowing_flag
 
-        return view_serialization.SerializeToString()
-
     def deserialize(self, data, hashmap: dict, view=None, flag=True):
         """
         Deserialization.
@@ -1995,6 +2496,20 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                 self.root_scene.removeItem(item)
         if self.root_flag:
             self.mainwindow.scene_list.clear()
+            # the search results and the index belong to the previous note
+            self.text_format = {}
+            self.search_list = list()
+            self.search_position = -1
+            self.search_result = False
+            self.search_index = text_index.TextIndex()
+            self.search_dirty = set()
+            self.sub_scene_index = text_index.TextIndex()
+            self.sub_scene_keys = dict()
+            self.sub_scene_dirty = set()
+            self.palette_index = trigram_index.TrigramIndex()
+            self.palette_dirty = set()
+            self.palette_scenes = set()
+            self.dropped_scenes = set()
         self.attribute_widgets = list()
         self.logic_widgets = list()
         self.pipes = list()
@@ -2002,7 +2517,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
 
         # image path
         if data.image_path:
-            effect_snow.SnowWidget.image_path = data.image_path
+            effect_snow.EffectSkyWidget.image_path = data.image_path
             self.image_path = data.image_path
         
         if data.HasField("style_path"):
@@ -2014,6 +2529,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
                 self.mainwindow.scene_list,
                 ("Root Scene",))
             self.root_scene_flag.setData(0, QtCore.Qt.ToolTipRole, self.root_scene)
+            self.root_scene.sub_scene_flag = self.root_scene_flag
         self.current_scene = self.root_scene
         self.current_scene_flag = self.root_scene_flag
         self.background_image = self.current_scene.background_image
@@ -2056,6 +2572,7 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         port.Port.hovered_border_color.setRgba(data.all_port_color[3])
         port.Port.activated_color.setRgba(data.all_port_color[4])
         port.Port.activated_border_color.setRgba(data.all_port_color[5])
+        Scene.all_styles_changed()
 
         #   draw widget
         draw.Draw.pen_width = data.all_draw_width
@@ -2080,6 +2597,8 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
             self.line_flag = data.line_flag
         if data.undo_flag:
             self.undo_flag = data.undo_flag
+        if data.HasField("update_mode"):
+            self.set_update_mode(data.update_mode)
 
         if data.HasField("flowing_flag"):
             self.flowing_flag = data.flowing_flag
@@ -2089,28 +2608,27 @@ class View(QtWidgets.QGraphicsView, serializable.Serializable):
         self.mainwindow.style_switch_combox.setCurrentIndex(1)
         self.mainwindow.style_switch_combox.setCurrentIndex(0)
 
-        # create contents
+        # create contents, the widgets built while loading get the saved ids
         hashmap = {}
-        self.root_scene.deserialize(data.scene_serialization[0], hashmap, view, flag=True)
-        self.root_scene.deserialize(data.scene_serialization[0], hashmap, view, flag=False)
+        with serializable.Serializable.ids.loading():
+            self.root_scene.deserialize(data.scene_serialization[0], hashmap, view, flag=True)
+            self.root_scene.deserialize(data.scene_serialization[0], hashmap, view, flag=False)
 
         # recover current scene
         if self.root_flag:
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
-            while iterator.value():
-                scene_flag = iterator.value()
-                iterator += 1
-                if scene_flag.data(0, QtCore.Qt.ToolTipRole).id == data.current_scene_id:
-                    self.current_scene = scene_flag.data(0, QtCore.Qt.ToolTipRole)
-                    self.current_scene_flag = scene_flag
-                    self.background_image = self.current_scene.background_image
-                    self.cutline = self.current_scene.cutline
-                    self.setScene(self.current_scene)
-
-                    self.last_scene = self.current_scene
-                    self.last_scene_flag = self.current_scene_flag
+            if data.current_scene_id != self.root_scene.id:
+                self.load_sub_scenes(
+                    lambda scene_serialization: scene_serialization.scene_id == data.current_scene_id)
+            current_scene = self.get_scene(data.current_scene_id)
+            if current_scene:
+                self.current_scene = current_scene
+                self.current_scene_flag = current_scene.sub_scene_flag
+                self.background_image = self.current_scene.background_image
+                self.cutline = self.current_scene.cutline
+                self.setScene(self.current_scene)
 
-                    break
+                self.last_scene = self.current_scene
+                self.last_scene_flag = self.current_scene_flag
 
             expanded_item = 0
             iterator = QtWidgets.QTreeWidgetItemIterator(self.mainwindow.scene_list)
@@ -0,0 +1,311 @@
+"""
+Content addressed backups of .note files.
+
+History/
+    objects/<2 hex>/<sha256>    zlib compressed chunks, every unique chunk is stored once.
+    snapshots/<time>_<milliseconds>_<key>_<file name>.json    {"name", "time", "size", "chunks"}
+
+A note is named by its path relative to the work dir which holds History, so notes with
+the same file name in different folders keep separate backups.
+
+Containers are chunked at their segment boundaries, so the scenes which did not change
+between two saves share their chunks. Inside a segment the boundaries depend on the content
+(a gear rolling hash), so an edit early in a large scene only changes the chunks around it.
+"""
+
+import hashlib
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+from ..Model import note_file
+
+__all__ = ["BackupStore", "chunk_data", "content_cuts"]
+
+MIN_CHUNK_SIZE = 4 * 1024
+MAX_CHUNK_SIZE = 64 * 1024
+# a position is a boundary when the top bits of its hash are zero, 16 KiB chunks on average
+BOUNDARY_BITS = 14
+# bytes in the window of the hash, one bit of shift per byte
+WINDOW = 32
+# hashed in blocks, so a large segment does not need a hash array of its size
+BLOCK_SIZE = 1024 * 1024
+
+# the random value of each byte, derived from sha256 so it never changes between versions
+GEAR = np.array([int.from_bytes(hashlib.sha256(bytes((value,))).digest()[:4], "little") for value in range(256)],
+                dtype=np.uint32)
+
+
+def content_cuts(data, start, end):
+    """
+    The content defined boundaries inside a range, found by a gear rolling hash.
+
+    Args:
+        data: bytes.
+        start: The start of the range.
+        end: The end of the range.
+
+    Returns:
+        cuts: Sorted offsets inside the range, without start and end.
+            The chunks between them are at least MIN_CHUNK_SIZE and at most MAX_CHUNK_SIZE long.
+
+    """
+
+    candidates = list()
+    view = np.frombuffer(data, dtype=np.uint8)
+    for block_start in range(start, end, BLOCK_SIZE):
+        block_end = min(block_start + BLOCK_SIZE, end)
+        # the window reaches back into the last block
+        context = max(block_start - (WINDOW - 1), start)
+        values = GEAR[view[context: block_end]]
+        hashes = np.zeros(len(values), dtype=np.uint32)
+        for shift in range(WINDOW):
+            hashes[shift:] += values[:len(values) - shift] << np.uint32(shift)
+        hashes = hashes[block_start - context:]
+        # the boundary follows the byte whose window hashed to it
+        boundaries = np.flatnonzero((hashes >> np.uint32(32 - BOUNDARY_BITS)) == 0) + block_start + 1
+        candidates.extend(boundaries.tolist())
+
+    cuts = list()
+    last = start
+    for candidate in candidates + [end]:
+        while candidate - last > MAX_CHUNK_SIZE:
+            last += MAX_CHUNK_SIZE
+            cuts.append(last)
+        if candidate - last >= MIN_CHUNK_SIZE and candidate < end:
+            cuts.append(candidate)
+            last = candidate
+    return cuts
+
+
+def chunk_data(data):
+    """
+    Split the bytes of a .note file into chunks.
+
+    Args:
+        data: bytes.
+
+    Returns:
+        chunks: [bytes].
+
+    """
+
+    cuts = {0, len(data)}
+    if data[:len(note_file.MAGIC)] == note_file.MAGIC and len(data) >= note_file.HEADER.size:
+        _, _, count = note_file.HEADER.unpack_from(data, 0)
+        table_end = note_file.HEADER.size + note_file.ENTRY.size * count
+        if table_end <= len(data):
+            cuts.add(table_end)
+            for index in range(count):
+                _, _, _, offset, length = note_file.ENTRY.unpack_from(data, note_file.HEADER.size +
+                                                                      note_file.ENTRY.size * index)
+                if offset + length <= len(data):
+                    cuts.add(offset)
+                    cuts.add(offset + length)
+
+    chunks = []
+    cuts = sorted(cuts)
+    for start, end in zip(cuts, cuts[1:]):
+        offsets = [start] + content_cuts(data, start, end) + [end]
+        for offset, next_offset in zip(offsets, offsets[1:]):
+            chunks.append(data[offset: next_offset])
+    return chunks
+
+
+class BackupStore:
+    """
+    Deduplicated backup store with a retention policy:
+    keep every backup of the last hour, one per hour for a day and one per day for a month.
+
+    """
+
+    keep_all = 60 * 60
+    keep_hourly = 24 * 60 * 60
+    keep_daily = 30 * 24 * 60 * 60
+
+    def __init__(self, root):
+        """
+        Args:
+            root: The History directory.
+
+        """
+
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def write_object(self, digest, chunk):
+        """
+        Store a chunk unless it is stored already.
+
+        """
+
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(zlib.compress(chunk))
+        os.replace(temp_path, path)
+
+    def read_object(self, digest):
+        with open(self.object_path(digest), "rb") as file:
+            chunk = zlib.decompress(file.read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError("Broken backup chunk: %s" % digest)
+        return chunk
+
+    def note_name(self, path):
+        """
+        The name of a note in the store.
+
+        Args:
+            path: The path of the .note file.
+
+        Returns:
+            name: The path relative to the work dir, with "/" separators.
+
+        """
+
+        work_dir = os.path.dirname(os.path.abspath(self.root))
+        return os.path.relpath(os.path.abspath(path), work_dir).replace(os.sep, "/")
+
+    def backup(self, path, timestamp=None):
+        """
+        Back up a .note file, a file identical to its last backup is skipped.
+
+        Args:
+            path: The path of the .note file.
+            timestamp: The time of the backup, now by default.
+
+        Returns:
+            snapshot: The snapshot name or None when it is skipped.
+
+        """
+
+        with open(path, "rb") as file:
+            data = file.read()
+        name = self.note_name(path)
+        timestamp = time.time() if timestamp is None else timestamp
+
+        digests = []
+        for chunk in chunk_data(data):
+            digest = hashlib.sha256(chunk).hexdigest()
+            self.write_object(digest, chunk)
+            digests.append(digest)
+
+        snapshots = self.snapshots(name)
+        if snapshots and snapshots[-1]["chunks"] == digests:
+            return None
+
+        # milliseconds and a counter, so two backups within a second keep both manifests
+        stamp = "%s_%03d" % (time.strftime('%Y_%m_%d_%H_%M_%S', time.localtime(timestamp)),
+                             int(timestamp * 1000) % 1000)
+        key = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        snapshot = "%s_%s_%s.json" % (stamp, key, os.path.basename(path))
+        count = 1
+        while os.path.exists(os.path.join(self.snapshots_dir, snapshot)):
+            snapshot = "%s_%d_%s_%s.json" % (stamp, count, key, os.path.basename(path))
+            count += 1
+        manifest = {"name": name, "time": timestamp, "size": len(data), "chunks": digests}
+        temp_path = os.path.join(self.snapshots_dir, snapshot + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(temp_path, os.path.join(self.snapshots_dir, snapshot))
+        return snapshot
+
+    def snapshots(self, name=None):
+        """
+        The snapshots, oldest first.
+
+        Args:
+            name: The name of the note from note_name, None for all notes.
+
+        Returns:
+            manifests: [dict] with the snapshot name in "snapshot".
+
+        """
+
+        manifests = []
+        for snapshot in os.listdir(self.snapshots_dir):
+            if not snapshot.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.snapshots_dir, snapshot), "r", encoding="utf-8") as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if name is None or manifest["name"] == name:
+                manifest["snapshot"] = snapshot
+                manifests.append(manifest)
+        manifests.sort(key=lambda manifest: manifest["time"])
+        return manifests
+
+    def restore(self, snapshot, path):
+        """
+        Write a snapshot back to a file.
+
+        Args:
+            snapshot: The snapshot name.
+            path: The path of the restored file.
+
+        """
+
+        with open(os.path.join(self.snapshots_dir, snapshot), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            for digest in manifest["chunks"]:
+                file.write(self.read_object(digest))
+        os.replace(temp_path, path)
+
+    def prune(self, now=None):
+        """
+        Apply the retention policy and delete the chunks no snapshot refers to.
+
+        Args:
+            now: The current time.
+
+        """
+
+        now = time.time() if now is None else now
+        kept_buckets = set()
+        kept_names = set()
+        referenced = set()
+        # newest first, so the newest snapshot of every bucket is kept
+        for manifest in reversed(self.snapshots()):
+            age = now - manifest["time"]
+            # the newest snapshot of a note is always kept, identical backups are skipped
+            if manifest["name"] not in kept_names or age <= self.keep_all:
+                bucket = None
+            elif age <= self.keep_hourly:
+                bucket = (manifest["name"], "hour", int(manifest["time"] // 3600))
+            elif age <= self.keep_daily:
+                bucket = (manifest["name"], "day", time.localtime(manifest["time"])[:3])
+            else:
+                bucket = False
+
+            if bucket is False or bucket in kept_buckets:
+                os.remove(os.path.join(self.snapshots_dir, manifest["snapshot"]))
+                continue
+            if bucket is not None:
+                kept_buckets.add(bucket)
+            kept_names.add(manifest["name"])
+            referenced.update(manifest["chunks"])
+
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    os.remove(os.path.join(prefix_dir, digest))
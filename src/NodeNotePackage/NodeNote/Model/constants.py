@@ -48,6 +48,7 @@ flowing_image = 'Resources/Images/flower.png'
 view_line_flag = True
 view_undo_flag = True
 view_flowing_flag = True
+view_update_mode = 0
 # scene flag
 scene_background_image_flag = False
 # style
@@ -89,6 +90,19 @@ NODE_SEL_BORDER_COLOR = (254, 207, 42, 255)
 # === ITEM CACHE MODE ===
 ITEM_CACHE_MODE = QGraphicsItem.DeviceCoordinateCache
 
+# === VIEW UPDATE MODE ===
+# (name, viewport update mode) the view switches between with F3, full updates also antialias in high quality
+VIEW_UPDATE_MODES = (
+    ("Smart", QtWidgets.QGraphicsView.SmartViewportUpdate),
+    ("Minimal", QtWidgets.QGraphicsView.MinimalViewportUpdate),
+    ("Bounding Rect", QtWidgets.QGraphicsView.BoundingRectViewportUpdate),
+    ("Full", QtWidgets.QGraphicsView.FullViewportUpdate),
+)
+
+# === LEVEL OF DETAIL ===
+# below this scale nodes are drawn as plain rects, pipes as lines and ports and texts are skipped
+LOD_SCALE = 0.5
+
 # === NODE TYPE ===
 INPUT_NODE_TYPE = 0
 OUTPUT_NODE_TYPE = 1
@@ -111,6 +125,8 @@ OUTPUT_NODE_START = 1
 COLLIDING_ATTRIBUTE = 0
 COLLIDING_PIPE = 1
 COLLIDING_NONE = 2
+# milliseconds between two colliding detections while dragging
+COLLIDING_INTERVAL = 16
 
 # === PIPE MOVE ===
 PIPE_FIRST = 0
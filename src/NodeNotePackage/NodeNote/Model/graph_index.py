@@ -0,0 +1,246 @@
+"""
+graph_index.py - Adjacency of the widgets connected by pipes, walked without recursion.
+"""
+
+import array
+import collections
+
+__all__ = ["GraphIndex"]
+
+
+class GraphIndex:
+    """
+    The pipes of a scene as compact adjacency arrays.
+        - Every widget gets an integer index, the edges go from the output widget to the input widget.
+        - The successors of index i are targets[offsets[i]:offsets[i + 1]], the predecessors use the reversed arrays.
+        - Walks are iterative, so the length of a chain is not limited by the recursion limit.
+
+    """
+
+    def __init__(self):
+        # [key], the key of each index
+        self.keys = list()
+        # {key: index}
+        self.indices = dict()
+        self.offsets = array.array("l", [0])
+        self.targets = array.array("l")
+        self.reversed_offsets = array.array("l", [0])
+        self.reversed_targets = array.array("l")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.indices
+
+    @staticmethod
+    def compress(count, edges):
+        """
+        Sort edges by their source into offsets and targets.
+
+        Args:
+            count: The number of nodes.
+            edges: List of (source index, target index).
+
+        Returns:
+            offsets, targets: array of int.
+
+        """
+
+        offsets = array.array("l", [0] * (count + 1))
+        for source, _ in edges:
+            offsets[source + 1] += 1
+        for index in range(count):
+            offsets[index + 1] += offsets[index]
+        targets = array.array("l", [0] * len(edges))
+        position = offsets[:-1]
+        for source, target in edges:
+            targets[position[source]] = target
+            position[source] += 1
+        return offsets, targets
+
+    def build(self, keys, edges):
+        """
+        Replace the graph.
+
+        Args:
+            keys: The nodes, hashable keys.
+            edges: List of (source key, target key), edges with an unknown key or repeated edges are skipped.
+
+        """
+
+        self.keys = list(dict.fromkeys(keys))
+        self.indices = {key: index for index, key in enumerate(self.keys)}
+        index_edges = list()
+        for source, target in edges:
+            if source in self.indices and target in self.indices:
+                index_edges.append((self.indices[source], self.indices[target]))
+        index_edges = list(dict.fromkeys(index_edges))
+        self.offsets, self.targets = self.compress(len(self.keys), index_edges)
+        self.reversed_offsets, self.reversed_targets = \
+            self.compress(len(self.keys), [(target, source) for source, target in index_edges])
+
+    def successors(self, key):
+        # unknown keys have no neighbours
+        index = self.indices.get(key)
+        if index is None:
+            return list()
+        return [self.keys[target] for target in self.targets[self.offsets[index]:self.offsets[index + 1]]]
+
+    def predecessors(self, key):
+        index = self.indices.get(key)
+        if index is None:
+            return list()
+        return [self.keys[source] for source in
+                self.reversed_targets[self.reversed_offsets[index]:self.reversed_offsets[index + 1]]]
+
+    def neighbours(self, index, downstream=True, upstream=False):
+        """
+        The indices connected to an index.
+
+        Args:
+            index: The node index.
+            downstream: Follow the edges.
+            upstream: Follow the edges backwards.
+
+        Returns:
+            indices: array of int.
+
+        """
+
+        result = array.array("l")
+        if downstream:
+            result.extend(self.targets[self.offsets[index]:self.offsets[index + 1]])
+        if upstream:
+            result.extend(self.reversed_targets[self.reversed_offsets[index]:self.reversed_offsets[index + 1]])
+        return result
+
+    def traverse(self, starts, downstream=True, upstream=False, depth_first=False):
+        """
+        The nodes reachable from the start nodes, each one once.
+
+        Args:
+            starts: The start keys, unknown keys are skipped.
+            downstream: Follow the edges.
+            upstream: Follow the edges backwards.
+            depth_first: Visit in depth first order instead of breadth first order.
+
+        Returns:
+            keys: The start keys first, then the reached keys in visit order.
+
+        """
+
+        visited = bytearray(len(self.keys))
+        order = list()
+        pending = collections.deque()
+        for key in starts:
+            index = self.indices.get(key)
+            if index is not None and not visited[index]:
+                visited[index] = 1
+                order.append(index)
+                pending.append(index)
+        while pending:
+            index = pending.pop() if depth_first else pending.popleft()
+            for neighbour in self.neighbours(index, downstream, upstream):
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    order.append(neighbour)
+                    pending.append(neighbour)
+        return [self.keys[index] for index in order]
+
+    def downstream(self, starts):
+        # the start keys are included
+        return self.traverse(starts, downstream=True, upstream=False)
+
+    def upstream(self, starts):
+        # the start keys are included
+        return self.traverse(starts, downstream=False, upstream=True)
+
+    def shortest_path(self, source, target, directed=True):
+        """
+        The path with the fewest edges between two nodes.
+
+        Args:
+            source: The start key.
+            target: The end key.
+            directed: Only follow the edges forwards, otherwise in both directions.
+
+        Returns:
+            keys: From the source to the target, empty if the target is not reachable.
+
+        """
+
+        if source not in self.indices or target not in self.indices:
+            return list()
+        start, end = self.indices[source], self.indices[target]
+        parents = array.array("l", [-1] * len(self.keys))
+        parents[start] = start
+        pending = collections.deque([start])
+        while pending and parents[end] == -1:
+            index = pending.popleft()
+            for neighbour in self.neighbours(index, True, not directed):
+                if parents[neighbour] == -1:
+                    parents[neighbour] = index
+                    pending.append(neighbour)
+        if parents[end] == -1:
+            return list()
+        path = [end]
+        while path[-1] != start:
+            path.append(parents[path[-1]])
+        return [self.keys[index] for index in reversed(path)]
+
+    def find_cycles(self):
+        """
+        The groups of nodes lying on a cycle, found by an iterative Tarjan walk.
+
+        Returns:
+            cycles: List of key lists, each one a strongly connected component with a cycle.
+
+        """
+
+        count = len(self.keys)
+        numbers = array.array("l", [-1] * count)
+        lowlinks = array.array("l", [0] * count)
+        on_stack = bytearray(count)
+        stack = list()
+        cycles = list()
+        counter = 0
+
+        for root in range(count):
+            if numbers[root] != -1:
+                continue
+            # (index, position of the next successor)
+            work = [(root, self.offsets[root])]
+            numbers[root] = lowlinks[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                index, position = work[-1]
+                if position < self.offsets[index + 1]:
+                    work[-1] = (index, position + 1)
+                    target = self.targets[position]
+                    if numbers[target] == -1:
+                        numbers[target] = lowlinks[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, self.offsets[target]))
+                    elif on_stack[target]:
+                        lowlinks[index] = min(lowlinks[index], numbers[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[index])
+                if lowlinks[index] == numbers[index]:
+                    component = list()
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == index:
+                            break
+                    if len(component) > 1 or index in self.targets[self.offsets[index]:self.offsets[index + 1]]:
+                        cycles.append([self.keys[member] for member in reversed(component)])
+        return cycles
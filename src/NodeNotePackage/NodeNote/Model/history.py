@@ -1,12 +1,30 @@
-from ..Model import serialize_pb2
-from PyQt5 import QtGui, QtCore
+from ..Model import serialize_pb2, serializable
+from ..Components import attribute, pipe, port, draw
+from PyQt5 import QtWidgets
 
 
 class History:
     """
-    Serialization for undo && redo.
+    Delta serialization for undo && redo.
+
+    Every step only stores the items whose serialization changed, as
+    {(kind, id): (old bytes, new bytes)}, so it can be replayed in both directions.
+    A full checkpoint of the records is kept every few steps.
 
     """
+
+    messages = {
+        "attr": serialize_pb2.ViewSerialization.SceneSerialization.AttrSerialization,
+        "logic": serialize_pb2.ViewSerialization.SceneSerialization.LogicSerialization,
+        "pipe": serialize_pb2.ViewSerialization.SceneSerialization.PipeSerialization,
+        "draw": serialize_pb2.ViewSerialization.SceneSerialization.DrawSerialization,
+        "scene": serialize_pb2.ViewSerialization.SceneSerialization,
+    }
+
+    # fields describing the sub widgets of an attribute widget, changing them rebuilds its layout.
+    sub_widget_fields = ("sub_attr", "file_serialization", "subview_serialization",
+                         "todo_serialization", "none_serialization")
+
     def __init__(self, view):
         """
         Create the list to store Serialization.
@@ -19,7 +37,27 @@ class History:
 
         self.history_stack = []
         self.history_current_step = -1
-        self.history_limit = 50
+        # bytes of the stored deltas, the checkpoints share their bytes with the deltas.
+        self.history_limit = 32 * 1024 * 1024
+        self.history_size = 0
+        self.checkpoint_interval = 25
+
+        # {(kind, id): bytes} of the current step, None until the loaded items are recorded.
+        self.records = None
+        # {attribute widget id: sub scene}, keeps sub scenes of deleted widgets for undo.
+        self.sub_scenes = {}
+
+    def clear_history(self):
+        """
+        Forget all steps, the loaded items become the next base line.
+
+        """
+
+        self.history_stack = []
+        self.history_current_step = -1
+        self.history_size = 0
+        self.records = None
+        self.sub_scenes = {}
 
     def undo(self):
         """
@@ -27,9 +65,9 @@ class History:
 
         """
 
-        if self.history_current_step > 0:
+        if self.history_current_step >= 0:
+            self.restore_history(self.history_current_step, redo=False)
             self.history_current_step -= 1
-            self.restore_history()
 
     def redo(self):
         """
@@ -39,71 +77,494 @@ class History:
 
         if self.history_current_step + 1 < len(self.history_stack):
             self.history_current_step += 1
-            self.restore_history()
+            self.restore_history(self.history_current_step, redo=True)
 
-    def store_history(self, desc):
+    def store_history(self, desc, items=None):
         """
-        Store the Serialization into list.
+        Store the changed Serialization into list.
 
         Args:
             desc: The description of the operation.
+            items: The items changed by the operation, None to compare the whole scene.
 
         """
 
-        if self.history_current_step + 1 < len(self.history_stack):
-            self.history_stack = self.history_stack[0: self.history_current_step]
+        if self.records is None:
+            # the first operation after loading becomes the base line.
+            self.records = self.create_records()
+            self.view.current_scene.mark_dirty()
+            return
 
-        if self.history_current_step + 1 >= self.history_limit:
-            self.history_stack = self.history_stack[1:]
-            self.history_current_step -= 1
+        if items is None:
+            current_records = self.create_records()
+            removed_keys = set(self.records) - set(current_records)
+        else:
+            current_records = self.create_records(items)
+            removed_keys = ()
+
+        changes = {}
+        for key, data in current_records.items():
+            old_data = self.records.get(key)
+            if old_data != data:
+                changes[key] = (old_data, data)
+        for key in removed_keys:
+            changes[key] = (self.records[key], None)
+        if not changes:
+            return
+        self.view.current_scene.mark_dirty()
+
+        # drop the redo steps
+        for history_stamp in self.history_stack[self.history_current_step + 1:]:
+            self.history_size -= history_stamp['size']
+        del self.history_stack[self.history_current_step + 1:]
 
-        hs = self.create_history_stamp(desc)
+        self.apply_changes(self.records, changes, redo=True)
+        hs = self.create_history_stamp(desc, changes)
         self.history_stack.append(hs)
         self.history_current_step += 1
+        self.history_size += hs['size']
 
-    def restore_history(self):
+        # memory bound, the first step always keeps a checkpoint
+        while self.history_size > self.history_limit and len(self.history_stack) > 1:
+            oldest_stamp = self.history_stack.pop(0)
+            self.history_size -= oldest_stamp['size']
+            self.history_current_step -= 1
+            if self.history_stack[0]['checkpoint'] is None:
+                self.history_stack[0]['checkpoint'] = self.apply_changes(oldest_stamp['checkpoint'],
+                                                                         self.history_stack[0]['changes'],
+                                                                         redo=True)
+
+    def restore_history(self, step, redo):
         """
         Restore the Serialization from list.
 
+        Args:
+            step: The index of the step to apply.
+            redo: Apply the step forwards or backwards.
+
         """
 
-        self.restore_history_stamp(self.history_stack[self.history_current_step])
+        self.view.current_scene.mark_dirty()
+        history_stamp = self.history_stack[step]
+        changes = {key: (old_data, new_data) if redo else (new_data, old_data)
+                   for key, (old_data, new_data) in history_stamp['changes'].items()}
+        live_items = self.live_items()
 
-    def create_history_stamp(self, desc):
+        if self.records is not None and all(old_data is None or key in live_items
+                                            for key, (old_data, _) in changes.items()):
+            # the restored widgets get their recorded ids
+            with serializable.Serializable.ids.loading():
+                self.restore_history_stamp(changes, live_items)
+            self.apply_changes(self.records, history_stamp['changes'], redo)
+            return
+
+        # the scene is out of sync with the records, compare it with the nearest checkpoint
+        records = self.records_at(step if redo else step - 1)
+        current_records = self.create_records()
+        changes = {}
+        for key in set(records) | set(current_records):
+            if current_records.get(key) != records.get(key):
+                changes[key] = (current_records.get(key), records.get(key))
+        self.records = records
+        with serializable.Serializable.ids.loading():
+            self.restore_history_stamp(changes, live_items)
+
+    def create_history_stamp(self, desc, changes):
         """
         Create Serialization.
 
         Args:
             desc: The description of the operation.
+            changes: {(kind, id): (old bytes, new bytes)}.
 
         Returns:
             history_stamp: The Serialization dictionary.
 
         """
-        view_serialization = serialize_pb2.ViewSerialization()
-        current_scene_serialization = view_serialization.scene_serialization.add()
-        self.view.current_scene.serialize(current_scene_serialization)
+
+        checkpoint = None
+        if not any(history_stamp['checkpoint'] is not None
+                   for history_stamp in self.history_stack[-(self.checkpoint_interval - 1):]):
+            checkpoint = dict(self.records)
+
         history_stamp = {
             'desc': desc,
-            'snapshot': current_scene_serialization
+            'changes': changes,
+            'checkpoint': checkpoint,
+            'size': sum(len(old_data or b"") + len(new_data or b"") for old_data, new_data in changes.values())
         }
         return history_stamp
 
-    def restore_history_stamp(self, history_stamp):
+    def create_records(self, items=None):
         """
-        Deserialization.
+        Serialize items of the current scene one by one.
 
         Args:
-            history_stamp: The Serialization dictionary.
+            items: The changed items, None for the whole scene.
+
+        Returns:
+            records: {(kind, id): bytes}.
+
+        """
+
+        if items is None:
+            items = self.view.current_scene.items()
+            items.append(self.view.current_scene)
+        else:
+            items = self.affected_items(items)
+
+        records = {}
+        export_sub_scene_flag = attribute.AttributeWidget.export_sub_scene_flag
+        attribute.AttributeWidget.export_sub_scene_flag = False
+        try:
+            for item in items:
+                record = self.create_record(item)
+                if record:
+                    records[record[0]] = record[1]
+        finally:
+            attribute.AttributeWidget.export_sub_scene_flag = export_sub_scene_flag
+        return records
 
+    def create_record(self, item):
         """
+        Serialize one item without its sub scene.
+
+        Args:
+            item: Attribute widget, logic widget, pipe, draw widget or the scene.
+
+        Returns:
+            record: ((kind, id), bytes) or None.
+
+        """
+
+        if isinstance(item, attribute.AttributeWidget):
+            kind = "attr"
+            if item.sub_scene:
+                self.sub_scenes[item.id] = item.sub_scene
+        elif isinstance(item, attribute.LogicWidget):
+            kind = "logic"
+        elif isinstance(item, pipe.Pipe):
+            if not item.start_port or not item.end_port:
+                return None
+            kind = "pipe"
+        elif isinstance(item, draw.Draw):
+            kind = "draw"
+        elif isinstance(item, QtWidgets.QGraphicsScene):
+            serialization = self.messages["scene"]()
+            item.serialize_state(serialization)
+            return ("scene", item.id), serialization.SerializeToString()
+        else:
+            return None
+
+        serialization = self.messages[kind]()
+        item.serialize(serialization)
+        return (kind, item.id), serialization.SerializeToString()
+
+    @staticmethod
+    def affected_items(items):
+        """
+        Collect the items whose serialization changes with the given items:
+        the parent and sub attribute widgets, the pipes of their ports and the owners of ports.
+
+        Args:
+            items: The changed items.
+
+        Returns:
+            affected_items: list.
+
+        """
+
+        affected_items = []
+        visited = set()
+        stack = list(items)
+        while stack:
+            item = stack.pop()
+            if id(item) in visited:
+                continue
+            visited.add(id(item))
+            affected_items.append(item)
+
+            if isinstance(item, attribute.AttributeWidget):
+                if isinstance(item.parentItem(), attribute.AttributeWidget):
+                    stack.append(item.parentItem())
+                for sub_widget in item.attribute_sub_widgets:
+                    if isinstance(sub_widget, attribute.AttributeWidget):
+                        stack.append(sub_widget)
+                for port_widget in (item.true_input_port, item.false_input_port,
+                                    item.true_output_port, item.false_output_port):
+                    stack.extend(port_widget.pipes)
+            elif isinstance(item, attribute.LogicWidget):
+                stack.extend(item.input_port.pipes)
+                stack.extend(item.output_port.pipes)
+            elif isinstance(item, port.Port):
+                stack.append(item.parentItem())
+        return affected_items
+
+    @staticmethod
+    def apply_changes(records, changes, redo):
+        """
+        Apply one step to the records.
+
+        Args:
+            records: {(kind, id): bytes}, changed in place.
+            changes: {(kind, id): (old bytes, new bytes)}.
+            redo: Apply forwards or backwards.
+
+        Returns:
+            records: The changed records.
+
+        """
+
+        for key, (old_data, new_data) in changes.items():
+            data = new_data if redo else old_data
+            if data is None:
+                records.pop(key, None)
+            else:
+                records[key] = data
+        return records
+
+    def records_at(self, step):
+        """
+        Rebuild the records after a step from the nearest checkpoint.
+
+        Args:
+            step: The index of the step, -1 for the state before the first step.
 
-        # Delete items
+        Returns:
+            records: {(kind, id): bytes}.
+
+        """
+
+        for index in range(step, -1, -1):
+            checkpoint = self.history_stack[index]['checkpoint']
+            if checkpoint is not None:
+                records = dict(checkpoint)
+                for history_stamp in self.history_stack[index + 1: step + 1]:
+                    self.apply_changes(records, history_stamp['changes'], redo=True)
+                return records
+
+        records = dict(self.history_stack[0]['checkpoint'])
+        return self.apply_changes(records, self.history_stack[0]['changes'], redo=False)
+
+    def live_items(self):
+        """
+        Map the items of the current scene by record key.
+
+        Returns:
+            items: {(kind, id): item}.
+
+        """
+
+        items = {("scene", self.view.current_scene.id): self.view.current_scene}
         for item in self.view.current_scene.items():
-            item.setSelected(True)
-        self.view.delete_widgets(QtGui.QKeyEvent(QtGui.QKeyEvent.KeyPress, QtCore.Qt.Key_Delete, QtCore.Qt.NoModifier),
-                                 history_flag=True)
+            if isinstance(item, attribute.AttributeWidget):
+                items[("attr", item.id)] = item
+            elif isinstance(item, attribute.LogicWidget):
+                items[("logic", item.id)] = item
+            elif isinstance(item, pipe.Pipe):
+                items[("pipe", item.id)] = item
+            elif isinstance(item, draw.Draw):
+                items[("draw", item.id)] = item
+        return items
+
+    def parse_record(self, kind, data):
+        """
+        Parse the bytes of a record.
+
+        Args:
+            kind: The kind of the record.
+            data: bytes.
+
+        Returns:
+            serialization: The protobuff object.
+
+        """
+
+        serialization = self.messages[kind]()
+        serialization.ParseFromString(data)
+        return serialization
+
+    def restore_history_stamp(self, changes, live_items):
+        """
+        Reconcile the live scene with the target records by id:
+        only the changed items are removed, created, restored or rewired.
+
+        Args:
+            changes: {(kind, id): (current bytes, target bytes)}.
+            live_items: {(kind, id): item} of the current scene.
+
+        """
+
+        scene = self.view.current_scene
+        current, targets = {}, {}
+        for key, (current_data, target_data) in changes.items():
+            if current_data is not None:
+                current[key] = self.parse_record(key[0], current_data)
+            if target_data is not None:
+                targets[key] = self.parse_record(key[0], target_data)
+
+        # 1. remove the items missing in the target, pipes connected to other ports are created again.
+        removed_keys = [key for key in changes if key in live_items and
+                        (key not in targets or
+                         key[0] == "pipe" and key in current and
+                         current[key].pipe_port_id != targets[key].pipe_port_id)]
+        for kind in ("pipe", "logic", "draw", "attr"):
+            for key in removed_keys:
+                if key[0] == kind and live_items[key].scene() is scene:
+                    self.remove_item(live_items[key])
+        live_items = self.live_items()
+
+        # 2. create the items missing in the scene, pipes last as they need the ports.
+        hashmap = {}
+        created_keys = set()
+        for kind in ("attr", "logic", "draw", "pipe"):
+            for key, serialization in targets.items():
+                if key[0] == kind and key not in live_items:
+                    item = self.create_item(kind, serialization, hashmap)
+                    if item is not None:
+                        live_items[key] = item
+                        created_keys.add(key)
+
+        # 3. take out the sub widgets of the attribute widgets whose layout changed.
+        rebuild_keys = set()
+        for key, serialization in targets.items():
+            if key[0] != "attr" or key not in live_items:
+                continue
+            old_serialization = current.get(key)
+            if key in created_keys or old_serialization is None or \
+                    any(getattr(old_serialization, field) != getattr(serialization, field)
+                        for field in self.sub_widget_fields):
+                rebuild_keys.add(key)
+            elif list(old_serialization.attr_location) != list(serialization.attr_location):
+                parent_item = live_items[key].parentItem()
+                if isinstance(parent_item, attribute.AttributeWidget):
+                    rebuild_keys.add(("attr", parent_item.id))
+        rebuild_keys = [key for key in rebuild_keys
+                        if key in live_items and (key in targets or key in (self.records or {}))]
+        for key in rebuild_keys:
+            scene.remove_sub_widgets(live_items[key])
+
+        # 4. restore the changed items in place.
+        for key, serialization in targets.items():
+            if key in created_keys or key not in live_items:
+                continue
+            item = live_items[key]
+            item.restore_state(serialization)
+            if key[0] == "attr":
+                item.item_row, item.item_column = serialization.attr_location[0], serialization.attr_location[1]
+                item.current_row, item.current_column = serialization.next_location[0], \
+                    serialization.next_location[1]
+            elif key[0] == "scene":
+                item.update()
+
+        # 5. sub widgets and connections.
+        for key in rebuild_keys:
+            serialization = targets[key] if key in targets else self.parse_record("attr", self.records[key])
+            scene.deserialize_sub_widgets(live_items[key], serialization, hashmap, self.view)
+        for key, serialization in targets.items():
+            if key[0] in ("attr", "logic") and key in live_items:
+                if key[0] == "attr" and key not in rebuild_keys:
+                    live_items[key].text_change_node_shape()
+                scene.deserialize_connections(live_items[key], serialization)
+
+        self.attach_sub_scenes()
+        self.view.magic()
+
+    def create_item(self, kind, serialization, hashmap):
+        """
+        Create an item of the current scene from its record.
+
+        Args:
+            kind: The kind of the record.
+            serialization: The protobuff object.
+            hashmap: hashmap.
+
+        Returns:
+            item: The created item or None.
+
+        """
+
+        if kind == "attr":
+            item = attribute.AttributeWidget()
+        elif kind == "logic":
+            item = attribute.LogicWidget()
+        elif kind == "draw":
+            item = draw.Draw()
+        elif kind == "pipe":
+            start_port = self.view.current_scene.get_id_port(serialization.pipe_port_id[0])
+            end_port = self.view.current_scene.get_id_port(serialization.pipe_port_id[1])
+            if not start_port or not end_port:
+                return None
+            item = pipe.Pipe(start_port, end_port, None)
+        else:
+            return None
+        item.deserialize(serialization, hashmap, self.view, flag=True)
+        return item
+
+    def remove_item(self, item):
+        """
+        Remove an item of the current scene, sub scenes are kept for undo.
+
+        Args:
+            item: Attribute widget, logic widget, pipe or draw widget.
+
+        """
+
+        if isinstance(item, attribute.AttributeWidget):
+            self.detach_sub_scenes(item)
+            self.view.delete_attr_widget(item)
+        elif isinstance(item, attribute.LogicWidget):
+            self.view.delete_logic_widget(item)
+        elif isinstance(item, pipe.Pipe):
+            if item.start_port and item.end_port:
+                self.view.delete_pipe(item)
+            else:
+                self.view.current_scene.removeItem(item)
+                if item in self.view.pipes:
+                    self.view.pipes.remove(item)
+        elif isinstance(item, draw.Draw):
+            self.view.current_scene.removeItem(item)
+            self.view.draw_widgets.remove(item)
+
+    def detach_sub_scenes(self, item):
+        """
+        Keep the sub scenes of an attribute widget and its sub attribute widgets.
+
+        Args:
+            item: The attribute widget.
+
+        """
+
+        item.load_sub_scene()
+        if item.sub_scene:
+            self.sub_scenes[item.id] = item.sub_scene
+            item.remove_sub_scene()
+        for sub_widget in item.attribute_sub_widgets:
+            if isinstance(sub_widget, attribute.AttributeWidget):
+                self.detach_sub_scenes(sub_widget)
+
+    def attach_sub_scenes(self):
+        """
+        Link the kept sub scenes to the restored attribute widgets and
+        hide the ones whose attribute widget is gone.
+
+        """
 
-        # Serialization
-        self.view.current_scene.deserialize(history_stamp['snapshot'], hashmap={}, view=self.view, flag=True)
-        self.view.current_scene.deserialize(history_stamp['snapshot'], hashmap={}, view=self.view, flag=False)
+        attribute_widgets = {item.id: item for item in self.view.current_scene.items()
+                             if isinstance(item, attribute.AttributeWidget)}
+        for attribute_id, sub_scene in self.sub_scenes.items():
+            sub_scene_flag = sub_scene.sub_scene_flag
+            attribute_widget = attribute_widgets.get(attribute_id)
+            if attribute_widget:
+                attribute_widget.set_sub_scene(sub_scene)
+                sub_scene.attribute_widget = attribute_widget
+                if sub_scene_flag.parent() is None:
+                    self.view.current_scene.sub_scene_flag.addChild(sub_scene_flag)
+                    # written again after the tombstone of its deletion, with its nested sub scenes
+                    for scene in self.view.load_sub_scene_tree(sub_scene_flag):
+                        self.view.root_view().dropped_scenes.discard(scene.id)
+                        scene.mark_dirty()
+            elif sub_scene_flag.parent():
+                scenes = self.view.load_sub_scene_tree(sub_scene_flag)
+                sub_scene_flag.parent().removeChild(sub_scene_flag)
+                self.view.root_view().dropped_scenes.update(scene.id for scene in scenes)
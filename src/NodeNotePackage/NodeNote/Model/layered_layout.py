@@ -0,0 +1,272 @@
+"""
+layered_layout.py - Layered (Sugiyama) layout of the widgets connected by pipes.
+"""
+
+import numpy as np
+
+__all__ = ["layered_layout"]
+
+
+def remove_cycles(count, sources, targets):
+    """
+    Reverse the edges going back in a depth first order, so the graph has no cycle.
+
+    Args:
+        count: The number of nodes.
+        sources: array of int.
+        targets: array of int.
+
+    Returns:
+        sources, targets, rank: The acyclic edges and the topological rank of each node.
+
+    """
+
+    order = np.argsort(sources, kind="stable")
+    offsets = np.searchsorted(sources[order], np.arange(count + 1)).tolist()
+    adjacency = targets[order].tolist()
+    # nodes without an incoming edge start the walks, so they end up first
+    roots = np.argsort(np.bincount(targets, minlength=count) > 0, kind="stable").tolist()
+
+    visited = bytearray(count)
+    postorder = list()
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = 1
+        # (node, position of the next successor)
+        work = [(root, offsets[root])]
+        while work:
+            node, position = work[-1]
+            if position < offsets[node + 1]:
+                work[-1] = (node, position + 1)
+                target = adjacency[position]
+                if not visited[target]:
+                    visited[target] = 1
+                    work.append((target, offsets[target]))
+            else:
+                work.pop()
+                postorder.append(node)
+
+    rank = np.empty(count, dtype=np.int64)
+    rank[postorder[::-1]] = np.arange(count)
+    backward = rank[sources] > rank[targets]
+    return np.where(backward, targets, sources), np.where(backward, sources, targets), rank
+
+
+def assign_layers(count, sources, targets, rank):
+    """
+    Longest path layering, then the sources move right next to their first successor.
+
+    Args:
+        count: The number of nodes.
+        sources: array of int, acyclic edges.
+        targets: array of int.
+        rank: The topological rank of each node.
+
+    Returns:
+        layers: array of int, every edge goes to a higher layer.
+
+    """
+
+    layers = [0] * count
+    order = np.argsort(rank[sources], kind="stable")
+    for source, target in zip(sources[order].tolist(), targets[order].tolist()):
+        if layers[source] + 1 > layers[target]:
+            layers[target] = layers[source] + 1
+    layers = np.array(layers, dtype=np.int64)
+
+    if len(sources):
+        first_successor = np.full(count, np.iinfo(np.int64).max)
+        np.minimum.at(first_successor, sources, layers[targets])
+        starts = (np.bincount(targets, minlength=count) == 0) & (np.bincount(sources, minlength=count) > 0)
+        layers[starts] = first_successor[starts] - 1
+    return layers
+
+
+def split_long_edges(count, sources, targets, layers, budget):
+    """
+    Replace the edges spanning several layers by chains of dummy nodes, one per crossed layer.
+    The shortest edges are split first, the edges left when the budget is spent keep spanning layers.
+
+    Args:
+        count: The number of real nodes.
+        sources: array of int.
+        targets: array of int.
+        layers: array of int.
+        budget: The maximum number of dummy nodes.
+
+    Returns:
+        sources, targets, layers: The split edges, and the layers of the real and dummy nodes.
+
+    """
+
+    spans = layers[targets] - layers[sources]
+    long_edges = spans > 1
+    if long_edges.any():
+        costs = np.where(long_edges, spans - 1, 0)
+        shortest = np.argsort(costs, kind="stable")
+        long_edges[shortest[np.cumsum(costs[shortest]) > budget]] = False
+    if not long_edges.any():
+        return sources, targets, layers
+    long_sources, long_targets = sources[long_edges], targets[long_edges]
+    counts = spans[long_edges] - 1
+    total = int(counts.sum())
+    ends = np.cumsum(counts)
+    chain = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(total) - np.repeat(ends - counts, counts)
+
+    dummies = count + np.arange(total)
+    previous = np.where(step == 0, long_sources[chain], dummies - 1)
+    sources = np.concatenate((sources[~long_edges], previous, count + ends - 1))
+    targets = np.concatenate((targets[~long_edges], dummies, long_targets))
+    layers = np.concatenate((layers, layers[long_sources][chain] + 1 + step))
+    return sources, targets, layers
+
+
+def layer_positions(order, layers):
+    """
+    The position of each node inside its layer.
+
+    Args:
+        order: The nodes sorted by layer, then by position.
+        layers: array of int.
+
+    Returns:
+        positions: array of int.
+
+    """
+
+    sorted_layers = layers[order]
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order)) - np.searchsorted(sorted_layers, sorted_layers)
+    return positions
+
+
+def order_layers(sources, targets, layers, positions, sweeps):
+    """
+    Barycenter crossing minimization, every layer of a sweep is sorted at once.
+
+    Args:
+        sources: array of int, edges between adjacent layers.
+        targets: array of int.
+        layers: array of int.
+        positions: The first positions inside the layers.
+        sweeps: The number of sweeps, alternately by the last and by the next layer.
+
+    Returns:
+        positions: array of int.
+
+    """
+
+    count = len(layers)
+    for sweep in range(sweeps):
+        nodes, neighbours = (targets, sources) if sweep % 2 == 0 else (sources, targets)
+        weights = np.bincount(nodes, weights=positions[neighbours], minlength=count)
+        degrees = np.bincount(nodes, minlength=count)
+        barycenters = np.where(degrees > 0, weights / np.maximum(degrees, 1), positions)
+        new_positions = layer_positions(np.lexsort((positions, barycenters, layers)), layers)
+        if np.array_equal(new_positions, positions) and sweep:
+            break
+        positions = new_positions
+    return positions
+
+
+def pack(order, desired, heights, layers, gap):
+    """
+    The nearest tops to the desired tops keeping the order of each layer, pushing overlapped nodes down.
+
+    Args:
+        order: The nodes sorted by layer, then by position.
+        desired: The desired tops.
+        heights: array of float.
+        layers: array of int.
+        gap: The space between two nodes.
+
+    Returns:
+        tops: array of float.
+
+    """
+
+    sorted_layers = layers[order]
+    first = np.searchsorted(sorted_layers, sorted_layers)
+    needed = heights[order] + gap
+    before = np.cumsum(needed) - needed
+    # the space taken by the nodes above, inside the layer
+    offsets = before - before[first]
+    values = desired[order] - offsets
+    # a running maximum restarting at each layer
+    big = values.max() - values.min() + 1
+    values = np.maximum.accumulate(values + sorted_layers * big) - sorted_layers * big
+    tops = np.empty(len(order))
+    tops[order] = offsets + values
+    return tops
+
+
+def balance(desired, heights, layers, positions, gap):
+    # the mean of pushing overlapped nodes down and up, both keep the order and the gaps
+    down = pack(np.lexsort((positions, layers)), desired, heights, layers, gap)
+    up = -pack(np.lexsort((-positions, layers)), -(desired + heights), heights, layers, gap) - heights
+    return (down + up) / 2
+
+
+def layered_layout(widths, heights, sources, targets, layer_gap=80, node_gap=30, sweeps=12, iterations=8):
+    """
+    Lay out a directed graph in layers from left to right.
+        - Cycles are broken by reversing the edges going back in a depth first order.
+        - Layers come from the longest path, long edges are split by dummy nodes.
+        - Crossings are reduced by barycenter sweeps, then nodes move to the mean height of their neighbours.
+
+    Args:
+        widths: The width of each node.
+        heights: The height of each node.
+        sources: The source node of each edge.
+        targets: The target node of each edge.
+        layer_gap: The space between two layers.
+        node_gap: The space between two nodes of a layer.
+        sweeps: The number of crossing minimization sweeps.
+        iterations: The number of height balancing iterations.
+
+    Returns:
+        x, y: array of float, the top left corners with the smallest ones at 0.
+
+    """
+
+    count = len(widths)
+    if count == 0:
+        return np.zeros(0), np.zeros(0)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if len(sources):
+        edges = np.unique(np.stack((sources, targets), axis=1), axis=0)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        sources, targets = edges[:, 0], edges[:, 1]
+
+    sources, targets, rank = remove_cycles(count, sources, targets)
+    layers = assign_layers(count, sources, targets, rank)
+    layers -= layers.min()
+    sources, targets, layers = split_long_edges(count, sources, targets, layers, 4 * count)
+    dummies = len(layers) - count
+    widths = np.concatenate((np.asarray(widths, dtype=float), np.zeros(dummies)))
+    heights = np.concatenate((np.asarray(heights, dtype=float), np.zeros(dummies)))
+
+    # dummy nodes follow the rank of their first node
+    start_rank = np.concatenate((rank, np.zeros(dummies, dtype=np.int64)))
+    positions = layer_positions(np.lexsort((start_rank, layers)), layers)
+    positions = order_layers(sources, targets, layers, positions, sweeps)
+
+    layer_widths = np.zeros(layers.max() + 1)
+    np.maximum.at(layer_widths, layers, widths)
+    x = (np.cumsum(layer_widths + layer_gap) - layer_widths - layer_gap)[layers]
+
+    y = balance(np.zeros(len(layers)), heights, layers, positions, node_gap)
+    nodes = np.concatenate((sources, targets))
+    neighbours = np.concatenate((targets, sources))
+    degrees = np.bincount(nodes, minlength=len(layers))
+    for _ in range(iterations):
+        centers = y + heights / 2
+        means = np.bincount(nodes, weights=centers[neighbours], minlength=len(layers)) / np.maximum(degrees, 1)
+        desired = np.where(degrees > 0, means, centers) - heights / 2
+        y = balance(desired, heights, layers, positions, node_gap)
+
+    x, y = x[:count], y[:count]
+    return x - x.min(), y - y.min()
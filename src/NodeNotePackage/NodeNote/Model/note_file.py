@@ -0,0 +1,464 @@
+"""
+The indexed .note container.
+
+Layout (little endian):
+    header:  magic "NODENOTE", version, segment count
+    table:   one entry per segment: kind, scene id, attribute id, offset, length
+    segments:
+        the styles segment: ViewSerialization without scenes.
+        one scene segment per scene: SceneSerialization whose attribute widgets
+        do not contain their sub scenes, the sub scene segment keeps the id of its attribute widget.
+
+Files written before the container are a single ViewSerialization and are still read.
+
+The journal next to a container ("<note>.journal") holds segments written by autosave:
+    header:  magic "NNJOURNL", size and modification time of the container it extends
+    records: kind, scene id, attribute id, length, crc32, segment
+The last record of a scene replaces its segment when the container is read, a dropped record
+without segment removes the scene until a later record writes it again. A journal whose
+header does not match the container is stale and ignored, a torn record ends the journal.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+from ..Model import serialize_pb2
+
+__all__ = ["NoteFile", "write_note_file", "split_view", "split_root", "journal_path", "append_journal", "read_journal",
+           "remove_journal", "MAGIC", "VERSION", "SEGMENT_STYLES", "SEGMENT_SCENE", "SEGMENT_DROPPED"]
+
+MAGIC = b"NODENOTE"
+VERSION = 1
+
+SEGMENT_STYLES = 0
+SEGMENT_SCENE = 1
+# journal only, the tombstone of a deleted sub scene
+SEGMENT_DROPPED = 2
+
+HEADER = struct.Struct("<8sHI")
+ENTRY = struct.Struct("<BqqQQ")
+
+JOURNAL_MAGIC = b"NNJOURNL"
+JOURNAL_HEADER = struct.Struct("<8sqq")
+RECORD = struct.Struct("<BqqII")
+
+
+def split_view(view_serialization):
+    """
+    Split the view serialization into segments, the sub scenes are moved out of the message.
+
+    Args:
+        view_serialization: The protobuff object, it is changed.
+
+    Returns:
+        segments: [(kind, scene id, attribute id, bytes)], the root scene first.
+
+    """
+
+    segments = []
+
+    def split_scene(scene_serialization, attribute_id):
+        index = len(segments)
+        segments.append(None)
+        for attribute_serialization in scene_serialization.attr_serialization:
+            for sub_scene_serialization in attribute_serialization.sub_scene_serialization:
+                split_scene(sub_scene_serialization, attribute_serialization.attr_id)
+            attribute_serialization.ClearField("sub_scene_serialization")
+        segments[index] = (SEGMENT_SCENE, scene_serialization.scene_id, attribute_id,
+                           scene_serialization.SerializeToString())
+
+    for scene_serialization in view_serialization.scene_serialization:
+        split_scene(scene_serialization, 0)
+    view_serialization.ClearField("scene_serialization")
+    segments.insert(0, (SEGMENT_STYLES, 0, 0, view_serialization.SerializeToString()))
+    return segments
+
+
+def split_root(view_serialization):
+    """
+    Move the sub scenes out of the view serialization, the root scenes stay in the message.
+
+    Args:
+        view_serialization: The protobuff object, it is changed.
+
+    Returns:
+        sub_scenes: {attribute id: (scene id, bytes)}, the segments like they are stored in a container.
+
+    """
+
+    sub_scenes = {}
+
+    def split_scene(scene_serialization):
+        for attribute_serialization in scene_serialization.attr_serialization:
+            for sub_scene_serialization in attribute_serialization.sub_scene_serialization:
+                split_scene(sub_scene_serialization)
+                sub_scenes[attribute_serialization.attr_id] = (sub_scene_serialization.scene_id,
+                                                               sub_scene_serialization.SerializeToString())
+            attribute_serialization.ClearField("sub_scene_serialization")
+
+    for scene_serialization in view_serialization.scene_serialization:
+        split_scene(scene_serialization)
+    return sub_scenes
+
+
+def write_note_file(file, view_serialization, sub_scenes=()):
+    """
+    Write the view serialization as a container.
+
+    Args:
+        file: A binary file object.
+        view_serialization: The protobuff object, its sub scenes are moved out.
+        sub_scenes: [(scene id, attribute id, bytes)], sub scene segments written as they are.
+
+    """
+
+    segments = split_view(view_serialization)
+    segments.extend((SEGMENT_SCENE, scene_id, attribute_id, data) for scene_id, attribute_id, data in sub_scenes)
+    offset = HEADER.size + ENTRY.size * len(segments)
+    table = []
+    for kind, scene_id, attribute_id, data in segments:
+        table.append(ENTRY.pack(kind, scene_id, attribute_id, offset, len(data)))
+        offset += len(data)
+    file.write(HEADER.pack(MAGIC, VERSION, len(segments)))
+    file.write(b"".join(table))
+    for segment in segments:
+        file.write(segment[3])
+
+
+def journal_path(path):
+    return path + ".journal"
+
+
+def container_stamp(path):
+    """
+    The size and modification time which bind a journal to its container.
+
+    """
+
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def append_journal(path, records):
+    """
+    Append segments to the journal of a container, a stale journal is started again.
+
+    Args:
+        path: The path of the .note container.
+        records: [(kind, scene id, attribute id, bytes)].
+
+    """
+
+    header = JOURNAL_HEADER.pack(JOURNAL_MAGIC, *container_stamp(path))
+    mode = "ab"
+    try:
+        with open(journal_path(path), "rb") as file:
+            if file.read(JOURNAL_HEADER.size) != header:
+                mode = "wb"
+    except FileNotFoundError:
+        mode = "wb"
+
+    with open(journal_path(path), mode) as file:
+        if mode == "wb":
+            file.write(header)
+        for kind, scene_id, attribute_id, data in records:
+            file.write(RECORD.pack(kind, scene_id, attribute_id, len(data), zlib.crc32(data)))
+            file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def read_journal(path):
+    """
+    Read the valid records of the journal of a container.
+
+    Args:
+        path: The path of the .note container.
+
+    Returns:
+        records: [(kind, scene id, attribute id, bytes)].
+
+    """
+
+    try:
+        with open(journal_path(path), "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return []
+    if data[:JOURNAL_HEADER.size] != JOURNAL_HEADER.pack(JOURNAL_MAGIC, *container_stamp(path)):
+        return []
+
+    records = []
+    offset = JOURNAL_HEADER.size
+    while offset + RECORD.size <= len(data):
+        kind, scene_id, attribute_id, length, crc = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        segment = data[offset: offset + length]
+        if len(segment) != length or zlib.crc32(segment) != crc:
+            break
+        records.append((kind, scene_id, attribute_id, segment))
+        offset += length
+    return records
+
+
+def remove_journal(path):
+    try:
+        os.remove(journal_path(path))
+    except FileNotFoundError:
+        pass
+
+
+class NoteFile:
+    """
+    Random access reader of .note files, single scenes are decoded from the memory map.
+    The journal of the container is replayed over its segments, a full save compacts both into a new container.
+
+    """
+
+    def __init__(self, path):
+        """
+        Map the file and read the offset table.
+
+        Args:
+            path: The path of the .note file.
+
+        """
+
+        self.path = path
+        self.file = open(path, "rb")
+        self.mmap = None
+        self.legacy = True
+        self.legacy_view = None
+        # [[kind, scene id, attribute id, offset, length]], offset -1 for segments only in the journal
+        self.entries = []
+        # {(kind, scene id): bytes} replayed from the journal
+        self.journal_segments = {}
+
+        if os.path.getsize(path):
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.mmap[:len(MAGIC)] == MAGIC:
+                self.legacy = False
+                self.read_table()
+                self.replay_journal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self.mmap:
+            self.mmap.close()
+            self.mmap = None
+        self.file.close()
+
+    def read_table(self):
+        """
+        Read the header and the offset table.
+
+        """
+
+        _, version, count = HEADER.unpack_from(self.mmap, 0)
+        if version > VERSION:
+            raise ValueError("Unsupported note file version: %d" % version)
+        self.entries = [list(ENTRY.unpack_from(self.mmap, HEADER.size + ENTRY.size * index))
+                        for index in range(count)]
+
+    def replay_journal(self):
+        """
+        Replace the segments with the records of the journal, dropped scenes are removed.
+
+        """
+
+        entries = {(entry[0], entry[1]): entry for entry in self.entries}
+        for kind, scene_id, attribute_id, data in read_journal(self.path):
+            if kind == SEGMENT_DROPPED:
+                self.journal_segments.pop((SEGMENT_SCENE, scene_id), None)
+                entry = entries.pop((SEGMENT_SCENE, scene_id), None)
+                if entry is not None:
+                    self.entries.remove(entry)
+                continue
+            self.journal_segments[(kind, scene_id)] = data
+            entry = entries.get((kind, scene_id))
+            if entry is None:
+                entry = [kind, scene_id, attribute_id, -1, len(data)]
+                entries[(kind, scene_id)] = entry
+                self.entries.append(entry)
+
+    def segment(self, entry):
+        """
+        The bytes of one segment.
+
+        Args:
+            entry: The entry of the offset table.
+
+        """
+
+        data = self.journal_segments.get((entry[0], entry[1]))
+        if data is not None:
+            return data
+        return self.mmap[entry[3]: entry[3] + entry[4]]
+
+    def scene_entry(self, scene_id):
+        for entry in self.entries:
+            if entry[0] == SEGMENT_SCENE and entry[1] == scene_id:
+                return entry
+        return None
+
+    def scene_ids(self):
+        """
+        Ids of all scenes, the root scene first.
+
+        """
+
+        if self.legacy:
+            view_serialization = self.read_view()
+            scene_ids = []
+
+            def collect(scene_serialization):
+                scene_ids.append(scene_serialization.scene_id)
+                for attribute_serialization in scene_serialization.attr_serialization:
+                    for sub_scene_serialization in attribute_serialization.sub_scene_serialization:
+                        collect(sub_scene_serialization)
+
+            for scene_serialization in view_serialization.scene_serialization:
+                collect(scene_serialization)
+            return scene_ids
+        return [entry[1] for entry in self.entries if entry[0] == SEGMENT_SCENE]
+
+    def read_styles(self):
+        """
+        Decode the styles and flags of the view.
+
+        Returns:
+            view_serialization: ViewSerialization without scenes.
+
+        """
+
+        view_serialization = serialize_pb2.ViewSerialization()
+        if self.legacy:
+            view_serialization.CopyFrom(self.read_view())
+            view_serialization.ClearField("scene_serialization")
+            return view_serialization
+        for entry in self.entries:
+            if entry[0] == SEGMENT_STYLES:
+                view_serialization.ParseFromString(self.segment(entry))
+                break
+        return view_serialization
+
+    def read_scene(self, scene_id):
+        """
+        Decode one scene, the sub scenes of its attribute widgets are not decoded.
+
+        Args:
+            scene_id: The id of the scene.
+
+        Returns:
+            scene_serialization: SceneSerialization or None.
+
+        """
+
+        if self.legacy:
+            def find(scene_serialization):
+                if scene_serialization.scene_id == scene_id:
+                    return scene_serialization
+                for attribute_serialization in scene_serialization.attr_serialization:
+                    for sub_scene_serialization in attribute_serialization.sub_scene_serialization:
+                        found = find(sub_scene_serialization)
+                        if found is not None:
+                            return found
+                return None
+
+            for root_serialization in self.read_view().scene_serialization:
+                found = find(root_serialization)
+                if found is not None:
+                    for attribute_serialization in found.attr_serialization:
+                        attribute_serialization.ClearField("sub_scene_serialization")
+                    return found
+            return None
+
+        entry = self.scene_entry(scene_id)
+        if entry is None:
+            return None
+        scene_serialization = serialize_pb2.ViewSerialization.SceneSerialization()
+        scene_serialization.ParseFromString(self.segment(entry))
+        return scene_serialization
+
+    def sub_scene_entries(self):
+        """
+        Map the attribute widget ids to their sub scene entries.
+
+        """
+
+        return {entry[2]: entry for entry in self.entries if entry[0] == SEGMENT_SCENE and entry[2]}
+
+    def nest_sub_scenes(self, scene_serialization, sub_scene_entries):
+        """
+        Put the sub scene segments back into their attribute widgets.
+
+        Args:
+            scene_serialization: SceneSerialization.
+            sub_scene_entries: {attribute id: entry}.
+
+        """
+
+        for attribute_serialization in scene_serialization.attr_serialization:
+            entry = sub_scene_entries.get(attribute_serialization.attr_id)
+            if entry is not None:
+                sub_scene_serialization = attribute_serialization.sub_scene_serialization.add()
+                sub_scene_serialization.ParseFromString(self.segment(entry))
+                self.nest_sub_scenes(sub_scene_serialization, sub_scene_entries)
+
+    def read_view(self):
+        """
+        Decode the whole file as one ViewSerialization, like the files before the container.
+
+        Returns:
+            view_serialization: ViewSerialization.
+
+        """
+
+        if self.legacy:
+            if self.legacy_view is None:
+                self.legacy_view = serialize_pb2.ViewSerialization()
+                if self.mmap:
+                    self.legacy_view.ParseFromString(self.mmap[:])
+            view_serialization = serialize_pb2.ViewSerialization()
+            view_serialization.CopyFrom(self.legacy_view)
+            return view_serialization
+
+        view_serialization = serialize_pb2.ViewSerialization()
+
+        view_serialization.CopyFrom(self.read_styles())
+        sub_scene_entries = self.sub_scene_entries()
+        for entry in self.entries:
+            if entry[0] == SEGMENT_SCENE and not entry[2]:
+                scene_serialization = view_serialization.scene_serialization.add()
+                scene_serialization.ParseFromString(self.segment(entry))
+                self.nest_sub_scenes(scene_serialization, sub_scene_entries)
+        return view_serialization
+
+    def read_root_view(self):
+        """
+        Decode the styles and the root scenes, the sub scenes are left as the bytes of their segments.
+
+        Returns:
+            view_serialization: ViewSerialization without sub scenes.
+            sub_scenes: {attribute id: (scene id, bytes)}.
+
+        """
+
+        if self.legacy:
+            view_serialization = self.read_view()
+            return view_serialization, split_root(view_serialization)
+
+        view_serialization = self.read_styles()
+        for entry in self.entries:
+            if entry[0] == SEGMENT_SCENE and not entry[2]:
+                view_serialization.scene_serialization.add().CopyFrom(self.read_scene(entry[1]))
+        sub_scenes = {attribute_id: (entry[1], self.segment(entry))
+                      for attribute_id, entry in self.sub_scene_entries().items()}
+        return view_serialization, sub_scenes
@@ -0,0 +1,625 @@
+"""
+Headless model of a .note file.
+
+The notes are read into plain records without Qt, so batch jobs like migration, search and statistics
+do not need a window. Every record keeps the protobuff object it was read from and writes its fields back
+into it when the note is saved, untouched notes are written back byte-identically.
+
+    note = Note.load(path)
+    for node in note.search("todo"):
+        note.set_text(node.id, node.text.upper())
+    note.save()
+"""
+
+import html
+import os
+import re
+
+from ..Model import note_file, serializable, serialize_pb2
+
+__all__ = ["Note", "SceneRecord", "NodeRecord", "LogicRecord", "PortRecord", "PipeRecord", "TodoRecord",
+           "FileRecord", "html_to_text", "text_to_html"]
+
+INPUT_NODE_TYPE = 0
+OUTPUT_NODE_TYPE = 1
+
+# default styles of new items when the note has no item to copy them from, same as Model/constants.py
+ATTR_COLOR = (0xff000000, 0xfffefdfe, 0x1effffff, 0xff2e3942, 0xfffecf2a)
+PORT_COLOR = (0xffffffff, 0xffffffff, 0xff76b8b6, 0xff63b4ff, 0xff0e2d3b, 0xff6ba6c1)
+PIPE_COLOR = (0xffe1c0f1, 0xff009979)
+
+
+def html_to_text(contents):
+    """
+    Plain text of the html contents of an attribute widget.
+
+    Args:
+        contents: html.
+
+    Returns:
+        text: str.
+
+    """
+
+    contents = re.sub(r"<(head|style)\b.*?</\1>", "", contents, flags=re.S | re.I)
+    contents = re.sub(r"<br\s*/?>|</p>", "\n", contents, flags=re.I)
+    return html.unescape(re.sub(r"<[^>]+>", "", contents)).strip("\n")
+
+
+def text_to_html(text):
+    return "".join("<p>%s</p>" % html.escape(line) for line in text.split("\n"))
+
+
+class PortRecord:
+    __slots__ = ("data", "id", "port_type", "port_truth", "pipe_ids", "node")
+
+    def __init__(self, data, node):
+        self.data = data
+        self.id = data.port_id
+        self.port_type = data.port_type
+        self.port_truth = data.port_truth
+        self.pipe_ids = list(data.pipes_id)
+        self.node = node
+
+    def flush(self):
+        self.data.pipes_id[:] = self.pipe_ids
+
+
+class TodoRecord:
+    __slots__ = ("data", "id", "task", "time", "node")
+
+    def __init__(self, data, node):
+        self.data = data
+        self.id = data.todo_id
+        self.task = data.task
+        self.time = data.time
+        self.node = node
+
+    def flush(self):
+        self.data.task = self.task
+        self.data.time = self.time
+
+
+class FileRecord:
+    __slots__ = ("data", "id", "text", "cover", "file", "node")
+
+    def __init__(self, data, node):
+        self.data = data
+        self.id = data.file_id
+        self.text = data.text
+        self.cover = data.cover
+        self.file = data.file if data.HasField("file") else None
+        self.node = node
+
+    def flush(self):
+        self.data.text = self.text
+        self.data.cover = self.cover
+        if self.file is not None:
+            self.data.file = self.file
+        else:
+            self.data.ClearField("file")
+
+
+class NodeRecord:
+    """
+    Attribute widget.
+
+    """
+
+    __slots__ = ("data", "id", "scene", "contents", "position", "size", "ports", "next_attr_ids",
+                 "next_logic_ids", "last_attr_ids", "last_logic_ids", "sub_attr_ids", "parent", "todos", "files",
+                 "sub_scene")
+
+    def __init__(self, data, scene):
+        self.data = data
+        self.id = data.attr_id
+        self.scene = scene
+        self.contents = data.contents
+        self.position = tuple(data.position)
+        self.size = tuple(data.size)
+        self.ports = [PortRecord(port_data, self) for port_data in data.attr_port]
+        self.next_attr_ids = list(data.next_attr_id)
+        self.next_logic_ids = list(data.next_logic_id)
+        self.last_attr_ids = list(data.last_attr_id)
+        self.last_logic_ids = list(data.last_logic_id)
+        self.sub_attr_ids = list(data.sub_attr)
+        self.parent = None
+        self.todos = [TodoRecord(todo_data, self) for todo_data in data.todo_serialization]
+        self.files = [FileRecord(file_data, self) for file_data in data.file_serialization]
+        self.sub_scene = None
+
+    @property
+    def text(self):
+        return html_to_text(self.contents)
+
+    def port(self, port_type, port_truth=True):
+        for port in self.ports:
+            if port.port_type == port_type and bool(port.port_truth) == bool(port_truth):
+                return port
+        return None
+
+    def flush(self):
+        self.data.contents = self.contents
+        self.data.position[:] = self.position
+        self.data.size[:] = self.size
+        self.data.next_attr_id[:] = self.next_attr_ids
+        self.data.next_logic_id[:] = self.next_logic_ids
+        self.data.last_attr_id[:] = self.last_attr_ids
+        self.data.last_logic_id[:] = self.last_logic_ids
+        self.data.sub_attr[:] = self.sub_attr_ids
+        for record in self.ports + self.todos + self.files:
+            record.flush()
+
+
+class LogicRecord:
+    """
+    Logic widget.
+
+    """
+
+    __slots__ = ("data", "id", "scene", "position", "truth", "ports", "next_attr_ids", "next_logic_ids",
+                 "last_attr_ids", "last_logic_ids")
+
+    def __init__(self, data, scene):
+        self.data = data
+        self.id = data.logic_id
+        self.scene = scene
+        self.position = tuple(data.logic_position)
+        self.truth = tuple(data.logic_truth)
+        self.ports = [PortRecord(port_data, self) for port_data in data.logic_port]
+        self.next_attr_ids = list(data.logic_next_attr)
+        self.next_logic_ids = list(data.logic_next_logic)
+        self.last_attr_ids = list(data.logic_last_attr)
+        self.last_logic_ids = list(data.logic_last_logic)
+
+    def port(self, port_type, port_truth=True):
+        for port in self.ports:
+            if port.port_type == port_type:
+                return port
+        return None
+
+    def flush(self):
+        self.data.logic_position[:] = self.position
+        self.data.logic_truth[:] = self.truth
+        self.data.logic_next_attr[:] = self.next_attr_ids
+        self.data.logic_next_logic[:] = self.next_logic_ids
+        self.data.logic_last_attr[:] = self.last_attr_ids
+        self.data.logic_last_logic[:] = self.last_logic_ids
+        for port in self.ports:
+            port.flush()
+
+
+class PipeRecord:
+    __slots__ = ("data", "id", "scene", "port_ids", "text")
+
+    def __init__(self, data, scene):
+        self.data = data
+        self.id = data.pipe_id
+        self.scene = scene
+        self.port_ids = tuple(data.pipe_port_id)
+        self.text = data.pipe_text
+
+    def flush(self):
+        self.data.pipe_port_id[:] = self.port_ids
+        self.data.pipe_text = self.text
+
+
+class SceneRecord:
+    """
+    Root scene or the sub scene of an attribute widget.
+
+    """
+
+    __slots__ = ("data", "id", "node", "nodes", "logics", "pipes")
+
+    def __init__(self, data, node=None):
+        self.data = data
+        self.id = data.scene_id
+        self.node = node
+        self.nodes = {}
+        self.logics = {}
+        self.pipes = {}
+
+    def flush(self):
+        for record in list(self.nodes.values()) + list(self.logics.values()) + list(self.pipes.values()):
+            record.flush()
+
+
+class Note:
+    """
+    A .note file as records.
+
+    """
+
+    def __init__(self, view_serialization=None, path=None, legacy=False):
+        """
+        Args:
+            view_serialization: The protobuff object, owned by the note from now on.
+            path: The file of the note.
+            legacy: Whether the note was read from a file written before the container.
+
+        """
+
+        self.view = view_serialization if view_serialization is not None else serialize_pb2.ViewSerialization()
+        self.path = path
+        self.legacy = legacy
+        self.scenes = {}
+        self.records = {}
+        for scene_data in self.view.scene_serialization:
+            self.read_scene(scene_data)
+
+        if self.view.HasField("next_id"):
+            self.ids = serializable.IdAllocator(self.view.next_id)
+            # new nodes must not take the ids of the documents and drawings of other notes
+            if path:
+                self.ids.bind(serializable.find_work_dir(path))
+        else:
+            # ids of old notes are addresses, they stay as they are
+            self.ids = serializable.IdAllocator(max(self.records, default=0) + 1)
+        self.saved_next_id = self.ids.next_id
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a .note file, the journal of a container is replayed.
+
+        Args:
+            path: The path of the .note file.
+
+        Returns:
+            note: Note.
+
+        """
+
+        with note_file.NoteFile(path) as file:
+            view_serialization = serialize_pb2.ViewSerialization()
+            view_serialization.CopyFrom(file.read_view())
+            return cls(view_serialization, path, file.legacy)
+
+    def save(self, path=None, legacy=None):
+        """
+        Write the note into a temporary file and rename it over the note.
+
+        Args:
+            path: The path of the .note file, the loaded path by default.
+            legacy: Write a single ViewSerialization, the loaded format by default.
+
+        """
+
+        path = path or self.path
+        legacy = self.legacy if legacy is None else legacy
+        view_serialization = self.to_view()
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            if legacy:
+                file.write(view_serialization.SerializeToString())
+            else:
+                note_file.write_note_file(file, view_serialization)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        note_file.remove_journal(path)
+        self.path = path
+
+    def to_view(self):
+        """
+        Write the records back into a copy of the view serialization.
+
+        Returns:
+            view_serialization: The protobuff object.
+
+        """
+
+        for scene in self.scenes.values():
+            scene.flush()
+        if self.view.HasField("next_id") or self.ids.next_id != self.saved_next_id:
+            self.view.next_id = self.ids.next_id
+        view_serialization = serialize_pb2.ViewSerialization()
+        view_serialization.CopyFrom(self.view)
+        return view_serialization
+
+    def read_scene(self, scene_data, node=None):
+        scene = SceneRecord(scene_data, node)
+        self.scenes[scene.id] = scene
+        self.records[scene.id] = scene
+        for node_data in scene_data.attr_serialization:
+            self.read_node(node_data, scene)
+        for logic_data in scene_data.logic_serialization:
+            logic = LogicRecord(logic_data, scene)
+            scene.logics[logic.id] = logic
+            self.records[logic.id] = logic
+            for port in logic.ports:
+                self.records[port.id] = port
+        for pipe_data in scene_data.pipe_serialization:
+            pipe = PipeRecord(pipe_data, scene)
+            scene.pipes[pipe.id] = pipe
+            self.records[pipe.id] = pipe
+        for node in scene.nodes.values():
+            for sub_attr_id in node.sub_attr_ids:
+                if sub_attr_id in scene.nodes:
+                    scene.nodes[sub_attr_id].parent = node
+        return scene
+
+    def read_node(self, node_data, scene):
+        node = NodeRecord(node_data, scene)
+        scene.nodes[node.id] = node
+        self.records[node.id] = node
+        for record in node.ports + node.todos + node.files:
+            self.records[record.id] = record
+        for sub_scene_data in node_data.sub_scene_serialization:
+            node.sub_scene = self.read_scene(sub_scene_data, node)
+        return node
+
+    # query
+    @property
+    def root(self):
+        return self.scenes.get(self.view.scene_serialization[0].scene_id) if self.view.scene_serialization else None
+
+    def get(self, item_id, kind=None):
+        """
+        Find a record by id.
+
+        Args:
+            item_id: The id.
+            kind: The record class to match.
+
+        Returns:
+            record: The record or None.
+
+        """
+
+        record = self.records.get(item_id)
+        if kind is not None and not isinstance(record, kind):
+            return None
+        return record
+
+    def nodes(self, scene_id=None):
+        scenes = self.scenes.values() if scene_id is None else (self.scenes[scene_id],)
+        for scene in scenes:
+            yield from scene.nodes.values()
+
+    def logics(self, scene_id=None):
+        scenes = self.scenes.values() if scene_id is None else (self.scenes[scene_id],)
+        for scene in scenes:
+            yield from scene.logics.values()
+
+    def pipes(self, scene_id=None):
+        scenes = self.scenes.values() if scene_id is None else (self.scenes[scene_id],)
+        for scene in scenes:
+            yield from scene.pipes.values()
+
+    def todos(self):
+        for node in self.nodes():
+            yield from node.todos
+
+    def files(self):
+        for node in self.nodes():
+            yield from node.files
+
+    def search(self, pattern, flags=re.IGNORECASE):
+        """
+        Attribute widgets whose text matches.
+
+        Args:
+            pattern: Regular expression.
+            flags: re flags.
+
+        Returns:
+            nodes: [NodeRecord].
+
+        """
+
+        regex = re.compile(pattern, flags)
+        return [node for node in self.nodes() if regex.search(node.text)]
+
+    def next_items(self, item_id):
+        item = self.records[item_id]
+        return [self.records[next_id] for next_id in item.next_attr_ids + item.next_logic_ids
+                if next_id in self.records]
+
+    def last_items(self, item_id):
+        item = self.records[item_id]
+        return [self.records[last_id] for last_id in item.last_attr_ids + item.last_logic_ids
+                if last_id in self.records]
+
+    def statistics(self):
+        return {"scenes": len(self.scenes),
+                "nodes": sum(len(scene.nodes) for scene in self.scenes.values()),
+                "logics": sum(len(scene.logics) for scene in self.scenes.values()),
+                "pipes": sum(len(scene.pipes) for scene in self.scenes.values()),
+                "todos": sum(1 for _ in self.todos()),
+                "files": sum(1 for _ in self.files())}
+
+    # edit
+    def set_text(self, node_id, text):
+        self.records[node_id].contents = text_to_html(text)
+
+    def add_node(self, text="", position=(0.0, 0.0), size=(200.0, 60.0), scene_id=None):
+        """
+        Add an attribute widget, its style is copied from another attribute widget of the note.
+
+        Args:
+            text: Plain text.
+            position: (x, y).
+            size: (width, height).
+            scene_id: The scene, the root scene by default.
+
+        Returns:
+            node: NodeRecord.
+
+        """
+
+        scene = self.scenes[scene_id] if scene_id is not None else self.root
+        template = next(self.nodes(), None)
+        node_data = scene.data.attr_serialization.add()
+        node_data.attr_id = self.ids.allocate()
+        node_data.size.extend(size)
+        node_data.position.extend(position)
+        node_data.contents = text_to_html(text)
+        for port_type, port_truth in ((INPUT_NODE_TYPE, True), (INPUT_NODE_TYPE, False),
+                                      (OUTPUT_NODE_TYPE, True), (OUTPUT_NODE_TYPE, False)):
+            port_data = node_data.attr_port.add()
+            port_data.port_id = self.ids.allocate()
+            port_data.port_type = port_type
+            port_data.port_truth = port_truth
+            if template and template.data.attr_port:
+                port_data.port_width = template.data.attr_port[0].port_width
+                port_data.port_color.extend(template.data.attr_port[0].port_color)
+                port_data.port_flag.extend(template.data.attr_port[0].port_flag)
+            else:
+                port_data.port_width = 10.0
+                port_data.port_color.extend(PORT_COLOR)
+                port_data.port_flag.extend([False] * 7)
+        node_data.attr_location.extend((0, 0))
+        node_data.next_location.extend((0, 0))
+        if template:
+            node_data.self_attr_font_family = template.data.self_attr_font_family
+            node_data.self_attr_font_size = template.data.self_attr_font_size
+            node_data.self_attr_color.extend(template.data.self_attr_color)
+            node_data.attr_flag.extend(template.data.attr_flag)
+        else:
+            node_data.self_attr_font_size = 12
+            node_data.self_attr_color.extend(ATTR_COLOR)
+            node_data.attr_flag.extend([False] * 6)
+        node_data.mouse_flag = False
+        node_data.mouse_text_width = -1
+        return self.read_node(node_data, scene)
+
+    def remove_node(self, node_id):
+        """
+        Remove an attribute widget or a logic widget with its pipes, sub attribute widgets and sub scene.
+
+        Args:
+            node_id: The id.
+
+        """
+
+        node = self.records[node_id]
+        scene = node.scene
+        for port in node.ports:
+            for pipe_id in list(port.pipe_ids):
+                self.disconnect(pipe_id)
+
+        if isinstance(node, NodeRecord):
+            for sub_attr_id in list(node.sub_attr_ids):
+                self.remove_node(sub_attr_id)
+            if node.parent:
+                node.parent.sub_attr_ids.remove(node.id)
+            if node.sub_scene:
+                self.forget_scene(node.sub_scene)
+            for record in node.ports + node.todos + node.files:
+                self.records.pop(record.id, None)
+            del scene.nodes[node.id]
+            scene.data.attr_serialization.remove(node.data)
+        else:
+            for port in node.ports:
+                self.records.pop(port.id, None)
+            del scene.logics[node.id]
+            scene.data.logic_serialization.remove(node.data)
+        del self.records[node.id]
+
+    def forget_scene(self, scene):
+        for node in scene.nodes.values():
+            if node.sub_scene:
+                self.forget_scene(node.sub_scene)
+            for record in [node] + node.ports + node.todos + node.files:
+                self.records.pop(record.id, None)
+        for logic in scene.logics.values():
+            for record in [logic] + logic.ports:
+                self.records.pop(record.id, None)
+        for pipe in scene.pipes.values():
+            self.records.pop(pipe.id, None)
+        self.scenes.pop(scene.id, None)
+        self.records.pop(scene.id, None)
+
+    def connect(self, source_id, destination_id, truth=True, text=""):
+        """
+        Connect the output port of the source to the input port of the destination.
+
+        Args:
+            source_id: The id of the attribute widget or logic widget.
+            destination_id: The id of the attribute widget or logic widget.
+            truth: Use the true ports or the false ports of attribute widgets.
+            text: The text of the pipe.
+
+        Returns:
+            pipe: PipeRecord.
+
+        """
+
+        source = self.records[source_id]
+        destination = self.records[destination_id]
+        if source.scene is not destination.scene:
+            raise ValueError("Pipes connect items of the same scene.")
+        output_port = source.port(OUTPUT_NODE_TYPE, truth)
+        input_port = destination.port(INPUT_NODE_TYPE, truth)
+
+        template = next(self.pipes(), None)
+        pipe_data = source.scene.data.pipe_serialization.add()
+        pipe_data.pipe_id = self.ids.allocate()
+        pipe_data.pipe_port_id.extend((output_port.id, input_port.id))
+        pipe_data.pipe_text = text
+        source_position = source.position
+        destination_position = destination.position
+        pipe_data.start_point.extend(source_position)
+        pipe_data.end_point.extend(destination_position)
+        pipe_data.offset_start_point.extend((0.0, 0.0))
+        pipe_data.offset_destination_point.extend((0.0, 0.0))
+        if template:
+            pipe_data.self_pipe_width = template.data.self_pipe_width
+            pipe_data.self_pipe_color.extend(template.data.self_pipe_color)
+            pipe_data.pipe_flag.extend(template.data.pipe_flag)
+            if template.data.HasField("pipe_font_family"):
+                pipe_data.pipe_font_family = template.data.pipe_font_family
+                pipe_data.pipe_font_size = template.data.pipe_font_size
+        else:
+            pipe_data.self_pipe_width = 2.0
+            pipe_data.self_pipe_color.extend(PIPE_COLOR)
+            pipe_data.pipe_flag.extend([False] * 5)
+
+        pipe = PipeRecord(pipe_data, source.scene)
+        source.scene.pipes[pipe.id] = pipe
+        self.records[pipe.id] = pipe
+        output_port.pipe_ids.append(pipe.id)
+        input_port.pipe_ids.append(pipe.id)
+        if destination.id not in source.next_attr_ids + source.next_logic_ids:
+            (source.next_attr_ids if isinstance(destination, NodeRecord) else source.next_logic_ids).append(
+                destination.id)
+            (destination.last_attr_ids if isinstance(source, NodeRecord) else destination.last_logic_ids).append(
+                source.id)
+        return pipe
+
+    def disconnect(self, pipe_id):
+        """
+        Remove a pipe, the items stay connected while another pipe joins them.
+
+        Args:
+            pipe_id: The id.
+
+        """
+
+        pipe = self.records.pop(pipe_id)
+        del pipe.scene.pipes[pipe.id]
+        pipe.scene.data.pipe_serialization.remove(pipe.data)
+
+        ports = [self.records.get(port_id) for port_id in pipe.port_ids]
+        ports = [port for port in ports if isinstance(port, PortRecord)]
+        for port in ports:
+            if pipe.id in port.pipe_ids:
+                port.pipe_ids.remove(pipe.id)
+        if len(ports) != 2:
+            return
+        source, destination = (ports[0].node, ports[1].node) if ports[0].port_type == OUTPUT_NODE_TYPE else \
+            (ports[1].node, ports[0].node)
+
+        for other_pipe in pipe.scene.pipes.values():
+            other_nodes = {getattr(self.records.get(port_id), "node", None) for port_id in other_pipe.port_ids}
+            if source in other_nodes and destination in other_nodes:
+                return
+        for ids in (source.next_attr_ids, source.next_logic_ids):
+            if destination.id in ids:
+                ids.remove(destination.id)
+        for ids in (destination.last_attr_ids, destination.last_logic_ids):
+            if source.id in ids:
+                ids.remove(source.id)
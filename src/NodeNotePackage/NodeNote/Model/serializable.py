@@ -2,13 +2,219 @@
 The Serialization base class
 """
 
+import contextlib
+import os
+
+__all__ = ["Serializable", "IdAllocator", "ID_FIELDS", "find_work_dir"]
+
+
+# int64 fields of the protobuff messages which hold item ids
+ID_FIELDS = frozenset((
+    "port_id", "pipes_id",
+    "current_scene_id", "scene_id",
+    "attr_id", "next_attr_id", "next_logic_id", "last_attr_id", "last_logic_id", "sub_attr",
+    "file_id", "subview_id", "todo_id", "none_id",
+    "logic_id", "logic_next_attr", "logic_next_logic", "logic_last_attr", "logic_last_logic",
+    "pipe_id", "pipe_port_id",
+    "draw_id",
+))
+
+
+def find_work_dir(path):
+    """
+    The work dir containing a file.
+
+    Args:
+        path: The path of a file in the work dir.
+
+    Returns:
+        work_dir: The nearest parent directory with a .NODENOTE file, None if there is none.
+
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        if os.path.exists(os.path.join(directory, ".NODENOTE")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+class IdAllocator:
+    """
+    Monotonic ids of the opened note, starting at 1.
+    The next id is saved with the note, so ids stay unique across sessions and small on disk.
+        - Bound to a work dir, ids are taken from blocks reserved in the work dir, so they are unique
+          across all its notes: markdown texts and drawings are stored per work dir by attribute id.
+        - A block is reserved by the first allocation which needs it, not by opening a note, and the unused
+          rest of the block is released when the note is saved, so reopening a note keeps its ids.
+        - While loading, widgets get temporary negative ids which the deserialization replaces.
+
+    """
+
+    # ids reserved in the work dir at once
+    block = 1024
+
+    def __init__(self, next_id=1):
+        self.next_id = next_id
+        # file holding the first id not reserved in the work dir, None if ids are unique in the note only
+        self.path = None
+        # the first id after the reserved block, None until a block is reserved
+        self.limit = None
+        # {old id: new id} of the last note remapped by restore
+        self.mapping = dict()
+        # nested loading() blocks, and the last temporary id handed out in them
+        self.loading_depth = 0
+        self.temporary_id = 0
+
+    def bind(self, work_dir):
+        """
+        Take the next ids from the blocks of a work dir.
+
+        Args:
+            work_dir: The work dir, None to keep ids unique in the note only.
+
+        """
+
+        self.path = os.path.join(work_dir, "Documents", "next_id") if work_dir else None
+        self.limit = None
+
+    def reserve(self):
+        # the next block starts after every id reserved in the work dir and every id of the note
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                start = int(file.read().strip() or 1)
+        except (OSError, ValueError):
+            start = 1
+        self.next_id = max(self.next_id, start)
+        self.limit = self.next_id + self.block
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(str(self.limit))
+
+    def release(self):
+        """
+        Give the unused rest of the reserved block back to the work dir, unless another note reserved after it.
+
+        """
+
+        if not self.path or self.limit is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                mark = int(file.read().strip() or 1)
+        except (OSError, ValueError):
+            return
+        if mark == self.limit:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(str(self.next_id))
+        self.limit = None
+
+    @contextlib.contextmanager
+    def loading(self):
+        """
+        Hand out temporary ids inside the block, for widgets whose id the deserialization overwrites.
+
+        """
+
+        self.loading_depth += 1
+        try:
+            yield
+        finally:
+            self.loading_depth -= 1
+
+    def allocate(self):
+        if self.loading_depth:
+            self.temporary_id -= 1
+            return self.temporary_id
+        if self.path and (self.limit is None or self.next_id >= self.limit):
+            self.reserve()
+        item_id = self.next_id
+        self.next_id += 1
+        return item_id
+
+    def remap(self, message, mapping=None):
+        """
+        Give every id in the protobuff object a new id, references to the same id get the same new id.
+        0 means no item and is kept.
+
+        Args:
+            message: The protobuff object, changed in place.
+            mapping: {old id: new id} shared between several objects.
+
+        Returns:
+            mapping: {old id: new id}.
+
+        """
+
+        mapping = {} if mapping is None else mapping
+        for field, value in message.ListFields():
+            if field.message_type is not None:
+                if field.label == field.LABEL_REPEATED:
+                    for sub_message in value:
+                        self.remap(sub_message, mapping)
+                else:
+                    self.remap(value, mapping)
+            elif field.name in ID_FIELDS:
+                if field.label == field.LABEL_REPEATED:
+                    value[:] = [self.new_id(item_id, mapping) for item_id in value]
+                else:
+                    setattr(message, field.name, self.new_id(value, mapping))
+        return mapping
+
+    def new_id(self, item_id, mapping):
+        if not item_id:
+            return item_id
+        if item_id not in mapping:
+            # remapped ids are kept, so they are never temporary
+            loading_depth, self.loading_depth = self.loading_depth, 0
+            try:
+                mapping[item_id] = self.allocate()
+            finally:
+                self.loading_depth = loading_depth
+        return mapping[item_id]
+
+    def restore(self, view_serialization):
+        """
+        Continue the ids of a loaded note, the block is reserved by the next allocation.
+        Notes saved before the allocator hold addresses as ids, they are remapped to dense ids,
+        the mapping is kept in self.mapping to move what is stored by id.
+
+        Args:
+            view_serialization: The protobuff object of the note.
+
+        """
+
+        self.limit = None
+        self.mapping = dict()
+        if view_serialization.HasField("next_id"):
+            self.next_id = view_serialization.next_id
+        else:
+            self.next_id = 1
+            self.mapping = self.remap(view_serialization)
+
 
 class Serializable:
+    # the allocator of the opened note
+    ids = IdAllocator()
+
     def __init__(self):
-        self.id = id(self)
+        self.id = Serializable.ids.allocate()
 
     def serialize(self):
         raise NotImplemented()
 
     def deserialize(self, data, hashmap: dict, view=None, flag=True):
         raise NotImplemented()
+
+    def mark_dirty(self):
+        """
+        Mark the scene of the item changed since it was last saved.
+
+        """
+
+        scene = self.scene() if callable(getattr(self, "scene", None)) else None
+        if scene is not None and hasattr(scene, "mark_dirty"):
+            scene.mark_dirty()
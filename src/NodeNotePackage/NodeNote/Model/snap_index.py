@@ -0,0 +1,143 @@
+"""
+snap_index.py - Sorted widget edges used by the alignment guides.
+"""
+
+import bisect
+import math
+
+__all__ = ["SnapIndex"]
+
+
+class SnapIndex:
+    """
+    The edges of the widgets of a scene, sorted per axis for bisect.
+        - "h": top and bottom edges, "v": left and right edges.
+        - A nearest edge query costs O(log N) plus the excluded edges it skips.
+        - Answers are cached per cell of the queried coordinate until an edge changes.
+
+    """
+
+    # answers kept before the cache is emptied
+    cache_limit = 4096
+
+    def __init__(self, cell=5):
+        """
+        Create an empty index.
+
+        Args:
+            cell: The size of the cells answers are reused in.
+
+        """
+
+        self.cell = cell
+        # {key: {"h": (top, bottom), "v": (left, right)}}
+        self.edges = dict()
+        # {axis: [(coordinate, key), ...]} sorted
+        self.sorted_edges = {"h": [], "v": []}
+        # {(axis, direction, cell, exclude): coordinate}
+        self.cache = dict()
+
+    def __len__(self):
+        return len(self.edges)
+
+    def set(self, key, h_edges, v_edges):
+        """
+        Index or move the edges of a widget.
+
+        Args:
+            key: Int identifying the widget.
+            h_edges: Top and bottom of the widget.
+            v_edges: Left and right of the widget.
+
+        """
+
+        edges = {"h": tuple(h_edges), "v": tuple(v_edges)}
+        if self.edges.get(key) == edges:
+            return
+        self.remove(key)
+        self.edges[key] = edges
+        for axis, coordinates in edges.items():
+            for coordinate in coordinates:
+                bisect.insort(self.sorted_edges[axis], (coordinate, key))
+        self.cache.clear()
+
+    def remove(self, key):
+        edges = self.edges.pop(key, None)
+        if edges is None:
+            return
+        for axis, coordinates in edges.items():
+            sorted_edges = self.sorted_edges[axis]
+            for coordinate in coordinates:
+                index = bisect.bisect_left(sorted_edges, (coordinate, key))
+                if index < len(sorted_edges) and sorted_edges[index] == (coordinate, key):
+                    del sorted_edges[index]
+        self.cache.clear()
+
+    def clear(self):
+        self.edges = dict()
+        self.sorted_edges = {"h": [], "v": []}
+        self.cache.clear()
+
+    def before(self, axis, value, exclude=frozenset()):
+        """
+        The closest edge at or before a coordinate, rounded up to the end of its cell.
+
+        Args:
+            axis: "h" or "v".
+            value: The coordinate.
+            exclude: frozenset of keys which are skipped.
+
+        Returns:
+            coordinate: The edge or None.
+
+        """
+
+        cell = math.ceil(value / self.cell)
+        cache_key = (axis, False, cell, exclude)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        sorted_edges = self.sorted_edges[axis]
+        coordinate = None
+        index = bisect.bisect_right(sorted_edges, (cell * self.cell, math.inf))
+        while index > 0:
+            index -= 1
+            if sorted_edges[index][1] not in exclude:
+                coordinate = sorted_edges[index][0]
+                break
+        return self.store(cache_key, coordinate)
+
+    def after(self, axis, value, exclude=frozenset()):
+        """
+        The closest edge at or after a coordinate, rounded down to the start of its cell.
+
+        Args:
+            axis: "h" or "v".
+            value: The coordinate.
+            exclude: frozenset of keys which are skipped.
+
+        Returns:
+            coordinate: The edge or None.
+
+        """
+
+        cell = math.floor(value / self.cell)
+        cache_key = (axis, True, cell, exclude)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        sorted_edges = self.sorted_edges[axis]
+        coordinate = None
+        index = bisect.bisect_left(sorted_edges, (cell * self.cell, -math.inf))
+        while index < len(sorted_edges):
+            if sorted_edges[index][1] not in exclude:
+                coordinate = sorted_edges[index][0]
+                break
+            index += 1
+        return self.store(cache_key, coordinate)
+
+    def store(self, cache_key, coordinate):
+        if len(self.cache) >= self.cache_limit:
+            self.cache.clear()
+        self.cache[cache_key] = coordinate
+        return coordinate
@@ -0,0 +1,191 @@
+"""
+text_index.py - Inverted index of the texts of the attribute widgets.
+"""
+
+import bisect
+import collections
+import math
+import re
+
+__all__ = ["TextIndex", "tokenize", "matches", "match_positions"]
+
+
+# every CJK character is a token, other words are runs of letters and digits
+TOKEN = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]|[^\W_\u3400-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text):
+    """
+    Split a text into lower case tokens.
+
+    Args:
+        text: Plain text.
+
+    Returns:
+        tokens: List of str.
+
+    """
+
+    return TOKEN.findall(text.lower())
+
+
+def matches(query, text):
+    """
+    Whether every token of the query starts a token of the text, without an index.
+
+    Args:
+        query: The searched text.
+        text: Plain text.
+
+    Returns:
+        bool.
+
+    """
+
+    query_tokens = set(tokenize(query))
+    if not query_tokens:
+        return False
+    text_tokens = set(tokenize(text))
+    return all(any(token.startswith(query_token) for token in text_tokens) for query_token in query_tokens)
+
+
+def match_positions(query, text):
+    """
+    The start of every token of the text which a token of the query starts, like the index matches them.
+
+    Args:
+        query: The searched text.
+        text: Plain text.
+
+    Returns:
+        positions: List of int, in UTF-16 code units like the positions of a QTextCursor.
+
+    """
+
+    query_tokens = tuple(set(tokenize(query)))
+    if not query_tokens:
+        return list()
+    positions = list()
+    for match in TOKEN.finditer(text):
+        if match.group().lower().startswith(query_tokens):
+            positions.append(len(text[:match.start()].encode("utf-16-le")) // 2)
+    return positions
+
+
+class TextIndex:
+    """
+    Token -> documents index, updated one document at a time.
+        - Each query token matches the tokens it starts, found by bisect in the sorted vocabulary.
+        - A document is a hit when it matches every query token.
+        - Hits are ranked by tf-idf, exact tokens weigh more than prefixes, ties keep the indexing order.
+
+    """
+
+    def __init__(self):
+        # {token: {key: count}}
+        self.postings = dict()
+        # {key: Counter of tokens}
+        self.documents = dict()
+        # {key: sequence number}, the order of ties
+        self.order = dict()
+        self.sequence = 0
+        # sorted tokens, None until a query needs them again
+        self.vocabulary = None
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, key):
+        return key in self.documents
+
+    def update(self, key, text):
+        """
+        Index the text of a document again.
+
+        Args:
+            key: Hashable document key.
+            text: Plain text of the document.
+
+        """
+
+        counts = collections.Counter(tokenize(text))
+        if key in self.documents and self.documents[key] == counts:
+            return
+        self.discard(key)
+        self.documents[key] = counts
+        if key not in self.order:
+            self.order[key] = self.sequence
+            self.sequence += 1
+        for token, count in counts.items():
+            if token not in self.postings:
+                self.postings[token] = dict()
+                self.vocabulary = None
+            self.postings[token][key] = count
+
+    def discard(self, key):
+        counts = self.documents.pop(key, None)
+        if counts is None:
+            return
+        for token in counts:
+            postings = self.postings[token]
+            del postings[key]
+            if not postings:
+                del self.postings[token]
+                self.vocabulary = None
+
+    def remove(self, key):
+        self.discard(key)
+        self.order.pop(key, None)
+
+    def expand(self, query_token):
+        """
+        The indexed tokens starting with a query token.
+
+        Args:
+            query_token: str.
+
+        Returns:
+            tokens: List of str.
+
+        """
+
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        tokens = list()
+        index = bisect.bisect_left(self.vocabulary, query_token)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(query_token):
+            tokens.append(self.vocabulary[index])
+            index += 1
+        return tokens
+
+    def query(self, text):
+        """
+        The documents matching every token of the text.
+
+        Args:
+            text: The searched text.
+
+        Returns:
+            keys: Document keys, the best hit first.
+
+        """
+
+        scores = None
+        for query_token in set(tokenize(text)):
+            token_scores = dict()
+            for token in self.expand(query_token):
+                postings = self.postings[token]
+                weight = math.log(1 + len(self.documents) / len(postings))
+                if token != query_token:
+                    weight /= 2
+                for key, count in postings.items():
+                    token_scores[key] = token_scores.get(key, 0) + (1 + math.log(count)) * weight
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {key: score + token_scores[key] for key, score in scores.items() if key in token_scores}
+            if not scores:
+                return list()
+        if scores is None:
+            return list()
+        return sorted(scores, key=lambda key: (-scores[key], self.order[key]))
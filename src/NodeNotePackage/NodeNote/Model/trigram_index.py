@@ -0,0 +1,124 @@
+"""
+trigram_index.py - Fuzzy matching of short texts like titles and names.
+"""
+
+import collections
+import heapq
+
+__all__ = ["TrigramIndex"]
+
+
+class TrigramIndex:
+    """
+    Trigram -> keys index, updated one text at a time.
+        - Words are padded with spaces, so one and two letters match the start of words.
+        - A text is a candidate when it has every trigram inside the query words (a substring)
+          or at least a third of the trigrams of the query (a typo or a fuzzy prefix).
+        - Candidates are ranked by shared trigrams, substring and prefix matches, then shorter texts.
+
+    """
+
+    def __init__(self):
+        # {key: lower case text}
+        self.texts = dict()
+        # {key: set of trigrams}
+        self.grams = dict()
+        # {trigram: set of keys}
+        self.postings = dict()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __contains__(self, key):
+        return key in self.texts
+
+    @staticmethod
+    def trigrams(text, partial=False):
+        """
+        The trigrams of the padded words of a text.
+
+        Args:
+            text: str.
+            partial: The last word is still typed, it is not padded at its end.
+
+        Returns:
+            trigrams: set of str.
+
+        """
+
+        words = text.lower().split()
+        trigrams = set()
+        for index, word in enumerate(words):
+            padded = "  " + word if partial and index == len(words) - 1 else "  " + word + " "
+            for start in range(len(padded) - 2):
+                trigrams.add(padded[start:start + 3])
+        return trigrams
+
+    def update(self, key, text):
+        """
+        Index the text of a key again.
+
+        Args:
+            key: Hashable key.
+            text: str.
+
+        """
+
+        text = text.lower()
+        if self.texts.get(key) == text:
+            return
+        self.remove(key)
+        self.texts[key] = text
+        self.grams[key] = self.trigrams(text)
+        for trigram in self.grams[key]:
+            self.postings.setdefault(trigram, set()).add(key)
+
+    def remove(self, key):
+        if key not in self.texts:
+            return
+        del self.texts[key]
+        for trigram in self.grams.pop(key):
+            keys = self.postings[trigram]
+            keys.discard(key)
+            if not keys:
+                del self.postings[trigram]
+
+    def query(self, text, limit=50):
+        """
+        The keys whose texts match the typed text best.
+
+        Args:
+            text: The typed text.
+            limit: The number of keys returned.
+
+        Returns:
+            keys: The best match first.
+
+        """
+
+        trigrams = self.trigrams(text, partial=True)
+        if not trigrams:
+            return list()
+        inner = {trigram for trigram in trigrams if " " not in trigram}
+
+        hits = collections.Counter()
+        for trigram in trigrams:
+            hits.update(self.postings.get(trigram, ()))
+        inner_hits = collections.Counter()
+        for trigram in inner:
+            inner_hits.update(self.postings.get(trigram, ()))
+
+        pattern = " ".join(text.lower().split())
+        candidates = list()
+        for key, count in hits.items():
+            if count * 3 < len(trigrams) and not (inner and inner_hits[key] == len(inner)):
+                continue
+            target = self.texts[key]
+            score = count / len(trigrams)
+            position = target.find(pattern)
+            if position == 0:
+                score += 1.5
+            elif position > 0:
+                score += 1.0 if target[position - 1] == " " else 0.5
+            candidates.append((score - len(target) / 10000, key))
+        return [key for _, key in heapq.nlargest(limit, candidates, key=lambda candidate: candidate[0])]